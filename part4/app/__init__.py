@@ -1,8 +1,21 @@
+import os
+
 from flask import Flask
 from flask_restx import Api
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
+from app.persistence.cache import EntityCache
+from app.persistence.engine import (
+    configure_engine_options, install_engine_events, pool_stats
+)
+from app.persistence.routing import configure_replica, install_read_replica
+from app.persistence.slow_queries import install_slow_query_log
+from app.persistence.revocation import TokenBlocklist
+from app.utils.metrics import Metrics
+from app.utils.passwords import PasswordHasher
+from app.utils.response_cache import ResponseCache
+from app.utils.serialization import output_json
 
 # Initialize Bcrypt
 bcrypt = Bcrypt()
@@ -10,8 +23,24 @@ bcrypt = Bcrypt()
 # Initialize JWTManager
 jwt = JWTManager()
 
-# Initialize SQLAlchemy
+# Initialize SQLAlchemy, with reads optionally routed to a replica
 db = SQLAlchemy()
+install_read_replica(db)
+
+# Initialize the entity cache used by CachedRepository
+entity_cache = EntityCache()
+
+# Initialize the cache of public list responses
+response_cache = ResponseCache()
+
+# Initialize the store of revoked tokens
+token_blocklist = TokenBlocklist()
+
+# Initialize the password hashing service
+password_hasher = PasswordHasher()
+
+# Initialize the request metrics
+metrics = Metrics()
 
 
 def create_app(config_class="config.DevelopmentConfig"):
@@ -34,11 +63,51 @@ def create_app(config_class="config.DevelopmentConfig"):
     # Initialize Bcrypt with the application
     bcrypt.init_app(app)
 
-    # Initialize JWTManager with the application
+    # Initialize JWTManager and the revoked token store
     jwt.init_app(app)
+    token_blocklist.init_app(app)
 
-    # Initialize SQLAlchemy with the application
+    # Initialize SQLAlchemy with the application, timing pool checkouts,
+    # applying the SQLite pragmas, logging slow statements and adding the
+    # read replica, if any
+    configure_replica(app)
+    configure_engine_options(app)
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            install_engine_events(engine, app.config)
+            install_slow_query_log(
+                engine, app.config,
+                os.path.join(app.instance_path, 'slow_queries.log')
+            )
+
+    # Initialize the entity cache with the application
+    entity_cache.init_app(app)
+
+    # Initialize the response cache with the application
+    response_cache.init_app(app)
+
+    # Initialize the password hashing service with the application
+    password_hasher.init_app(app)
+
+    # Record request, SQL, bcrypt and serialization timings, served at
+    # METRICS_PATH with the pool and cache statistics
+    with app.app_context():
+        metrics.init_app(app, db.engines)
+        for bind, engine in db.engines.items():
+            metrics.add_collector(
+                app, f'hbnb_db_pool_{bind or "default"}',
+                lambda engine=engine: pool_stats(engine),
+                counters=('checkouts', 'timeouts', 'wait_total_ms')
+            )
+    metrics.add_collector(
+        app, 'hbnb_entity_cache', entity_cache.stats,
+        counters=('hits', 'misses', 'evictions')
+    )
+    metrics.add_collector(
+        app, 'hbnb_response_cache', response_cache.stats,
+        counters=('hits', 'stale_hits', 'misses', 'evictions')
+    )
 
     api = Api(
         app,
@@ -46,6 +115,8 @@ def create_app(config_class="config.DevelopmentConfig"):
         title='HBnB API',
         description='HBnB Application API'
     )
+    # Encode responses with orjson when JSON_FAST_SERIALIZER is enabled
+    api.representations['application/json'] = output_json
 
     # Import namespaces here to avoid circular imports
     from app.api.v1.users import api as users_ns
@@ -61,4 +132,8 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(auth_ns, path='/api/v1/auth')
 
+    # Register the maintenance CLI commands
+    from app.commands import register_commands
+    register_commands(app)
+
     return app
@@ -1,6 +1,15 @@
 from flask_restx import Namespace, Resource, fields
-from app.services.facade import HBnBFacade
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services import facade
+from app.api.v1.pagination import (
+    pagination_parser, get_pagination_args, page_response
+)
+from app.api.v1.conditional import conditional_response
+from app import response_cache
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import get_identity
+from app.api.v1.imports import import_parser, import_response
+from app.utils.serialization import amenity_summary_serializer
+from app.utils.validation import amenity_schema
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -9,8 +18,6 @@ amenity_model = api.model('Amenity', {
     'name': fields.String(required=True, description='Name of the amenity')
 })
 
-facade = HBnBFacade()
-
 
 @api.route('/')
 class AmenityList(Resource):
@@ -23,46 +30,69 @@ class AmenityList(Resource):
     def post(self):
         """Register a new amenity (requires admin privileges)"""
         # Get current user from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Check if user is admin
-        if not current_user.get('is_admin', False):
+        if not current_user.is_admin:
             return {
                 'error': 'Admin privileges required to create amenities'
             }, 403
 
         amenity_data = api.payload
 
-        # Add validation for empty name
-        if not amenity_data.get('name') or amenity_data['name'].strip() == "":
-            return {
-                'error': 'Invalid input data',
-                'details': ['Amenity name cannot be empty']
-            }, 400
+        # Validate the name
+        amenity_data, errors = amenity_schema.clean(amenity_data)
+        if errors:
+            return {'error': 'Invalid input data', 'details': errors}, 400
 
         new_amenity = facade.create_amenity(amenity_data)
         return {'id': new_amenity.id, 'name': new_amenity.name}, 201
 
+    @api.expect(pagination_parser)
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(304, 'Not modified')
+    @api.response(400, 'Invalid cursor')
+    @response_cache.cached('amenities')
     def get(self):
-        """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
-        return [
-            {'id': amenity.id, 'name': amenity.name}
-            for amenity in amenities
-        ], 200
+        """Retrieve a page of amenities"""
+        limit, after = get_pagination_args()
+        try:
+            amenities, next_cursor = facade.get_amenities_page(limit, after)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return conditional_response(amenities, lambda: page_response(
+            amenity_summary_serializer.many(amenities), next_cursor
+        ), next_cursor, collection=True)
+
+
+@api.route('/import')
+class AmenityImport(Resource):
+    @api.expect(import_parser)
+    @api.response(200, 'File imported, see the per-row errors')
+    @api.response(400, 'Invalid import parameters')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Import amenities from an NDJSON or CSV body (admin only)"""
+        if not get_identity().is_admin:
+            return {'error': 'Admin privileges required'}, 403
+        return import_response('amenities')
 
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(304, 'Not modified')
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """Get amenity details by ID"""
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             return {'error': 'Amenity not found'}, 404
-        return {'id': amenity.id, 'name': amenity.name}, 200
+        return conditional_response(
+            [amenity], lambda: {'id': amenity.id, 'name': amenity.name}
+        )
 
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
@@ -74,22 +104,20 @@ class AmenityResource(Resource):
     def put(self, amenity_id):
         """Update an amenity's information (requires admin privileges)"""
         # Get current user from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Check if user is admin
-        if not current_user.get('is_admin', False):
+        if not current_user.is_admin:
             return {
                 'error': 'Admin privileges required to update amenities'
             }, 403
 
         amenity_data = api.payload
 
-        # Add validation for empty name
-        if not amenity_data.get('name') or amenity_data['name'].strip() == "":
-            return {
-                'error': 'Invalid input data',
-                'details': ['Amenity name cannot be empty']
-            }, 400
+        # Validate the name
+        amenity_data, errors = amenity_schema.clean(amenity_data)
+        if errors:
+            return {'error': 'Invalid input data', 'details': errors}, 400
 
         updated_amenity = facade.update_amenity(amenity_id, amenity_data)
 
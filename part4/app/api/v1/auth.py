@@ -1,13 +1,21 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import (
     create_access_token,
-    jwt_required,
-    get_jwt_identity
+    create_refresh_token,
+    decode_token,
+    get_jwt,
+    jwt_required
 )
-from app.services.facade import HBnBFacade
-
-# Create a facade instance
-facade = HBnBFacade()
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from app import jwt, token_blocklist
+from app.services import facade
+from app.api.v1.identity import (
+    get_current_user, get_identity, identity_claims
+)
+from app.persistence.revocation import RevocationStoreFullError
+from app.utils.passwords import PasswordHasherBusyError
 
 # Create the namespace
 api = Namespace('auth', description='Authentication operations')
@@ -18,32 +26,121 @@ login_model = api.model('Login', {
     'password': fields.String(required=True, description='User password')
 })
 
+logout_model = api.model('Logout', {
+    'refresh_token': fields.String(
+        description='Refresh token to revoke along with the access token'
+    )
+})
+
 
 @api.route('/login')
 class Login(Resource):
     @api.expect(login_model)
+    @api.response(200, 'Login successful')
+    @api.response(401, 'Invalid credentials')
+    @api.response(503, 'Too many login attempts in progress')
     def post(self):
         """Authenticate user and return a JWT token"""
         # Get the email and password from the request payload
         credentials = api.payload
 
-        # Step 1: Retrieve the user based on the provided email
-        user = facade.get_user_by_email(credentials['email'])
-
-        # Step 2: Check if the user exists and the password is correct
-        if not user or not user.verify_password(credentials['password']):
+        # Steps 1 and 2: Retrieve the user based on the provided email
+        # and check that the password is correct
+        try:
+            user = facade.authenticate_user(
+                credentials['email'], credentials['password']
+            )
+        except PasswordHasherBusyError:
+            return {'error': 'Server busy, please retry'}, 503
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
-        # Step 3: Create a JWT token with the user's id and is_admin flag
-        access_token = create_access_token(identity={
-            'id': str(user.id),
-            'is_admin': user.is_admin
-        })
+        # Step 3: Create JWT tokens with the user's id as subject and
+        # the is_admin flag as a claim
+        claims = identity_claims(user)
+        access_token = create_access_token(
+            identity=str(user.id), additional_claims=claims
+        )
+        refresh_token = create_refresh_token(
+            identity=str(user.id), additional_claims=claims
+        )
+
+        # Step 4: Return the JWT tokens to the client
+        return {
+            'access_token': access_token,
+            'refresh_token': refresh_token
+        }, 200
+
 
-        # Step 4: Return the JWT token to the client
+@api.route('/refresh')
+class Refresh(Resource):
+    @api.response(200, 'New access token issued')
+    @api.response(401, 'Invalid, expired or revoked refresh token, or '
+                       'deleted user')
+    @jwt_required(refresh=True)
+    def post(self):
+        """Exchange a refresh token for a new access token"""
+        # Roles are read again from the user, in case they changed
+        user = get_current_user()
+        if not user:
+            return {'error': 'User not found'}, 401
+        access_token = create_access_token(
+            identity=str(user.id), additional_claims=identity_claims(user)
+        )
         return {'access_token': access_token}, 200
 
 
+@api.route('/logout')
+class Logout(Resource):
+    @api.expect(logout_model)
+    @api.response(200, 'Tokens revoked')
+    @api.response(401, 'Authentication required')
+    @api.response(503, 'Revocation store full, tokens still valid')
+    @jwt_required(verify_type=False)
+    def post(self):
+        """Revoke the token of the request, and a refresh token if given"""
+        token = get_jwt()
+
+        # The body is optional: api.payload would reject a missing one.
+        # The refresh token is checked first, so that a 400 leaves the
+        # access token valid
+        body = request.get_json(silent=True) or {}
+        refresh_token = body.get('refresh_token')
+        refresh_data = None
+        if refresh_token:
+            try:
+                refresh_data = decode_token(refresh_token, allow_expired=True)
+            except (JWTExtendedException, PyJWTError):
+                return {'error': 'Invalid refresh token'}, 400
+            # Only a token of the same user can be revoked this way
+            if refresh_data['sub'] != token['sub']:
+                refresh_data = None
+
+        try:
+            token_blocklist.revoke_token(token)
+            if refresh_data:
+                token_blocklist.revoke_token(refresh_data)
+        except RevocationStoreFullError:
+            # The client must not believe its tokens are revoked
+            return {'error': 'Could not revoke the tokens, please retry'}, 503
+
+        return {'message': 'Successfully logged out'}, 200
+
+
+@api.route('/revoke/<user_id>')
+class RevokeUser(Resource):
+    @api.response(200, 'Tokens of the user revoked')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self, user_id):
+        """Revoke every token issued to a user (admin only)"""
+        if not get_identity().is_admin:
+            return {'error': 'Admin privileges required'}, 403
+        token_blocklist.revoke_user(user_id)
+        return {'message': f'Tokens of user {user_id} revoked'}, 200
+
+
 # Example of a protected endpoint
 @api.route('/protected')
 class ProtectedResource(Resource):
@@ -51,5 +148,31 @@ class ProtectedResource(Resource):
     def get(self):
         """A protected endpoint that requires a valid JWT token"""
         # Retrieve the user's identity from the token
-        current_user = get_jwt_identity()
-        return {'message': f'Hello, user {current_user["id"]}'}, 200
+        identity = get_identity()
+        return {'message': f'Hello, user {identity.id}'}, 200
+
+
+@api.route('/me')
+class CurrentUser(Resource):
+    @api.response(200, 'Current user retrieved successfully')
+    @api.response(401, 'Authentication required')
+    @api.response(404, 'User not found')
+    @jwt_required()
+    def get(self):
+        """Get the user the token belongs to"""
+        user = get_current_user()
+        if not user:
+            return {'error': 'User not found'}, 404
+        return user.to_dict(), 200
+
+
+@jwt.additional_claims_loader
+def add_issue_time(identity):
+    """Precise issue time, compared with the revocations of a user"""
+    return token_blocklist.issue_claims()
+
+
+@jwt.token_in_blocklist_loader
+def is_token_revoked(jwt_header, jwt_data):
+    """Reject revoked tokens; a constant-time lookup in the blocklist"""
+    return token_blocklist.is_revoked(jwt_data)
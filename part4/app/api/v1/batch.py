@@ -0,0 +1,52 @@
+from flask import current_app
+
+
+def get_batch_items(payload, key):
+    """Return (items, error) for a batch payload shaped like {key: [...]}"""
+    items = (payload or {}).get(key)
+    if not isinstance(items, list) or not items:
+        return None, f"{key} must be a non-empty list"
+    max_items = current_app.config['BULK_MAX_ITEMS']
+    if len(items) > max_items:
+        return None, f"A batch cannot contain more than {max_items} items"
+    return items, None
+
+
+def get_batch_size():
+    """Number of items written per transaction"""
+    return current_app.config['BULK_BATCH_SIZE']
+
+
+def run_batch(items, check, process):
+    """Check every item, process the valid ones and merge the results
+
+    Args:
+        items (list): Items received in the request
+        check (callable): Returns None for a valid item, or an error
+            dict such as {'error': 'Unauthorized action'}
+        process (callable): Takes the valid items and returns one result
+            per item, in the same order
+
+    Returns:
+        dict: Per-item results with success and failure counts
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        error = check(item)
+        if error:
+            results[index] = dict(error, index=index)
+        else:
+            valid.append(index)
+
+    if valid:
+        processed = process([items[index] for index in valid])
+        for index, result in zip(valid, processed):
+            results[index] = dict(result, index=index)
+
+    failed = sum(1 for result in results if 'error' in result)
+    return {
+        'results': results,
+        'succeeded': len(results) - failed,
+        'failed': failed
+    }
@@ -0,0 +1,65 @@
+import hashlib
+from datetime import timezone
+
+from flask import Response, request
+from werkzeug.http import http_date
+
+
+def make_etag(objects, *extra):
+    """Strong ETag over the id and updated_at of objects
+
+    extra values (e.g. the next page cursor) are part of the tag too.
+    """
+    digest = hashlib.sha1()
+    for obj in objects:
+        updated_at = obj.updated_at.isoformat() if obj.updated_at else ''
+        digest.update(f'{obj.id}|{updated_at};'.encode())
+    for value in extra:
+        digest.update(f'{value};'.encode())
+    return digest.hexdigest()
+
+
+def last_modified(objects):
+    """Latest updated_at of objects, as an aware UTC datetime, or None"""
+    dates = [obj.updated_at for obj in objects if obj.updated_at]
+    if not dates:
+        return None
+    return max(dates).replace(tzinfo=timezone.utc)
+
+
+def is_not_modified(etag, modified):
+    """Whether the request's validators match the current version
+
+    If-Modified-Since is only used when If-None-Match is absent.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and modified:
+        # HTTP dates have a one second resolution
+        return modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def conditional_response(objects, serialize, *extra, collection=False):
+    """Answer a GET with 304 when the client's copy is current
+
+    Args:
+        objects (list): Models whose id and updated_at version the body
+        serialize (callable): Builds the body; only called on a 200
+        extra: Other values the body depends on
+        collection (bool): Whether objects can be removed from the body.
+            Removing one does not move the latest updated_at, so
+            collections only get an ETag, which covers every id
+
+    Returns:
+        A 304 Response, or (body, 200, headers) with ETag and, for
+        single objects, Last-Modified set
+    """
+    etag = make_etag(objects, *extra)
+    modified = None if collection else last_modified(objects)
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': 'no-cache'}
+    if modified:
+        headers['Last-Modified'] = http_date(modified)
+    if is_not_modified(etag, modified):
+        return Response(status=304, headers=headers)
+    return serialize(), 200, headers
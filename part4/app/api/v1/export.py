@@ -0,0 +1,41 @@
+from itertools import islice
+
+from flask import Response, current_app, stream_with_context
+
+from app.utils.serialization import ndjson_lines
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def get_export_batch_size():
+    """Number of rows read from the database and sent per chunk"""
+    return current_app.config['EXPORT_BATCH_SIZE']
+
+
+def ndjson_response(export, serializer):
+    """Stream objects as NDJSON, one chunk per batch of rows
+
+    Args:
+        export (callable): Takes a batch size and returns an iterator
+            over the objects, such as facade.export_places
+        serializer (ModelSerializer): Builds the dict of each object
+
+    Returns:
+        Response: Streamed response; only one batch of objects is held
+        in memory at a time
+    """
+    batch_size = get_export_batch_size()
+
+    def generate():
+        objects = export(batch_size)
+        while True:
+            batch = list(islice(objects, batch_size))
+            if not batch:
+                break
+            yield ndjson_lines(serializer.many(batch))
+
+    # The generator runs after the view returns: keep the request (and
+    # its database session) around while it does
+    return Response(
+        stream_with_context(generate()), mimetype=NDJSON_MIMETYPE
+    )
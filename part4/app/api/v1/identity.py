@@ -0,0 +1,42 @@
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from app.services import facade
+
+
+class Identity:
+    """The authenticated user, as described by the access token
+
+    The user id is the token's ``sub`` claim and the roles are extra
+    claims, so authorization checks need no database query.
+    """
+    __slots__ = ('id', 'is_admin')
+
+    def __init__(self, user_id, is_admin=False):
+        self.id = user_id
+        self.is_admin = is_admin
+
+    def can_access(self, owner_id):
+        """Whether the user is owner_id or an admin"""
+        return self.is_admin or self.id == owner_id
+
+
+def identity_claims(user):
+    """Role claims stored in the access token of a user"""
+    return {'is_admin': bool(user.is_admin)}
+
+
+def get_identity():
+    """Identity of the current request, read from the verified JWT"""
+    return Identity(get_jwt_identity(), get_jwt().get('is_admin', False))
+
+
+def get_current_user():
+    """User record of the token, loaded at most once per request
+
+    For the endpoints that need more than the claims, like /auth/me:
+    authorization checks use get_identity() and never query the users
+    table. None if the user was deleted since the token was issued.
+    """
+    if 'current_user' not in g:
+        g.current_user = facade.get_user(get_jwt_identity())
+    return g.current_user
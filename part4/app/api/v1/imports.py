@@ -0,0 +1,38 @@
+import io
+
+from flask import current_app, request
+from flask_restx import reqparse
+
+from app.services import facade
+from app.services.importer import IMPORT_FORMATS, read_records
+
+# Query parameters of the import endpoints
+import_parser = reqparse.RequestParser()
+import_parser.add_argument(
+    'format', type=str, location='args', choices=IMPORT_FORMATS,
+    help='File format, by default csv for a text/csv body, else ndjson'
+)
+import_parser.add_argument(
+    'skip_to', type=int, location='args', default=0,
+    help='last_line of an interrupted import, to resume after it'
+)
+
+
+def import_response(kind):
+    """Import the records of the request body, read as it arrives
+
+    Returns:
+        tuple: The ImportResult as a dict and the status code
+    """
+    args = import_parser.parse_args()
+    fmt = args['format'] or (
+        'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    )
+    stream = io.TextIOWrapper(request.stream, encoding='utf-8', newline='')
+    result = facade.import_records(
+        kind, read_records(stream, fmt, kind),
+        batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+        skip_to=args['skip_to'] or 0,
+        max_errors=current_app.config['IMPORT_MAX_ERRORS']
+    )
+    return result.to_dict(), 200
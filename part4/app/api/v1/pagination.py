@@ -0,0 +1,30 @@
+from flask import current_app
+from flask_restx import reqparse
+
+# Query parameters shared by every list endpoint
+pagination_parser = reqparse.RequestParser()
+pagination_parser.add_argument(
+    'limit', type=int, location='args',
+    help='Maximum number of items to return'
+)
+pagination_parser.add_argument(
+    'after', type=str, location='args',
+    help='Cursor returned as next_cursor by the previous page'
+)
+
+
+def clamp_limit(limit):
+    """Apply the configured default and maximum page size to a limit"""
+    limit = limit or current_app.config['PAGE_SIZE_DEFAULT']
+    return max(1, min(limit, current_app.config['PAGE_SIZE_MAX']))
+
+
+def get_pagination_args():
+    """Parse limit and after from the query string, clamping the limit"""
+    args = pagination_parser.parse_args()
+    return clamp_limit(args.get('limit')), args.get('after')
+
+
+def page_response(items, next_cursor):
+    """Build the body returned by paginated list endpoints"""
+    return {'items': items, 'next_cursor': next_cursor}
@@ -1,7 +1,20 @@
 from flask import request
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, reqparse
 from app.services import facade
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.pagination import (
+    pagination_parser, get_pagination_args, page_response, clamp_limit
+)
+from app.api.v1.conditional import conditional_response
+from app import response_cache
+from app.api.v1.batch import get_batch_items, get_batch_size, run_batch
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import get_identity
+from app.api.v1.imports import import_parser, import_response
+from app.api.v1.export import ndjson_response
+from app.utils.serialization import (
+    place_serializer, place_summary_serializer
+)
+from app.utils.validation import place_schema
 
 api = Namespace('places', description='Place operations')
 
@@ -47,6 +60,28 @@ place_update_model = api.model('PlaceUpdate', {
     'longitude': fields.Float(description='Longitude of the place')
 })
 
+# Models for batch operations
+place_batch_input_model = api.model('PlaceBatchInput', {
+    'items': fields.List(fields.Nested(place_input_model), required=True,
+                         description='Places to create')
+})
+
+place_batch_update_item_model = api.inherit(
+    'PlaceBatchUpdateItem', place_update_model, {
+        'id': fields.String(required=True, description='Place ID')
+    }
+)
+
+place_batch_update_model = api.model('PlaceBatchUpdate', {
+    'items': fields.List(fields.Nested(place_batch_update_item_model),
+                         required=True, description='Place updates')
+})
+
+place_batch_delete_model = api.model('PlaceBatchDelete', {
+    'ids': fields.List(fields.String, required=True,
+                       description='IDs of the places to delete')
+})
+
 # Detailed place model for responses (including relationships)
 place_detail_model = api.model('PlaceDetail', {
     'id': fields.String(description='Place ID'),
@@ -64,9 +99,62 @@ place_detail_model = api.model('PlaceDetail', {
     'reviews': fields.List(
         fields.Nested(review_model),
         description='List of reviews'
-    )
+    ),
+    'review_count': fields.Integer(description='Number of reviews'),
+    'average_rating': fields.Float(description='Average rating (1-5)')
 })
 
+# Query parameters for place search
+search_parser = reqparse.RequestParser()
+search_parser.add_argument('min_price', type=float, location='args',
+                           help='Minimum price per night')
+search_parser.add_argument('max_price', type=float, location='args',
+                           help='Maximum price per night')
+search_parser.add_argument('min_lat', type=float, location='args',
+                           help='South edge of the bounding box')
+search_parser.add_argument('max_lat', type=float, location='args',
+                           help='North edge of the bounding box')
+search_parser.add_argument('min_lon', type=float, location='args',
+                           help='West edge of the bounding box')
+search_parser.add_argument('max_lon', type=float, location='args',
+                           help='East edge of the bounding box')
+search_parser.add_argument('amenities', type=str, location='args',
+                           action='split',
+                           help='Comma-separated IDs of required amenities')
+search_parser.add_argument('sort', type=str, location='args',
+                           default='oldest',
+                           choices=('oldest', 'newest',
+                                    'price_asc', 'price_desc',
+                                    'rating_desc'),
+                           help='Sort order')
+search_parser.add_argument('limit', type=int, location='args',
+                           help='Maximum number of places to return')
+search_parser.add_argument('after', type=str, location='args',
+                           help='Cursor returned as next_cursor by the '
+                                'previous page')
+
+# Query parameters for radius queries
+nearby_parser = reqparse.RequestParser()
+nearby_parser.add_argument('lat', type=float, location='args', required=True,
+                           help='Latitude of the center point')
+nearby_parser.add_argument('lon', type=float, location='args', required=True,
+                           help='Longitude of the center point')
+nearby_parser.add_argument('radius_km', type=float, location='args',
+                           required=True, help='Search radius in kilometers')
+nearby_parser.add_argument('limit', type=int, location='args',
+                           help='Maximum number of places to return')
+
+
+def validate_place_data(data, partial=False):
+    """Check place input data, returning (values, errors)
+
+    values are the checked data to pass on to the facade (see
+    Schema.clean) and errors the list of validation errors. With
+    partial=True only the fields present in data are checked, as for
+    updates.
+    """
+    return place_schema.clean(data, partial)
+
 
 @api.route('/')
 class PlaceList(Resource):
@@ -78,38 +166,14 @@ class PlaceList(Resource):
     def post(self):
         """Register a new place (requires authentication)"""
         # Get current user ID from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
         data = request.get_json()
 
         # Set owner_id to current user's id
-        data['owner_id'] = current_user
+        data['owner_id'] = current_user.id
 
         # Manual validation of the data
-        errors = []
-
-        # Validate title
-        if not data.get('title') or data['title'].strip() == "":
-            errors.append("Title cannot be empty")
-        elif len(data.get('title', '')) > 100:
-            errors.append("Title must be a maximum of 100 characters")
-
-        # Validate price
-        if not isinstance(data.get('price'), (int, float)):
-            errors.append("Price must be a number")
-        elif data.get('price', 0) <= 0:
-            errors.append("Price must be a positive number")
-
-        # Validate latitude
-        if not isinstance(data.get('latitude'), (int, float)):
-            errors.append("Latitude must be a number")
-        elif not (-90.0 <= data.get('latitude', 0) <= 90.0):
-            errors.append("Latitude must be between -90 and 90")
-
-        # Validate longitude
-        if not isinstance(data.get('longitude'), (int, float)):
-            errors.append("Longitude must be a number")
-        elif not (-180.0 <= data.get('longitude', 0) <= 180.0):
-            errors.append("Longitude must be between -180 and 180")
+        data, errors = validate_place_data(data)
 
         # Return errors if any
         if errors:
@@ -121,23 +185,254 @@ class PlaceList(Resource):
         except ValueError as e:
             return {'error': str(e)}, 400
 
+    @api.expect(pagination_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, 'Not modified')
+    @api.response(400, 'Invalid cursor')
+    @response_cache.cached('places')
+    def get(self):
+        """Retrieve a page of places"""
+        limit, after = get_pagination_args()
+        try:
+            places, next_cursor = facade.get_places_page(limit, after)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return conditional_response(places, lambda: page_response(
+            place_summary_serializer.many(places), next_cursor
+        ), next_cursor, collection=True)
+
+
+@api.route('/search')
+class PlaceSearch(Resource):
+    @api.expect(search_parser)
+    @api.response(200, 'Matching places retrieved successfully')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Search places by price, bounding box and amenities"""
+        args = search_parser.parse_args()
+
+        # Manual validation of the search parameters
+        errors = []
+
+        min_price, max_price = args['min_price'], args['max_price']
+        if (min_price is not None and max_price is not None and
+                min_price > max_price):
+            errors.append("min_price cannot be greater than max_price")
+
+        bbox_args = ('min_lat', 'min_lon', 'max_lat', 'max_lon')
+        bbox = tuple(args[name] for name in bbox_args)
+        if all(value is None for value in bbox):
+            bbox = None
+        elif any(value is None for value in bbox):
+            errors.append(
+                "min_lat, max_lat, min_lon and max_lon must be given together"
+            )
+        else:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            if not (-90.0 <= min_lat <= max_lat <= 90.0):
+                errors.append("Latitude range must be within -90 and 90")
+            if not (-180.0 <= min_lon <= max_lon <= 180.0):
+                errors.append("Longitude range must be within -180 and 180")
+
+        # Return errors if any
+        if errors:
+            return {'error': 'Invalid input data', 'details': errors}, 400
+
+        filters = {
+            'min_price': min_price,
+            'max_price': max_price,
+            'bbox': bbox,
+            'amenity_ids': [
+                amenity_id.strip() for amenity_id in args['amenities'] or []
+                if amenity_id.strip()
+            ],
+            'sort': args['sort']
+        }
+        try:
+            places, next_cursor = facade.search_places(
+                filters, clamp_limit(args['limit']), args['after']
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response(places, next_cursor), 200
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.expect(nearby_parser)
+    @api.response(200, 'Nearby places retrieved successfully')
+    @api.response(400, 'Invalid search parameters')
     def get(self):
-        """Retrieve a list of all places"""
-        places = facade.get_all_places()
-        return places, 200
+        """List places within radius_km of a point, nearest first"""
+        args = nearby_parser.parse_args()
+
+        # Manual validation of the search parameters
+        errors = []
+        if not -90.0 <= args['lat'] <= 90.0:
+            errors.append("Latitude must be between -90 and 90")
+        if not -180.0 <= args['lon'] <= 180.0:
+            errors.append("Longitude must be between -180 and 180")
+        if args['radius_km'] <= 0:
+            errors.append("radius_km must be a positive number")
+
+        # Return errors if any
+        if errors:
+            return {'error': 'Invalid input data', 'details': errors}, 400
+
+        places = facade.get_places_near(
+            args['lat'], args['lon'], args['radius_km'],
+            clamp_limit(args['limit'])
+        )
+        return {'items': places}, 200
+
+
+@api.route('/export')
+class PlaceExport(Resource):
+    @api.response(200, 'Every place, one JSON object per line (NDJSON)')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Stream every place as NDJSON (admin only)"""
+        if not get_identity().is_admin:
+            return {'error': 'Admin privileges required'}, 403
+        return ndjson_response(facade.export_places, place_serializer)
+
+
+@api.route('/import')
+class PlaceImport(Resource):
+    @api.expect(import_parser)
+    @api.response(200, 'File imported, see the per-row errors')
+    @api.response(400, 'Invalid import parameters')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Import places from an NDJSON or CSV body (admin only)"""
+        if not get_identity().is_admin:
+            return {'error': 'Admin privileges required'}, 403
+        return import_response('places')
+
+
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @api.expect(place_batch_input_model)
+    @api.response(200, 'Batch processed, see per-item results')
+    @api.response(400, 'Invalid batch')
+    @api.response(401, 'Authentication required')
+    @jwt_required()
+    def post(self):
+        """Create many places owned by the current user"""
+        current_user = get_identity()
+        items, error = get_batch_items(request.get_json(), 'items')
+        if error:
+            return {'error': error}, 400
+
+        checked = []
+
+        def check(item):
+            if not isinstance(item, dict):
+                return {'error': 'Item must be an object'}
+            values, errors = validate_place_data(item)
+            if errors:
+                return {'error': 'Invalid input data', 'details': errors}
+            values['owner_id'] = current_user.id
+            checked.append(values)
+            return None
+
+        def process(valid_items):
+            # The valid items as checked by check(), in the same order
+            return facade.create_places(checked, get_batch_size())
+
+        return run_batch(items, check, process), 200
+
+    @api.expect(place_batch_update_model)
+    @api.response(200, 'Batch processed, see per-item results')
+    @api.response(400, 'Invalid batch')
+    @api.response(401, 'Authentication required')
+    @jwt_required()
+    def put(self):
+        """Update many places (owner or admin only, per item)"""
+        current_user = get_identity()
+        is_admin = current_user.is_admin
+        items, error = get_batch_items(request.get_json(), 'items')
+        if error:
+            return {'error': error}, 400
+
+        places = facade.get_places_by_ids(
+            item['id'] for item in items
+            if isinstance(item, dict) and isinstance(item.get('id'), str)
+        )
+        checked = []
+
+        def check(item):
+            if not isinstance(item, dict):
+                return {'error': 'Item must be an object'}
+            place = places.get(item.get('id'))
+            if not place:
+                return {'error': 'Place not found'}
+            if not is_admin and place.owner_id != current_user.id:
+                return {'error': 'Unauthorized action'}
+            values, errors = validate_place_data(item, partial=True)
+            if errors:
+                return {'error': 'Invalid input data', 'details': errors}
+            checked.append(values)
+            return None
+
+        def process(valid_items):
+            # The valid items as checked by check(), in the same order
+            return facade.update_places(checked, get_batch_size())
+
+        return run_batch(items, check, process), 200
+
+    @api.expect(place_batch_delete_model)
+    @api.response(200, 'Batch processed, see per-item results')
+    @api.response(400, 'Invalid batch')
+    @api.response(401, 'Authentication required')
+    @jwt_required()
+    def delete(self):
+        """Delete many places (owner or admin only, per item)"""
+        current_user = get_identity()
+        is_admin = current_user.is_admin
+        place_ids, error = get_batch_items(request.get_json(), 'ids')
+        if error:
+            return {'error': error}, 400
+
+        places = facade.get_places_by_ids(
+            place_id for place_id in place_ids if isinstance(place_id, str)
+        )
+
+        def check(place_id):
+            place = places.get(place_id) if isinstance(place_id, str) else None
+            if not place:
+                return {'error': 'Place not found'}
+            if not is_admin and place.owner_id != current_user.id:
+                return {'error': 'Unauthorized action'}
+            return None
+
+        def process(valid_ids):
+            return facade.delete_places(valid_ids, get_batch_size())
+
+        return run_batch(place_ids, check, process), 200
 
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, 'Not modified')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get place details by ID"""
-        place = facade.get_place_by_id(place_id)
+        place = facade.get_place_with_details(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        return place, 200
+        # The body includes the owner and amenities: version them too
+        versioned = [place, *place.amenities]
+        if place.owner:
+            versioned.append(place.owner)
+        return conditional_response(
+            versioned, place.to_detail_dict, collection=True
+        )
 
     @api.expect(place_update_model)
     @api.response(200, 'Place updated successfully')
@@ -149,10 +444,10 @@ class PlaceResource(Resource):
     def put(self, place_id):
         """Update a place's information (requires authentication)"""
         # Get current user ID from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Set is_admin default to False if not exists
-        is_admin = current_user.get('is_admin', False)
+        is_admin = current_user.is_admin
 
         data = request.get_json()
 
@@ -162,39 +457,11 @@ class PlaceResource(Resource):
             return {'error': 'Place not found'}, 404
 
         # Check if user is the owner of the place or an admin
-        if not is_admin and existing_place.get('owner_id') != current_user:
+        if not is_admin and existing_place.get('owner_id') != current_user.id:
             return {'error': 'Unauthorized action'}, 403
 
         # Manual validation of the data
-        errors = []
-
-        # Validate title
-        if 'title' in data:
-            if not data.get('title') or data['title'].strip() == "":
-                errors.append("Title cannot be empty")
-            elif len(data.get('title', '')) > 100:
-                errors.append("Title must be a maximum of 100 characters")
-
-        # Validate price
-        if 'price' in data:
-            if not isinstance(data.get('price'), (int, float)):
-                errors.append("Price must be a number")
-            elif data.get('price', 0) <= 0:
-                errors.append("Price must be a positive number")
-
-        # Validate latitude
-        if 'latitude' in data:
-            if not isinstance(data.get('latitude'), (int, float)):
-                errors.append("Latitude must be a number")
-            elif not (-90.0 <= data.get('latitude', 0) <= 90.0):
-                errors.append("Latitude must be between -90 and 90")
-
-        # Validate longitude
-        if 'longitude' in data:
-            if not isinstance(data.get('longitude'), (int, float)):
-                errors.append("Longitude must be a number")
-            elif not (-180.0 <= data.get('longitude', 0) <= 180.0):
-                errors.append("Longitude must be between -180 and 180")
+        data, errors = validate_place_data(data, partial=True)
 
         # Return errors if any
         if errors:
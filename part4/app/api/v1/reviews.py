@@ -1,6 +1,17 @@
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.facade import ReviewAlreadyExistsError
+from app.api.v1.pagination import (
+    pagination_parser, get_pagination_args, page_response
+)
+from app.api.v1.conditional import conditional_response
+from app.api.v1.batch import get_batch_items, get_batch_size, run_batch
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import get_identity
+from app.api.v1.imports import import_parser, import_response
+from app.api.v1.export import ndjson_response
+from app.utils.serialization import review_serializer
+from app.utils.validation import review_schema
 
 api = Namespace('reviews', description='Review operations')
 
@@ -20,6 +31,34 @@ review_update_model = api.model('ReviewUpdate', {
     'rating': fields.Integer(description='Rating of the place (1-5)')
 })
 
+# Models for batch operations
+review_batch_input_model = api.model('ReviewBatchInput', {
+    'items': fields.List(fields.Nested(review_model), required=True,
+                         description='Reviews to create')
+})
+
+review_batch_delete_model = api.model('ReviewBatchDelete', {
+    'ids': fields.List(fields.String, required=True,
+                       description='IDs of the reviews to delete')
+})
+
+
+def validate_review_data(data, partial=False):
+    """Check review input data, returning (values, errors)
+
+    values are the checked data to pass on to the facade (see
+    Schema.clean) and errors the list of validation errors. With
+    partial=True only the text and rating present in data are checked,
+    as for updates.
+    """
+    values, errors = review_schema.clean(data, partial)
+
+    # Validate place_id
+    if not partial and not data.get('place_id'):
+        errors.append("Place ID cannot be empty")
+
+    return values, errors
+
 
 @api.route('/')
 class ReviewList(Resource):
@@ -32,13 +71,13 @@ class ReviewList(Resource):
     def post(self):
         """Register a new review (requires authentication)"""
         # Get current user from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Get request data
         review_data = api.payload
 
         # Set user_id to current user's id
-        review_data['user_id'] = current_user
+        review_data['user_id'] = current_user.id
 
         # Validation for place ownership
         place = facade.get_place_by_id(review_data.get('place_id'))
@@ -46,34 +85,16 @@ class ReviewList(Resource):
             return {'error': 'Place not found'}, 404
 
         # Check if user is the owner of the place
-        if place.get('owner_id') == current_user:
+        if place.get('owner_id') == current_user.id:
             return {'error': 'You cannot review your own place'}, 400
 
         # Check if user has already reviewed this place
-        all_reviews = facade.get_all_reviews()
-        for review in all_reviews:
-            if (review.user_id == current_user and
-                    review.place_id == review_data.get('place_id')):
-                return {'error': 'You have already reviewed this place'}, 400
+        if facade.has_user_reviewed_place(
+                current_user.id, review_data.get('place_id')):
+            return {'error': 'You have already reviewed this place'}, 400
 
         # Manual validation of the data
-        errors = []
-
-        # Validate text
-        if not review_data.get('text') or review_data['text'].strip() == "":
-            errors.append("Review text cannot be empty")
-
-        # Validate rating
-        try:
-            rating = int(review_data.get('rating', 0))
-            if not (1 <= rating <= 5):
-                errors.append("Rating must be an integer between 1 and 5")
-        except (ValueError, TypeError):
-            errors.append("Rating must be an integer between 1 and 5")
-
-        # Validate place_id
-        if not review_data.get('place_id'):
-            errors.append("Place ID cannot be empty")
+        review_data, errors = validate_review_data(review_data)
 
         # Return errors if any
         if errors:
@@ -83,20 +104,127 @@ class ReviewList(Resource):
             # Create review using the facade
             review = facade.create_review(review_data)
             return review.to_dict(), 201
+        except ReviewAlreadyExistsError as e:
+            # Lost a race with a concurrent request from the same user
+            return {'error': str(e)}, 400
         except ValueError as e:
             api.abort(400, str(e))
 
+    @api.expect(pagination_parser)
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(304, 'Not modified')
+    @api.response(400, 'Invalid cursor')
+    def get(self):
+        """Retrieve a page of reviews"""
+        limit, after = get_pagination_args()
+        try:
+            # Get one page of reviews using the facade
+            reviews, next_cursor = facade.get_reviews_page(limit, after)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return conditional_response(reviews, lambda: page_response(
+            review_serializer.many(reviews), next_cursor
+        ), next_cursor, collection=True)
+
+
+@api.route('/export')
+class ReviewExport(Resource):
+    @api.response(200, 'Every review, one JSON object per line (NDJSON)')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
     def get(self):
-        """Retrieve a list of all reviews"""
-        # Get all reviews using the facade
-        reviews = facade.get_all_reviews()
-        return [review.to_dict() for review in reviews], 200
+        """Stream every review as NDJSON (admin only)"""
+        if not get_identity().is_admin:
+            return {'error': 'Admin privileges required'}, 403
+        return ndjson_response(facade.export_reviews, review_serializer)
+
+
+@api.route('/import')
+class ReviewImport(Resource):
+    @api.expect(import_parser)
+    @api.response(200, 'File imported, see the per-row errors')
+    @api.response(400, 'Invalid import parameters')
+    @api.response(401, 'Authentication required')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Import reviews from an NDJSON or CSV body (admin only)"""
+        if not get_identity().is_admin:
+            return {'error': 'Admin privileges required'}, 403
+        return import_response('reviews')
+
+
+@api.route('/batch')
+class ReviewBatch(Resource):
+    @api.expect(review_batch_input_model)
+    @api.response(200, 'Batch processed, see per-item results')
+    @api.response(400, 'Invalid batch')
+    @api.response(401, 'Authentication required')
+    @jwt_required()
+    def post(self):
+        """Create many reviews written by the current user"""
+        current_user = get_identity()
+        items, error = get_batch_items(api.payload, 'items')
+        if error:
+            return {'error': error}, 400
+
+        checked = []
+
+        def check(item):
+            if not isinstance(item, dict):
+                return {'error': 'Item must be an object'}
+            values, errors = validate_review_data(item)
+            if errors:
+                return {'error': 'Invalid input data', 'details': errors}
+            values['user_id'] = current_user.id
+            checked.append(values)
+            return None
+
+        def process(valid_items):
+            # The valid items as checked by check(), in the same order
+            return facade.create_reviews(checked, get_batch_size())
+
+        return run_batch(items, check, process), 200
+
+    @api.expect(review_batch_delete_model)
+    @api.response(200, 'Batch processed, see per-item results')
+    @api.response(400, 'Invalid batch')
+    @api.response(401, 'Authentication required')
+    @jwt_required()
+    def delete(self):
+        """Delete many reviews (author or admin only, per item)"""
+        current_user = get_identity()
+        is_admin = current_user.is_admin
+        review_ids, error = get_batch_items(api.payload, 'ids')
+        if error:
+            return {'error': error}, 400
+
+        reviews = facade.get_reviews_by_ids(
+            review_id for review_id in review_ids
+            if isinstance(review_id, str)
+        )
+
+        def check(review_id):
+            review = (
+                reviews.get(review_id) if isinstance(review_id, str) else None
+            )
+            if not review:
+                return {'error': 'Review not found'}
+            if not is_admin and review.user_id != current_user.id:
+                return {'error': 'Unauthorized action'}
+            return None
+
+        def process(valid_ids):
+            return facade.delete_reviews(valid_ids, get_batch_size())
+
+        return run_batch(review_ids, check, process), 200
 
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
     @api.response(200, 'Review details retrieved successfully')
+    @api.response(304, 'Not modified')
     @api.response(404, 'Review not found')
     def get(self, review_id):
         """Get review details by ID"""
@@ -106,7 +234,7 @@ class ReviewResource(Resource):
         if not review:
             api.abort(404, f"Review with id {review_id} not found")
 
-        return review.to_dict(), 200
+        return conditional_response([review], review.to_dict)
 
     @api.expect(review_update_model)
     @api.response(200, 'Review updated successfully')
@@ -118,10 +246,10 @@ class ReviewResource(Resource):
     def put(self, review_id):
         """Update a review's information (requires authentication)"""
         # Get current user from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Set is_admin default to False if not exists
-        is_admin = current_user.get('is_admin', False)
+        is_admin = current_user.is_admin
 
         # Get the review
         review = facade.get_review(review_id)
@@ -130,28 +258,14 @@ class ReviewResource(Resource):
             api.abort(404, f"Review with id {review_id} not found")
 
         # Check if user is the author of the review or an admin
-        if not is_admin and review.user_id != current_user:
+        if not is_admin and review.user_id != current_user.id:
             return {'error': 'Unauthorized action'}, 403
 
         # Get update data
         update_data = api.payload
 
         # Manual validation of the update data
-        errors = []
-
-        # Validate text if provided
-        if 'text' in update_data:
-            if not update_data['text'] or update_data['text'].strip() == "":
-                errors.append("Review text cannot be empty")
-
-        # Validate rating if provided
-        if 'rating' in update_data:
-            try:
-                rating = int(update_data['rating'])
-                if not (1 <= rating <= 5):
-                    errors.append("Rating must be an integer between 1 and 5")
-            except (ValueError, TypeError):
-                errors.append("Rating must be an integer between 1 and 5")
+        update_data, errors = validate_review_data(update_data, partial=True)
 
         # Return errors if any
         if errors:
@@ -172,10 +286,10 @@ class ReviewResource(Resource):
     def delete(self, review_id):
         """Delete a review (requires authentication)"""
         # Get current user from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Set is_admin default to False if not exists
-        is_admin = current_user.get('is_admin', False)
+        is_admin = current_user.is_admin
 
         # Get the review
         review = facade.get_review(review_id)
@@ -184,7 +298,7 @@ class ReviewResource(Resource):
             api.abort(404, f"Review with id {review_id} not found")
 
         # Check if user is the author of the review or an admin
-        if not is_admin and review.user_id != current_user:
+        if not is_admin and review.user_id != current_user.id:
             return {'error': 'Unauthorized action'}, 403
 
         try:
@@ -198,12 +312,16 @@ class ReviewResource(Resource):
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(304, 'Not modified')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get all reviews for a specific place"""
         try:
             # Get reviews for place
             reviews = facade.get_reviews_by_place(place_id)
-            return [review.to_dict() for review in reviews], 200
+            return conditional_response(
+                reviews, lambda: review_serializer.many(reviews),
+                collection=True
+            )
         except ValueError as e:
             api.abort(404, str(e))
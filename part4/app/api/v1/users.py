@@ -1,7 +1,14 @@
 from flask_restx import Namespace, Resource, fields
+from app import token_blocklist
 from app.services import facade
-import re
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.api.v1.pagination import (
+    pagination_parser, get_pagination_args, page_response
+)
+from flask_jwt_extended import jwt_required
+from app.api.v1.identity import get_identity
+from app.utils.passwords import PasswordHasherBusyError
+from app.utils.serialization import user_summary_serializer
+from app.utils.validation import user_schema
 
 api = Namespace('users', description='User operations')
 
@@ -41,12 +48,13 @@ class UserList(Resource):
     @api.response(400, 'Invalid input data')
     @api.response(401, 'Authentication required')
     @api.response(403, 'Admin privileges required')
+    @api.response(503, 'Too many password hashing requests in progress')
     @jwt_required()
     def post(self):
         """Create a new user (admin access only)"""
         # Check if user is admin
-        current_user = get_jwt_identity()
-        if not current_user.get('is_admin', False):
+        current_user = get_identity()
+        if not current_user.is_admin:
             return {'error': 'Admin privileges required'}, 403
 
         user_data = api.payload
@@ -56,24 +64,8 @@ class UserList(Resource):
         if existing_user:
             return {'error': 'Email already registered'}, 400
 
-        # Manual validation of the data
-        errors = []
-
-        # Validate first_name
-        if not user_data.get('first_name') or \
-           user_data['first_name'].strip() == "":
-            errors.append("First name cannot be empty")
-
-        # Validate last_name
-        if not user_data.get('last_name') or \
-           user_data['last_name'].strip() == "":
-            errors.append("Last name cannot be empty")
-
-        # Validate email format
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not user_data.get('email') or not re.match(
-                email_pattern, user_data['email']):
-            errors.append("Invalid email format")
+        # Validate the names and the email format
+        user_data, errors = user_schema.clean(user_data)
 
         # Validate password
         if not user_data.get('password') or len(user_data['password']) < 6:
@@ -85,7 +77,10 @@ class UserList(Resource):
         if errors:
             return {'error': 'Invalid input data', 'details': errors}, 400
 
-        new_user = facade.create_user(user_data)
+        try:
+            new_user = facade.create_user(user_data)
+        except PasswordHasherBusyError:
+            return {'error': 'Server busy, please retry'}, 503
         return {
             'id': new_user.id,
             'first_name': new_user.first_name,
@@ -94,27 +89,26 @@ class UserList(Resource):
             'is_admin': new_user.is_admin
         }, 201
 
+    @api.expect(pagination_parser)
     @api.response(200, 'User list successfully retrieved')
+    @api.response(400, 'Invalid cursor')
     @api.response(401, 'Authentication required')
     @jwt_required()
     def get(self):
-        """Get list of all users (requires authentication)"""
+        """Get a page of users (requires authentication)"""
         # Check if the user is an admin
-        current_user = get_jwt_identity()
-        if not current_user.get('is_admin', False):
+        current_user = get_identity()
+        if not current_user.is_admin:
             return {'error': 'Admin privileges required'}, 403
 
-        users = facade.user_repo.get_all()
-        return [
-            {
-                'id': user.id,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'email': user.email,
-                'is_admin': user.is_admin
-            }
-            for user in users
-        ], 200
+        limit, after = get_pagination_args()
+        try:
+            users, next_cursor = facade.get_users_page(limit, after)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return page_response(
+            user_summary_serializer.many(users), next_cursor
+        ), 200
 
 
 @api.route('/<user_id>')
@@ -127,11 +121,10 @@ class UserResource(Resource):
     def get(self, user_id):
         """Get user details by ID (requires authentication)"""
         # Get current user from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Check if the user is requesting their own data or is an admin
-        if (str(user_id) != current_user and
-                not current_user.get('is_admin', False)):
+        if not current_user.can_access(user_id):
             return {'error': 'Access denied'}, 403
 
         user = facade.get_user(user_id)
@@ -155,14 +148,14 @@ class UserResource(Resource):
     def put(self, user_id):
         """Modify user information (requires authentication)"""
         # Get current user from JWT token
-        current_user = get_jwt_identity()
+        current_user = get_identity()
 
         # Get the user data from request
         user_data = api.payload
 
         # Check if user is the same as the one being modified or an admin
-        is_admin = current_user.get('is_admin', False)
-        is_same_user = str(user_id) == current_user
+        is_admin = current_user.is_admin
+        is_same_user = user_id == current_user.id
 
         # If not the same user and not an admin
         if not is_same_user and not is_admin:
@@ -178,24 +171,10 @@ class UserResource(Resource):
             if existing_user and existing_user.id != user_id:
                 return {'error': 'Email is already in use'}, 400
 
-        # Validate first_name if provided
-        if 'first_name' in user_data and (
-            not user_data.get('first_name') or
-            user_data['first_name'].strip() == ""
-        ):
-            return {'error': 'First name cannot be empty'}, 400
-
-        # Validate last_name if provided
-        if 'last_name' in user_data and (not user_data.get('last_name') or
-                                         user_data['last_name'].strip() == ""):
-            return {'error': 'Last name cannot be empty'}, 400
-
-        # Validate email format if provided
-        if 'email' in user_data:
-            email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-            if not user_data['email'] or not re.match(
-                    email_pattern, user_data['email']):
-                return {'error': 'Invalid email format'}, 400
+        # Validate the names and the email format, if provided
+        user_data, errors = user_schema.clean(user_data, partial=True)
+        if errors:
+            return {'error': errors[0]}, 400
 
         # Validate password if provided
         if 'password' in user_data and len(user_data['password']) < 6:
@@ -204,7 +183,13 @@ class UserResource(Resource):
             }, 400
 
         # Update user
-        updated_user = facade.update_user(user_id, user_data)
+        try:
+            updated_user = facade.update_user(user_id, user_data)
+        except PasswordHasherBusyError:
+            return {'error': 'Server busy, please retry'}, 503
+        if updated_user and 'password' in user_data:
+            # Tokens issued with the old password stop working
+            token_blocklist.revoke_user(user_id)
         if not updated_user:
             return {'error': 'User not found'}, 404
 
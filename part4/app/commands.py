@@ -0,0 +1,136 @@
+"""Flask CLI commands for maintenance tasks (run with `flask <command>`)"""
+import json
+import os
+import time
+
+import click
+
+from app.services.importer import IMPORT_FORMATS, IMPORT_KINDS, read_records
+
+
+def register_commands(app):
+    """Register the maintenance commands on the app's CLI"""
+
+    # Columns added to an existing places table by upgrade-db that must
+    # be computed from the reviews table
+    review_total_columns = {'places.review_count', 'places.rating_sum'}
+
+    @app.cli.command('rebuild-review-totals')
+    def rebuild_review_totals():
+        """Recompute the review aggregates stored on every place."""
+        from app import db
+        from app.persistence.schema import upgrade_schema
+        from app.services import facade
+
+        # Databases created before the aggregates existed lack them
+        for change in upgrade_schema(db.engine, db.metadata):
+            click.echo(f"Added {change}")
+        updated = facade.rebuild_review_totals()
+        click.echo(f"Rebuilt review totals for {updated} places")
+
+    @app.cli.command('create-tables')
+    def create_tables():
+        """Create the database tables that do not exist yet."""
+        from app import db
+
+        db.create_all()
+        click.echo("Database tables created")
+
+    @app.cli.command('upgrade-db')
+    def upgrade_db():
+        """Add the tables, columns and indexes the models gained since the
+        database was created, then backfill the values derived from
+        other columns: place geohashes and, when they were just added,
+        review aggregates."""
+        from app import db
+        from app.persistence.schema import upgrade_schema
+        from app.services import facade
+
+        changes = upgrade_schema(db.engine, db.metadata)
+        db.create_all()
+        for change in changes:
+            click.echo(f"Added {change}")
+        updated = facade.backfill_geohashes()
+        click.echo(f"Computed the geohash of {updated} places")
+        if review_total_columns & set(changes):
+            updated = facade.rebuild_review_totals()
+            click.echo(f"Rebuilt review totals for {updated} places")
+        click.echo("Database schema up to date")
+
+    @app.cli.command('seed-test-user')
+    @click.option('--email', default='test@example.com')
+    @click.option('--password', default='testpassword')
+    def seed_test_user(email, password):
+        """Create a user for local development, if it does not exist."""
+        from app.services import facade
+
+        test_user = facade.get_user_by_email(email)
+        if test_user:
+            click.echo(f"Test user already exists: {test_user.to_dict()}")
+            return
+        test_user = facade.create_user({
+            'first_name': 'Test',
+            'last_name': 'User',
+            'email': email,
+            'password': password
+        })
+        click.echo(f"Test user created successfully: {test_user.to_dict()}")
+
+    @app.cli.command('import-data')
+    @click.argument('kind', type=click.Choice(IMPORT_KINDS))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS),
+                  help='File format, by default from the file extension')
+    @click.option('--batch-size', type=int,
+                  help='Rows per transaction (IMPORT_BATCH_SIZE)')
+    @click.option('--checkpoint', type=click.Path(dir_okay=False),
+                  help='Progress file, updated after every batch; an '
+                       'existing one resumes the import where it stopped')
+    def import_data(kind, path, fmt, batch_size, checkpoint):
+        """Import places, amenities or reviews from an NDJSON or CSV file."""
+        from app.services import facade
+
+        fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        previous = {'last_line': 0, 'succeeded': 0, 'failed': 0}
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint) as f:
+                previous = json.load(f)
+            click.echo(f"Resuming after line {previous['last_line']}")
+
+        def save_checkpoint(result):
+            state = {
+                'kind': kind,
+                'path': os.path.abspath(path),
+                'last_line': result.last_line,
+                'succeeded': previous['succeeded'] + result.succeeded,
+                'failed': previous['failed'] + result.failed
+            }
+            # Written then renamed, so an interruption never leaves a
+            # truncated checkpoint
+            with open(checkpoint + '.tmp', 'w') as f:
+                json.dump(state, f)
+            os.replace(checkpoint + '.tmp', checkpoint)
+
+        start = time.perf_counter()
+        with open(path, encoding='utf-8', newline='') as f:
+            result = facade.import_records(
+                kind, read_records(f, fmt, kind),
+                batch_size=batch_size or app.config['IMPORT_BATCH_SIZE'],
+                skip_to=previous['last_line'],
+                max_errors=app.config['IMPORT_MAX_ERRORS'],
+                checkpoint=save_checkpoint if checkpoint else None
+            )
+        elapsed = time.perf_counter() - start
+
+        for error in result.errors:
+            click.echo(f"line {error['line']}: {error['error']}", err=True)
+        if result.failed > len(result.errors):
+            click.echo(
+                f"... {result.failed - len(result.errors)} more errors",
+                err=True
+            )
+        rows = result.succeeded + result.failed
+        click.echo(
+            f"Imported {result.succeeded} {kind}, {result.failed} rows "
+            f"failed ({rows / elapsed if elapsed else rows:.0f} rows/s)"
+        )
@@ -1,32 +1,30 @@
 from app import db
-from sqlalchemy.orm import validates
-from .base_model import BaseModel
+from app.utils.validation import amenity_schema, select
+from .base_model import BaseModel, created_at_index
 
 
 class Amenity(BaseModel):
     """Amenity model representing a feature available at places"""
     __tablename__ = 'amenities'
+    __table_args__ = (created_at_index('amenities'),)
 
     name = db.Column(db.String(50), nullable=False)
 
-    def __init__(self, name):
-        """Initialize a new amenity"""
+    def __init__(self, name, checked=()):
+        """Initialize a new amenity
+
+        checked: the fields whose value amenity_schema.clean() checked
+        """
         super().__init__()  # Call the parent class's __init__ method
-        self.name = name
+        self.set_fields({'name': name}, checked)
 
-    @validates('name')
-    def validate_name(self, key, name):
-        """Validate the name of the amenity"""
-        if not name or name.strip() == "":
-            raise ValueError("Amenity name cannot be empty")
-        if len(name) > 50:
-            raise ValueError("Amenity name must be a maximum of 50 characters")
-        return name
+    # Validate the name of the amenity
+    validate_name = amenity_schema.validator('name')
 
     def update(self, updated_data):
         """Update the amenity information"""
-        if 'name' in updated_data:
-            self.name = self.validate_name('name', updated_data['name'])
+        # The name hook checks it, unless it was checked already
+        self.set_fields(select(updated_data, ('name',)))
 
     def to_dict(self):
         """Return a dictionary representation of the amenity"""
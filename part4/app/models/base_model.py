@@ -1,6 +1,13 @@
 from app import db
 import uuid
 from datetime import datetime
+from sqlalchemy.orm.attributes import flag_modified, instance_dict
+from app.utils.validation import checked_fields
+
+
+def created_at_index(table):
+    """Index serving the (created_at, id) order of the list endpoints"""
+    return db.Index(f'ix_{table}_created_at_id', 'created_at', 'id')
 
 
 class BaseModel(db.Model):
@@ -9,11 +16,47 @@ class BaseModel(db.Model):
     id = db.Column(
         db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
+    # List endpoints paginate on (created_at, id): every model indexes
+    # both with created_at_index() in its __table_args__
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
         db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # Assign the id up front so it is known before the first flush
+        if self.id is None:
+            self.id = str(uuid.uuid4())
+
+    def set_checked(self, values):
+        """Store values already checked with the model's Schema
+
+        Skips the @validates hooks, which would run the same checks
+        again: only for values from Schema.clean() (see set_fields).
+        """
+        state = instance_dict(self)
+        for key, value in values.items():
+            state[key] = value
+            flag_modified(self, key)
+
+    def set_fields(self, data, checked=None):
+        """Assign the items of data to the attributes of the same name
+
+        The fields in checked, by default the checked fields of a
+        CheckedData (checked_fields()), are stored with set_checked();
+        other items go through their hooks, if any.
+        """
+        if checked is None:
+            checked = checked_fields(data)
+        if checked:
+            self.set_checked({
+                key: value for key, value in data.items() if key in checked
+            })
+        for key, value in data.items():
+            if key not in checked:
+                setattr(self, key, value)
+
     def save(self):
         """Updates the modification timestamp and saves to the database"""
         self.updated_at = datetime.utcnow()
@@ -1,6 +1,9 @@
 from app import db
-from sqlalchemy.orm import validates, relationship
-from .base_model import BaseModel
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import relationship
+from .base_model import BaseModel, created_at_index
+from app.utils.geo import encode_geohash
+from app.utils.validation import place_schema
 
 
 place_amenity = db.Table(
@@ -19,12 +22,29 @@ place_amenity = db.Table(
 class Place(BaseModel):
     """Place model representing a rental property"""
     __tablename__ = 'places'
+    __table_args__ = (
+        created_at_index('places'),
+        # Used by the place search filters; (price, id) is also the
+        # keyset order of the price sorts
+        db.Index('ix_places_price_id', 'price', 'id'),
+        db.Index('ix_places_latitude_longitude', 'latitude', 'longitude'),
+    )
 
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
+    # Geohash of (latitude, longitude), computed when the place is written
+    # (see update_geohash below) and indexed for radius queries
+    geohash = db.Column(db.String(12), nullable=True, index=True)
+    # Review aggregates, maintained by HBnBFacade on every review write
+    review_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
+    rating_sum = db.Column(
+        db.Integer, nullable=False, default=0, server_default='0'
+    )
 
     # Foreign key for the owner (User)
     owner_id = db.Column(
@@ -41,10 +61,11 @@ class Place(BaseModel):
     )
 
     # Many-to-many: Place has many Amenities
+    # Loaded on access; the detail view eager loads them with the owner
     amenities = relationship(
         'Amenity',
         secondary=place_amenity,
-        lazy='subquery',
+        lazy='select',
         backref=db.backref('places', lazy=True)
     )
 
@@ -52,50 +73,35 @@ class Place(BaseModel):
     owner = relationship('User', back_populates='places')
 
     def __init__(
-        self, title, description, price, latitude, longitude, owner_id
+        self, title, description, price, latitude, longitude, owner_id,
+        checked=()
     ):
-        """Initialize a new place"""
+        """Initialize a new place
+
+        checked: the fields whose value place_schema.clean() checked
+        """
         super().__init__()
-        self.title = title
+        self.set_fields({
+            'title': title, 'price': price,
+            'latitude': latitude, 'longitude': longitude
+        }, checked)
         self.description = description or ""
-        self.price = price
-        self.latitude = latitude
-        self.longitude = longitude
         self.owner_id = owner_id
-
-    @validates('title')
-    def validate_title(self, key, title):
-        """Validate the title of the place"""
-        if not title or title.strip() == "":
-            raise ValueError("Title cannot be empty")
-        if len(title) > 100:
-            raise ValueError("Title must be a maximum of 100 characters")
-        return title
-
-    @validates('price')
-    def validate_price(self, key, price):
-        """Validate the price of the place"""
-        if not isinstance(price, (int, float)) or price <= 0:
-            raise ValueError("Price must be a positive number")
-        return price
-
-    @validates('latitude')
-    def validate_latitude(self, key, latitude):
-        """Validate the latitude of the place"""
-        if not isinstance(latitude, (int, float)) or not (
-            -90.0 <= latitude <= 90.0
-        ):
-            raise ValueError("Latitude must be between -90 and 90")
-        return latitude
-
-    @validates('longitude')
-    def validate_longitude(self, key, longitude):
-        """Validate the longitude of the place"""
-        if not isinstance(longitude, (int, float)) or not (
-            -180.0 <= longitude <= 180.0
-        ):
-            raise ValueError("Longitude must be between -180 and 180")
-        return longitude
+        self.review_count = 0
+        self.rating_sum = 0
+
+    # Validate the title, the price and the coordinates of the place
+    validate_title = place_schema.validator('title')
+    validate_price = place_schema.validator('price')
+    validate_latitude = place_schema.validator('latitude')
+    validate_longitude = place_schema.validator('longitude')
+
+    @property
+    def average_rating(self):
+        """Average rating of the place, None when it has no review"""
+        if not self.review_count:
+            return None
+        return round(self.rating_sum / self.review_count, 2)
 
     def add_amenity(self, amenity):
         """Add an amenity to this place"""
@@ -125,14 +131,19 @@ class Place(BaseModel):
         return {
             'id': self.id,
             'title': self.title,
+            'price': self.price,
             'latitude': self.latitude,
-            'longitude': self.longitude
+            'longitude': self.longitude,
+            'review_count': self.review_count,
+            'average_rating': self.average_rating
         }
 
     def to_detail_dict(self):
         """Return a detailed dictionary representation of the place
         with relationships"""
         result = self.to_dict()
+        result['review_count'] = self.review_count
+        result['average_rating'] = self.average_rating
 
         # Add owner information if available
         if self.owner:
@@ -150,3 +161,18 @@ class Place(BaseModel):
         ]
 
         return result
+
+
+@event.listens_for(Place, 'before_insert')
+@event.listens_for(Place, 'before_update')
+def update_geohash(mapper, connection, place):
+    """Recompute the geohash of a place whose coordinates changed
+
+    Runs once per flush rather than on every assignment of a coordinate.
+    """
+    state = inspect(place)
+    if (
+        state.attrs.latitude.history.has_changes()
+        or state.attrs.longitude.history.has_changes()
+    ) and place.latitude is not None and place.longitude is not None:
+        place.geohash = encode_geohash(place.latitude, place.longitude)
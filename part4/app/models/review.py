@@ -1,11 +1,18 @@
 from app import db
-from sqlalchemy.orm import validates
-from .base_model import BaseModel
+from app.utils.validation import review_schema
+from .base_model import BaseModel, created_at_index
 
 
 class Review(BaseModel):
     """Review model representing a user's review of a place"""
     __tablename__ = 'reviews'
+    __table_args__ = (
+        created_at_index('reviews'),
+        # A user can only review a place once
+        db.UniqueConstraint(
+            'user_id', 'place_id', name='uq_reviews_user_place'
+        ),
+    )
 
     text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)
@@ -19,36 +26,25 @@ class Review(BaseModel):
     place_id = db.Column(
         db.String(36),
         db.ForeignKey('places.id'),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     # Relationships are defined in the User and Place models through backref
 
-    def __init__(self, text, rating, place_id, user_id):
-        """Initialize a new review"""
+    def __init__(self, text, rating, place_id, user_id, checked=()):
+        """Initialize a new review
+
+        checked: the fields whose value review_schema.clean() checked
+        """
         super().__init__()
-        self.text = text
-        self.rating = rating
+        self.set_fields({'text': text, 'rating': rating}, checked)
         self.place_id = place_id
         self.user_id = user_id
 
-    @validates('text')
-    def validate_text(self, key, text):
-        """Validate the text of the review"""
-        if not text or text.strip() == "":
-            raise ValueError("Review text cannot be empty")
-        return text
-
-    @validates('rating')
-    def validate_rating(self, key, rating):
-        """Validate the rating of the review"""
-        try:
-            rating = int(rating)
-            if not (1 <= rating <= 5):
-                raise ValueError("Rating must be an integer between 1 and 5")
-        except (ValueError, TypeError):
-            raise ValueError("Rating must be an integer between 1 and 5")
-        return rating
+    # Validate the text and the rating of the review
+    validate_text = review_schema.validator('text')
+    validate_rating = review_schema.validator('rating')
 
     def to_dict(self):
         """Return a dictionary representation of the review"""
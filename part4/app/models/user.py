@@ -1,12 +1,13 @@
-from app import db, bcrypt
-import re
-from sqlalchemy.orm import validates, relationship
-from .base_model import BaseModel
+from app import db, password_hasher
+from sqlalchemy.orm import relationship
+from app.utils.validation import user_schema
+from .base_model import BaseModel, created_at_index
 
 
 class User(BaseModel):
     """User model representing an application user"""
     __tablename__ = 'users'
+    __table_args__ = (created_at_index('users'),)
 
     first_name = db.Column(db.String(50), nullable=False)
     last_name = db.Column(db.String(50), nullable=False)
@@ -32,39 +33,38 @@ class User(BaseModel):
     )
 
     def __init__(
-        self, first_name, last_name, email, password=None, is_admin=False
+        self, first_name, last_name, email, password=None, is_admin=False,
+        checked=()
     ):
-        """Initialize a new user"""
+        """Initialize a new user
+
+        checked: the fields whose value user_schema.clean() checked
+        """
         super().__init__()
-        self.first_name = first_name
-        self.last_name = last_name
-        self.email = email
+        self.set_fields({
+            'first_name': first_name, 'last_name': last_name,
+            'email': email
+        }, checked)
         self.is_admin = is_admin
         if password:
             self.hash_password(password)
 
-    @validates('first_name', 'last_name')
-    def validate_name(self, key, name):
-        """Validate the first name and last name of the user"""
-        if not name or name.strip() == "":
-            raise ValueError(f"{key} cannot be empty.")
-        return name
-
-    @validates('email')
-    def validate_email(self, key, email):
-        """Validate the email of the user"""
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not email or not re.match(email_pattern, email):
-            raise ValueError("Invalid email format.")
-        return email
+    # Validate the names and the email of the user
+    validate_first_name = user_schema.validator('first_name')
+    validate_last_name = user_schema.validator('last_name')
+    validate_email = user_schema.validator('email')
 
     def hash_password(self, password):
         """Hash the password before storing it"""
-        self.password = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password = password_hasher.hash(password)
 
     def verify_password(self, password):
         """Verify that the provided password matches the stored hash"""
-        return bcrypt.check_password_hash(self.password, password)
+        return password_hasher.verify(self.password, password)
+
+    def password_needs_rehash(self):
+        """Whether the stored hash uses an outdated cost factor"""
+        return password_hasher.needs_rehash(self.password)
 
     def to_dict(self):
         """
@@ -0,0 +1,210 @@
+"""Entity cache used by CachedRepository.
+
+The cache stores column snapshots (plain dicts) rather than ORM objects,
+so a cached entity can never share state with an object living in a
+request's session. Entries are keyed by ``namespace:id``.
+
+Two backends are available, selected with ``ENTITY_CACHE_BACKEND``:
+
+- ``'local'``: an in-process LRU with a TTL (the default, and the
+  stand-in used during development and tests)
+- ``'redis'``: a cache shared by every worker, which needs the optional
+  ``redis`` package and ``ENTITY_CACHE_REDIS_URL``
+
+A backend instance can also be given directly in the config.
+
+Write generations, which keep a read started before a write from caching
+its snapshot after the write, are counted per process. With the redis
+backend they only cover the writes of the same worker: a snapshot read
+by one worker while another one writes can stay cached until its TTL
+expires (``ENTITY_CACHE_TTL``).
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+
+
+class LocalCacheBackend:
+    """Thread-safe, size-bounded LRU cache with a time-to-live"""
+
+    def __init__(self, max_size=10000, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'size': len(self._entries), 'evictions': self.evictions}
+
+
+class RedisCacheBackend:
+    """Cache shared between processes, stored in Redis
+
+    Size bounds are enforced by the Redis server (maxmemory with an LRU
+    eviction policy); entries expire after ttl seconds.
+    """
+
+    def __init__(self, url, ttl=300, prefix='hbnb:entity:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "The redis package is required for ENTITY_CACHE_BACKEND "
+                "'redis'; install it or use the 'local' backend"
+            )
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(self.prefix + key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, pickle.dumps(value), ex=self.ttl)
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+    def stats(self):
+        return {}
+
+
+class _CacheState:
+    """Per-application backend, write counters and hit/miss counters"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.writes = {}
+        self.hits = {}
+        self.misses = {}
+
+
+class EntityCache:
+    """Flask extension giving repositories access to the entity cache"""
+
+    def init_app(self, app):
+        backend = None
+        if app.config.get('ENTITY_CACHE_ENABLED', False):
+            backend = self._create_backend(app.config)
+        app.extensions['entity_cache'] = _CacheState(backend)
+
+    @staticmethod
+    def _create_backend(config):
+        backend = config.get('ENTITY_CACHE_BACKEND', 'local')
+        ttl = config.get('ENTITY_CACHE_TTL', 300)
+        if backend == 'local':
+            return LocalCacheBackend(
+                config.get('ENTITY_CACHE_MAX_SIZE', 10000), ttl
+            )
+        if backend == 'redis':
+            return RedisCacheBackend(config['ENTITY_CACHE_REDIS_URL'], ttl)
+        if isinstance(backend, str):
+            raise ValueError(f"Unknown ENTITY_CACHE_BACKEND: {backend}")
+        # A ready-made backend object
+        return backend
+
+    @property
+    def _state(self):
+        return current_app.extensions.get('entity_cache')
+
+    @property
+    def enabled(self):
+        state = self._state
+        return state is not None and state.backend is not None
+
+    def generation(self, namespace):
+        """Number of writes seen for a namespace
+
+        A value loaded from the database is only cached if no write
+        happened while it was being loaded, so a slow read can never put
+        back data that a concurrent write just invalidated. Generations
+        are per process: writes made by other workers sharing the redis
+        backend are not seen.
+        """
+        return self._state.writes.get(namespace, 0)
+
+    def get(self, namespace, obj_id):
+        state = self._state
+        value = state.backend.get(f'{namespace}:{obj_id}')
+        counter = state.hits if value is not None else state.misses
+        with state.lock:
+            counter[namespace] = counter.get(namespace, 0) + 1
+        return value
+
+    def set(self, namespace, obj_id, value, generation):
+        state = self._state
+        # Compare and store under the lock invalidate() takes to count a
+        # write: a write counted after the comparison would otherwise
+        # delete the key before the stale value is stored
+        with state.lock:
+            if state.writes.get(namespace, 0) == generation:
+                state.backend.set(f'{namespace}:{obj_id}', value)
+
+    def invalidate(self, namespace, obj_ids):
+        state = self._state
+        with state.lock:
+            state.writes[namespace] = state.writes.get(namespace, 0) + 1
+        for obj_id in obj_ids:
+            state.backend.delete(f'{namespace}:{obj_id}')
+
+    def clear(self):
+        if self.enabled:
+            self._state.backend.clear()
+
+    def stats(self):
+        """Hit/miss counters per namespace plus backend statistics"""
+        state = self._state
+        if state is None or state.backend is None:
+            return {'enabled': False}
+        namespaces = {}
+        for namespace in set(state.hits) | set(state.misses):
+            hits = state.hits.get(namespace, 0)
+            misses = state.misses.get(namespace, 0)
+            namespaces[namespace] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_ratio': round(hits / (hits + misses), 4)
+            }
+        return {
+            'enabled': True,
+            'namespaces': namespaces,
+            'backend': state.backend.stats()
+        }
@@ -0,0 +1,150 @@
+"""Engine setup: connection pool timing and SQLite pragmas.
+
+Engine options (pool size, overflow, recycle, pre-ping) come from
+``SQLALCHEMY_ENGINE_OPTIONS`` in each config class. On top of those:
+
+- pooled engines use TimedQueuePool, which measures how long each
+  checkout waits for a free connection; ``pool_stats()`` reports the
+  totals, and waits above ``DB_POOL_WAIT_WARN_MS`` are logged, which
+  tells when the pool is too small for the request concurrency
+- SQLite connections get ``SQLITE_PRAGMAS`` (WAL journal, synchronous
+  NORMAL, busy timeout) as soon as they are opened
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolWaitStats:
+    """Thread-safe totals of the time spent waiting for a connection"""
+
+    def __init__(self, warn_after=None):
+        self.warn_after = warn_after
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait, timed_out=False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+        if self.warn_after is not None and wait > self.warn_after:
+            logger.warning(
+                "Waited %.1f ms for a database connection", wait * 1000
+            )
+
+    def to_dict(self):
+        return {
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'wait_total_ms': round(self.total_wait * 1000, 3),
+            'wait_avg_ms': round(
+                self.total_wait * 1000 / self.checkouts, 3
+            ) if self.checkouts else 0.0,
+            'wait_max_ms': round(self.max_wait * 1000, 3)
+        }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool recording how long each checkout waits"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self):
+        # Keep the totals when the engine is disposed
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.wait_stats.record(time.perf_counter() - start, True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+
+# Pools log under their class name: keep this one as quiet as the stock
+# pools instead of inheriting the DEBUG level Flask gives the app logger
+logging.getLogger(f'{__name__}.TimedQueuePool').setLevel(logging.WARNING)
+
+
+def _is_memory_sqlite(url):
+    url = make_url(url)
+    return url.get_backend_name() == 'sqlite' and url.database in (
+        None, '', ':memory:'
+    )
+
+
+def engine_options_for(uri, options):
+    """Engine options for uri, using TimedQueuePool unless they pick a pool
+
+    In-memory SQLite databases keep the single-connection pool
+    Flask-SQLAlchemy gives them.
+    """
+    options = dict(options or {})
+    if not _is_memory_sqlite(uri):
+        options.setdefault('poolclass', TimedQueuePool)
+    return options
+
+
+def configure_engine_options(app):
+    """Set the engine options of the default bind
+
+    Called before SQLAlchemy.init_app.
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if uri:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_for(
+            uri, app.config.get('SQLALCHEMY_ENGINE_OPTIONS')
+        )
+
+
+def install_engine_events(engine, config):
+    """Apply the SQLite pragmas and the slow checkout warning"""
+    if isinstance(engine.pool, TimedQueuePool):
+        warn_ms = config.get('DB_POOL_WAIT_WARN_MS')
+        engine.pool.wait_stats.warn_after = (
+            warn_ms / 1000 if warn_ms is not None else None
+        )
+
+    pragmas = config.get('SQLITE_PRAGMAS') or {}
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+
+def pool_stats(engine):
+    """Pool size and usage plus checkout wait totals, for monitoring"""
+    pool = engine.pool
+    stats = {'pool': pool.__class__.__name__, 'status': pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        })
+    if isinstance(pool, TimedQueuePool):
+        stats['wait'] = pool.wait_stats.to_dict()
+    return stats
@@ -1,5 +1,49 @@
+import base64
+import json
 from abc import ABC, abstractmethod
-from app import db  # Import the SQLAlchemy instance
+from datetime import datetime
+from sqlalchemy import and_, or_, inspect, insert
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from app import db, entity_cache, response_cache
+from app.persistence.routing import REPLICA_OPTION, primary_reads
+
+
+def encode_cursor(obj):
+    """Build an opaque pagination cursor from an object's sort key"""
+    created_at = obj.created_at or datetime.min
+    raw = f"{created_at.isoformat()}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (created_at, id) sort key stored in a cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, obj_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), obj_id
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def encode_key_cursor(values):
+    """Build an opaque cursor from a list of JSON-compatible sort values"""
+    raw = json.dumps(values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_key_cursor(cursor):
+    """Return the list of sort values stored by encode_key_cursor"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
 
 
 class Repository(ABC):
@@ -8,26 +52,69 @@ class Repository(ABC):
     def add(self, obj):
         pass
 
+    @abstractmethod
+    def add_many(self, objs):
+        """Add several objects in a single transaction"""
+        pass
+
     @abstractmethod
     def get(self, obj_id):
         pass
 
+    @abstractmethod
+    def get_many(self, obj_ids):
+        """Return the objects matching the given ids, in any order"""
+        pass
+
     @abstractmethod
     def get_all(self):
         pass
 
+    @abstractmethod
+    def get_page(self, limit, after=None):
+        """Return (objects, next_cursor) ordered by (created_at, id)"""
+        pass
+
+    @abstractmethod
+    def iter_all(self, batch_size):
+        """Yield every object ordered by (created_at, id), reading
+        batch_size objects at a time instead of the whole table"""
+        pass
+
     @abstractmethod
     def update(self, obj_id, data):
         pass
 
+    @abstractmethod
+    def update_many(self, updates):
+        """Apply {obj_id: data} updates in a single transaction"""
+        pass
+
     @abstractmethod
     def delete(self, obj_id):
         pass
 
+    @abstractmethod
+    def delete_many(self, obj_ids):
+        """Delete several objects in one transaction, returning their ids"""
+        pass
+
     @abstractmethod
     def get_by_attribute(self, attr_name, attr_value):
         pass
 
+    @abstractmethod
+    def get_all_by_attribute(self, attr_name, attr_value):
+        pass
+
+    def snapshot(self, obj):
+        """Return a cacheable copy of obj (see CachedRepository)"""
+        return obj
+
+    def restore(self, snapshot):
+        """Turn a value returned by snapshot back into a usable object"""
+        return snapshot
+
 
 class InMemoryRepository(Repository):
     def __init__(self):
@@ -36,21 +123,61 @@ class InMemoryRepository(Repository):
     def add(self, obj):
         self._storage[obj.id] = obj
 
+    def add_many(self, objs):
+        for obj in objs:
+            self.add(obj)
+
     def get(self, obj_id):
         return self._storage.get(obj_id)
 
+    def get_many(self, obj_ids):
+        return [
+            self._storage[obj_id] for obj_id in set(obj_ids)
+            if obj_id in self._storage
+        ]
+
     def get_all(self):
         return list(self._storage.values())
 
+    def get_page(self, limit, after=None):
+        def sort_key(obj):
+            return (obj.created_at or datetime.min, obj.id)
+
+        objects = sorted(self._storage.values(), key=sort_key)
+        if after:
+            after_key = decode_cursor(after)
+            objects = [obj for obj in objects if sort_key(obj) > after_key]
+        page = objects[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(objects) > limit else None
+        return page, next_cursor
+
+    def iter_all(self, batch_size):
+        yield from sorted(
+            self._storage.values(),
+            key=lambda obj: (obj.created_at or datetime.min, obj.id)
+        )
+
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
             obj.update(data)
 
+    def update_many(self, updates):
+        for obj_id, data in updates.items():
+            self.update(obj_id, data)
+
     def delete(self, obj_id):
         if obj_id in self._storage:
             del self._storage[obj_id]
 
+    def delete_many(self, obj_ids):
+        deleted = [
+            obj_id for obj_id in set(obj_ids) if obj_id in self._storage
+        ]
+        for obj_id in deleted:
+            self.delete(obj_id)
+        return deleted
+
     def get_by_attribute(self, attr_name, attr_value):
         return next(
             (
@@ -60,6 +187,12 @@ class InMemoryRepository(Repository):
             None
         )
 
+    def get_all_by_attribute(self, attr_name, attr_value):
+        return [
+            obj for obj in self._storage.values()
+            if getattr(obj, attr_name) == attr_value
+        ]
+
 
 class SQLAlchemyRepository(Repository):
     """SQLAlchemy implementation of the Repository interface"""
@@ -67,28 +200,314 @@ class SQLAlchemyRepository(Repository):
     def __init__(self, model):
         self.model = model
 
+    def _read_query(self):
+        """Query for reads, served by the read replica when there is one
+
+        Writes, and the lookups they depend on, use self.model.query so
+        they always see the primary (see app/persistence/routing.py).
+        """
+        return self.model.query.execution_options(**REPLICA_OPTION)
+
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
+        self._commit()
+
+    def add_many(self, objs):
+        """Insert all objects with one flush (executemany) and one commit"""
+        db.session.add_all(objs)
+        self._commit()
 
     def get(self, obj_id):
-        return self.model.query.get(obj_id)
+        return db.session.get(
+            self.model, obj_id, execution_options=REPLICA_OPTION
+        )
+
+    def get_many(self, obj_ids):
+        return self._get_many(self._read_query(), obj_ids)
+
+    def _get_many(self, query, obj_ids):
+        obj_ids = list(set(obj_ids))
+        if not obj_ids:
+            return []
+        return query.filter(self.model.id.in_(obj_ids)).all()
 
     def get_all(self):
-        return self.model.query.all()
+        return self._read_query().all()
+
+    def get_page(self, limit, after=None):
+        """Keyset pagination: seek past the cursor instead of using OFFSET"""
+        query = self._read_query()
+        if after:
+            created_at, obj_id = decode_cursor(after)
+            query = query.filter(or_(
+                self.model.created_at > created_at,
+                and_(
+                    self.model.created_at == created_at,
+                    self.model.id > obj_id
+                )
+            ))
+        objects = query.order_by(
+            self.model.created_at, self.model.id
+        ).limit(limit + 1).all()
+        page = objects[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(objects) > limit else None
+        return page, next_cursor
+
+    def iter_all(self, batch_size):
+        """Stream the table with yield_per: rows are fetched from the
+        cursor batch_size at a time, and objects no longer referenced
+        leave the session's (weak) identity map"""
+        yield from self._read_query().order_by(
+            self.model.created_at, self.model.id
+        ).yield_per(batch_size)
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
+        obj = self.model.query.get(obj_id)
         if obj:
-            for key, value in data.items():
-                setattr(obj, key, value)
+            try:
+                obj.set_fields(data)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+    def update_many(self, updates):
+        """Load the objects with one query and commit all changes at once"""
+        try:
+            for obj in self._get_many(self.model.query, updates.keys()):
+                obj.set_fields(updates[obj.id])
             db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
 
     def delete(self, obj_id):
-        obj = self.get(obj_id)
+        obj = self.model.query.get(obj_id)
         if obj:
             db.session.delete(obj)
+            self._commit()
+
+    def delete_many(self, obj_ids):
+        """Delete through the ORM so cascades apply, in one transaction"""
+        objs = self._get_many(self.model.query, obj_ids)
+        deleted = [obj.id for obj in objs]
+        for obj in objs:
+            db.session.delete(obj)
+        self._commit()
+        return deleted
+
+    def existing_ids(self, obj_ids):
+        """Return the subset of obj_ids present in the table
+
+        Only reads the primary key, for foreign key checks in bulk.
+        """
+        obj_ids = list(set(obj_ids))
+        if not obj_ids:
+            return set()
+        rows = self.model.query.with_entities(self.model.id).filter(
+            self.model.id.in_(obj_ids)
+        )
+        return {row.id for row in rows}
+
+    def insert_rows(self, rows):
+        """Insert complete column dicts with one executemany and commit
+
+        Bypasses the ORM unit of work, for bulk imports: rows must
+        already be validated and carry their id and timestamps.
+        """
+        self._execute_and_commit([(insert(self.model.__table__), rows)])
+
+    def _execute_and_commit(self, statements):
+        """Run (statement, parameter list) pairs in one transaction"""
+        try:
+            for statement, params in statements:
+                if params:
+                    db.session.execute(statement, params)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _commit(self):
+        """Commit the session, rolling back if the commit fails"""
+        try:
             db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def get_by_attribute(self, attr_name, attr_value):
+        return self._read_query().filter_by(
+            **{attr_name: attr_value}
+        ).first()
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Return every row matching the attribute, filtered in SQL"""
+        return self._read_query().filter_by(
+            **{attr_name: attr_value}
+        ).all()
+
+    def snapshot(self, obj):
+        """Return the loaded column values of obj as a plain dict"""
+        state = inspect(obj)
+        return {
+            attr.key: state.dict[attr.key]
+            for attr in state.mapper.column_attrs
+            if attr.key in state.dict
+        }
+
+    def restore(self, snapshot):
+        """Attach a snapshot to the session as a persistent object
+
+        No SQL is emitted; an object already in the session wins since it
+        is at least as fresh as the snapshot.
+        """
+        key = identity_key(self.model, snapshot['id'])
+        existing = db.session.identity_map.get(key)
+        if existing is not None:
+            return existing
+        # Build the object without __init__ so validators don't run again
+        obj = self.model.__mapper__.class_manager.new_instance()
+        for attr_name, value in snapshot.items():
+            set_committed_value(obj, attr_name, value)
+        make_transient_to_detached(obj)
+        db.session.add(obj)
+        return obj
+
+
+class CachedRepository(Repository):
+    """Read-through cache in front of another repository
+
+    get and get_many are served from the entity cache (see
+    app/persistence/cache.py); misses are read from the primary, never
+    the replica, so a lagging replica cannot pin a stale row in the
+    cache. Every write through this repository invalidates the objects
+    it touches. Other methods, including ones
+    specific to the wrapped repository, are passed through unchanged.
+    """
+
+    def __init__(self, repository, namespace):
+        self.repository = repository
+        self.namespace = namespace
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+    def add(self, obj):
+        try:
+            self.repository.add(obj)
+        finally:
+            self._invalidate([obj.id])
+
+    def add_many(self, objs):
+        try:
+            self.repository.add_many(objs)
+        finally:
+            self._invalidate([obj.id for obj in objs])
+
+    def get(self, obj_id):
+        if not entity_cache.enabled:
+            return self.repository.get(obj_id)
+        cached = entity_cache.get(self.namespace, obj_id)
+        if cached is not None:
+            return self.repository.restore(cached)
+        generation = entity_cache.generation(self.namespace)
+        with primary_reads():
+            obj = self.repository.get(obj_id)
+        if obj is not None:
+            entity_cache.set(
+                self.namespace, obj_id, self.repository.snapshot(obj),
+                generation
+            )
+        return obj
+
+    def get_many(self, obj_ids):
+        if not entity_cache.enabled:
+            return self.repository.get_many(obj_ids)
+        objs = []
+        missing = []
+        for obj_id in set(obj_ids):
+            cached = entity_cache.get(self.namespace, obj_id)
+            if cached is not None:
+                objs.append(self.repository.restore(cached))
+            else:
+                missing.append(obj_id)
+        if missing:
+            generation = entity_cache.generation(self.namespace)
+            with primary_reads():
+                found = self.repository.get_many(missing)
+            for obj in found:
+                entity_cache.set(
+                    self.namespace, obj.id, self.repository.snapshot(obj),
+                    generation
+                )
+                objs.append(obj)
+        return objs
+
+    def get_all(self):
+        return self.repository.get_all()
+
+    def get_page(self, limit, after=None):
+        return self.repository.get_page(limit, after)
+
+    def iter_all(self, batch_size):
+        return self.repository.iter_all(batch_size)
+
+    def update(self, obj_id, data):
+        try:
+            self.repository.update(obj_id, data)
+        finally:
+            self._invalidate([obj_id])
+
+    def update_many(self, updates):
+        try:
+            self.repository.update_many(updates)
+        finally:
+            self._invalidate(list(updates))
+
+    def delete(self, obj_id):
+        try:
+            self.repository.delete(obj_id)
+        finally:
+            self._invalidate([obj_id])
+
+    def delete_many(self, obj_ids):
+        try:
+            return self.repository.delete_many(obj_ids)
+        finally:
+            self._invalidate(obj_ids)
 
     def get_by_attribute(self, attr_name, attr_value):
-        return self.model.query.filter_by(**{attr_name: attr_value}).first()
+        return self.repository.get_by_attribute(attr_name, attr_value)
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        return self.repository.get_all_by_attribute(attr_name, attr_value)
+
+    def insert_rows(self, rows, **kwargs):
+        try:
+            self.repository.insert_rows(rows, **kwargs)
+        finally:
+            self._invalidate([row['id'] for row in rows])
+
+    def invalidate(self, obj_ids):
+        """Drop cached objects changed without going through this class"""
+        self._invalidate(obj_ids)
+
+    def invalidate_all(self):
+        """Drop every cached object, after a bulk change in the database"""
+        response_cache.invalidate(self.namespace)
+        if entity_cache.enabled:
+            entity_cache.invalidate(self.namespace, [])
+            entity_cache.clear()
+
+    def stats(self):
+        """Hit/miss counters for this repository's namespace"""
+        return entity_cache.stats().get('namespaces', {}).get(
+            self.namespace, {'hits': 0, 'misses': 0}
+        )
+
+    def _invalidate(self, obj_ids):
+        # Cached list responses built from this namespace are stale too
+        response_cache.invalidate(self.namespace)
+        if entity_cache.enabled:
+            entity_cache.invalidate(self.namespace, obj_ids)
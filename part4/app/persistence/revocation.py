@@ -0,0 +1,203 @@
+"""Revocation store for JWTs, checked by flask_jwt_extended on every request.
+
+Two kinds of entries are kept, both looked up by key in constant time:
+
+- ``jti:<token id>``: a single revoked token (logout), kept until the
+  token would have expired anyway
+- ``user:<user id>``: every token of a user issued up to a point in time
+  (compromised account, password change), kept for the longest token
+  lifetime. The standard ``iat`` claim is in whole seconds, so tokens
+  also carry their issue time to the microsecond (``issue_claims()``):
+  a login right after the revocation, in the same second, stays valid
+
+Entries carry their own expiry, so the store never holds more than the
+tokens revoked during one token lifetime. A revocation is never dropped
+before it expires: that would make the token valid again. Backends are
+selected with ``REVOCATION_BACKEND``:
+
+- ``'local'``: an in-process expiring set (the default, except in
+  production); each process has its own, so use it with a single worker
+  or for development. It holds at most ``REVOCATION_MAX_SIZE`` token
+  revocations: once full, revoking another token raises
+  RevocationStoreFullError until some expire
+- ``'redis'``: a store shared by every worker, which needs the optional
+  ``redis`` package and ``REVOCATION_REDIS_URL`` (the production
+  default)
+
+A backend instance can also be given directly in the config, for
+example a fake standing in for the shared store in tests.
+"""
+import heapq
+import threading
+import time
+
+from flask import current_app
+
+
+# Claim holding the issue time of a token in seconds, with a fraction
+ISSUED_AT_CLAIM = 'issued_at'
+
+
+class RevocationStoreFullError(RuntimeError):
+    """The revocation store cannot record another token"""
+
+
+class LocalRevocationBackend:
+    """Thread-safe expiring set, bounded to max_size token entries
+
+    Expired entries are dropped as new ones are added; live ones are
+    never evicted. When max_size live entries are stored, a new one is
+    refused with RevocationStoreFullError. Per-user entries (``user:``
+    keys) are always accepted: there is at most one per user.
+    """
+
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.rejected = 0
+        # Number of user: entries, which max_size does not count
+        self._users = 0
+        self._entries = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._prune()
+            if key not in self._entries:
+                if key.startswith('user:'):
+                    self._users += 1
+                elif len(self._entries) - self._users >= self.max_size:
+                    self.rejected += 1
+                    raise RevocationStoreFullError(
+                        f"{self.max_size} token revocations are stored and "
+                        "none has expired yet"
+                    )
+            self._entries[key] = (value, expires_at)
+            heapq.heappush(self._expiry, (expires_at, key))
+
+    def _prune(self):
+        """Drop the expired entries"""
+        now = time.time()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            # Skip heap items left behind when a key was set again
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[key]
+                if key.startswith('user:'):
+                    self._users -= 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._expiry.clear()
+            self._users = 0
+
+    def stats(self):
+        return {'size': len(self._entries), 'rejected': self.rejected}
+
+
+class RedisRevocationBackend:
+    """Revocation store shared between processes, stored in Redis
+
+    Each entry is a key expiring at the same time as the entry.
+    """
+
+    def __init__(self, url, prefix='hbnb:revoked:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError(
+                "The redis package is required for REVOCATION_BACKEND "
+                "'redis'; install it or use the 'local' backend"
+            )
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(self.prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value, expires_at):
+        ttl = int(expires_at - time.time()) + 1
+        if ttl > 0:
+            self._client.set(self.prefix + key, value, ex=ttl)
+
+    def clear(self):
+        keys = list(self._client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self._client.delete(*keys)
+
+    def stats(self):
+        return {}
+
+
+class TokenBlocklist:
+    """Flask extension recording revoked tokens and users"""
+
+    def init_app(self, app):
+        app.extensions['token_blocklist'] = self._create_backend(app.config)
+
+    @staticmethod
+    def _create_backend(config):
+        backend = config.get('REVOCATION_BACKEND', 'local')
+        if backend == 'local':
+            return LocalRevocationBackend(
+                config.get('REVOCATION_MAX_SIZE', 100000)
+            )
+        if backend == 'redis':
+            return RedisRevocationBackend(config['REVOCATION_REDIS_URL'])
+        if isinstance(backend, str):
+            raise ValueError(f"Unknown REVOCATION_BACKEND: {backend}")
+        # A ready-made backend object
+        return backend
+
+    @property
+    def _backend(self):
+        return current_app.extensions['token_blocklist']
+
+    def revoke_token(self, jwt_data):
+        """Revoke one token, given its decoded claims
+
+        Raises:
+            RevocationStoreFullError: If a local store is full
+        """
+        self._backend.set(f"jti:{jwt_data['jti']}", '1', jwt_data['exp'])
+
+    @staticmethod
+    def issue_claims():
+        """Claims to add to every new token: its precise issue time"""
+        return {ISSUED_AT_CLAIM: time.time()}
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to a user until now"""
+        now = time.time()
+        lifetime = max(
+            current_app.config['JWT_ACCESS_TOKEN_EXPIRES'],
+            current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+        ).total_seconds()
+        self._backend.set(f'user:{user_id}', repr(now), now + lifetime)
+
+    def is_revoked(self, jwt_data):
+        """Whether a token, given its decoded claims, has been revoked"""
+        backend = self._backend
+        if backend.get(f"jti:{jwt_data['jti']}") is not None:
+            return True
+        revoked_at = backend.get(f"user:{jwt_data['sub']}")
+        if revoked_at is None:
+            return False
+        # Tokens issued without the claim only have the whole second
+        issued_at = jwt_data.get(ISSUED_AT_CLAIM, jwt_data['iat'])
+        return issued_at <= float(revoked_at)
+
+    def clear(self):
+        self._backend.clear()
+
+    def stats(self):
+        return self._backend.stats()
@@ -0,0 +1,94 @@
+"""Read replica routing for db.session.
+
+When ``SQLALCHEMY_REPLICA_URI`` is set, the app gets a ``'replica'`` bind
+and SELECTs flagged with the ``use_replica`` execution option (the reads
+of SQLAlchemyRepository) run there. Everything else, including flushes,
+bulk statements, lazy loads and refreshes, uses the primary.
+
+Replicas lag behind the primary, so once the session has written
+anything, every read for the rest of the application context (one
+request) goes to the primary: a client always sees its own writes.
+Reads filling a cache (see ``primary_reads``) also use the primary: a
+lagging replica would otherwise pin a stale row in the cache for its
+whole TTL.
+"""
+from contextlib import contextmanager
+
+from flask import g, has_app_context
+from sqlalchemy import event
+
+from app.persistence.engine import engine_options_for
+
+REPLICA_BIND = 'replica'
+
+# Execution option marking a query that may read from the replica
+REPLICA_OPTION = {'use_replica': True}
+
+
+def configure_replica(app):
+    """Add the replica bind from SQLALCHEMY_REPLICA_URI, if set
+
+    The replica gets the same engine options as the primary. Called
+    before SQLAlchemy.init_app.
+    """
+    uri = app.config.get('SQLALCHEMY_REPLICA_URI')
+    if uri:
+        binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault(REPLICA_BIND, dict(
+            engine_options_for(
+                uri, app.config.get('SQLALCHEMY_ENGINE_OPTIONS')
+            ),
+            url=uri
+        ))
+        app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def mark_written():
+    """Send the remaining reads of this request to the primary"""
+    if has_app_context():
+        g.read_from_primary = True
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads made inside the block to the primary
+
+    Used when what is read outlives the request, like entity and
+    response cache entries.
+    """
+    if not has_app_context():
+        yield
+        return
+    depth = g.get('primary_reads', 0)
+    g.primary_reads = depth + 1
+    try:
+        yield
+    finally:
+        g.primary_reads = depth
+
+
+def reads_from_primary():
+    """Whether reads of the current request must go to the primary"""
+    return has_app_context() and (
+        g.get('read_from_primary', False) or g.get('primary_reads', 0) > 0
+    )
+
+
+def install_read_replica(db):
+    """Route flagged reads to the replica and track writes on db.session"""
+
+    @event.listens_for(db.session, 'do_orm_execute')
+    def route_statement(orm_execute_state):
+        if not orm_execute_state.is_select:
+            mark_written()
+        elif (
+            orm_execute_state.execution_options.get('use_replica')
+            and not reads_from_primary()
+        ):
+            replica = db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                orm_execute_state.bind_arguments['bind'] = replica
+
+    @event.listens_for(db.session, 'after_flush')
+    def after_flush(session, flush_context):
+        mark_written()
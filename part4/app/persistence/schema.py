@@ -0,0 +1,78 @@
+"""In-place upgrade of databases created by older versions of the models.
+
+``db.create_all()`` creates the missing tables but never alters an
+existing one, so a database created before a column or an index was
+added to a model lacks it, and the first query using it fails.
+``upgrade_schema`` adds what is missing to the existing tables:
+
+- columns, with ``ALTER TABLE ... ADD COLUMN``; existing rows get the
+  column's server default, or NULL
+- indexes, and named unique constraints as unique indexes (SQLite cannot
+  add a constraint to an existing table)
+
+Nothing is dropped or changed. Values derived from other columns, like
+the geohash of places, are backfilled by the ``upgrade-db`` command.
+"""
+from sqlalchemy import UniqueConstraint, inspect, text
+from sqlalchemy.schema import CreateColumn
+
+
+def _add_column(connection, table, column):
+    preparer = connection.dialect.identifier_preparer
+    definition = CreateColumn(column).compile(dialect=connection.dialect)
+    connection.execute(text(
+        f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN {definition}'
+    ))
+
+
+def _add_unique_index(connection, table, constraint):
+    preparer = connection.dialect.identifier_preparer
+    columns = ', '.join(
+        preparer.format_column(column) for column in constraint.columns
+    )
+    connection.execute(text(
+        f'CREATE UNIQUE INDEX {preparer.quote(constraint.name)} '
+        f'ON {preparer.format_table(table)} ({columns})'
+    ))
+
+
+def upgrade_schema(engine, metadata):
+    """Add the missing columns and indexes of metadata's tables to engine
+
+    Tables that do not exist are left to ``db.create_all()``.
+
+    Returns:
+        list: Descriptions of the changes, e.g. 'places.geohash'
+    """
+    changes = []
+    with engine.begin() as connection:
+        inspector = inspect(connection)
+        existing_tables = set(inspector.get_table_names())
+        for table in metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {
+                column['name'] for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if column.name not in columns:
+                    _add_column(connection, table, column)
+                    changes.append(f'{table.name}.{column.name}')
+
+            indexes = {
+                index['name'] for index in inspector.get_indexes(table.name)
+            } | {
+                constraint['name']
+                for constraint in inspector.get_unique_constraints(table.name)
+            }
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(connection)
+                    changes.append(f'index {index.name}')
+            for constraint in table.constraints:
+                if isinstance(constraint, UniqueConstraint) and (
+                    constraint.name and constraint.name not in indexes
+                ):
+                    _add_unique_index(connection, table, constraint)
+                    changes.append(f'unique index {constraint.name}')
+    return changes
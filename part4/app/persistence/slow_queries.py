@@ -0,0 +1,183 @@
+"""Slow-query log.
+
+Statements running longer than ``SLOW_QUERY_THRESHOLD_MS`` are written,
+one JSON object per line, to ``SLOW_QUERY_LOG_FILE`` (the instance
+folder's slow_queries.log by default), a file rotated every
+``SLOW_QUERY_LOG_MAX_BYTES`` with ``SLOW_QUERY_LOG_BACKUPS`` old files
+kept. Each sample has:
+
+- the statement and the shape of its bind parameters (types, not
+  values, which may be personal data)
+- the facade and repository methods that ran it, from the call stack
+- its query plan: ``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` on other
+  engines, run right after the statement on the same connection, for
+  SELECT, UPDATE and DELETE statements only
+
+A scan of a large table in the plan (``SCAN places`` rather than
+``SEARCH places USING INDEX ...``) is the usual sign of a missing index.
+Only statements over the threshold pay for the stack walk and the plan.
+"""
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+# Samples only go to the slow-query file, not to the application logs
+logger.propagate = False
+logger.setLevel(logging.INFO)
+
+# Modules whose frames name the caller of a statement
+FACADE_MODULE = 'app.services.facade'
+REPOSITORY_MODULES = (
+    'app.persistence.repository', 'app.services.repositories'
+)
+
+# Bind parameters listed in a sample, e.g. for large IN lists
+MAX_PARAMETERS = 20
+
+# Statements whose plan is logged
+EXPLAINED_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+_handlers = {}
+_handlers_lock = threading.Lock()
+
+
+def _add_handler(path, max_bytes, backups):
+    """Write the samples to path, once per path"""
+    path = os.path.abspath(path)
+    with _handlers_lock:
+        if path in _handlers:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, delay=True
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        _handlers[path] = handler
+
+
+def parameter_shapes(parameters, executemany=False):
+    """Type names of the bind parameters, in the form they were given"""
+    if executemany:
+        rows = list(parameters or [])
+        return {
+            'rows': len(rows),
+            'first': parameter_shapes(rows[0]) if rows else None
+        }
+    if isinstance(parameters, dict):
+        items = list(parameters.items())
+        shapes = {
+            key: type(value).__name__
+            for key, value in items[:MAX_PARAMETERS]
+        }
+    else:
+        items = list(parameters or ())
+        shapes = [type(value).__name__ for value in items[:MAX_PARAMETERS]]
+    if len(items) > MAX_PARAMETERS:
+        return {'count': len(items), 'first': shapes}
+    return shapes
+
+
+def find_callers(frame):
+    """Qualified names of the facade and repository methods on the stack"""
+    callers = {'facade': None, 'repository': None}
+    while frame is not None and callers['facade'] is None:
+        module = frame.f_globals.get('__name__', '')
+        code = frame.f_code
+        name = getattr(code, 'co_qualname', code.co_name)
+        if module == FACADE_MODULE:
+            callers['facade'] = name
+        elif callers['repository'] is None and module.startswith(
+            REPOSITORY_MODULES
+        ):
+            callers['repository'] = f'{module}.{name}'
+        frame = frame.f_back
+    return callers
+
+
+def explain(connection, statement, parameters, executemany=False):
+    """Query plan of statement, as a list of rows, or the error message
+
+    None for statements other than SELECT, UPDATE and DELETE. The
+    EXPLAIN runs in the transaction of the statement: on engines other
+    than SQLite it runs in a savepoint (``Connection.begin_nested()``),
+    rolled back afterwards, since a failing statement aborts the whole
+    transaction on PostgreSQL.
+    """
+    if not statement.lstrip().upper().startswith(EXPLAINED_STATEMENTS):
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    if connection.dialect.name == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+        savepoint = None
+    else:
+        prefix = 'EXPLAIN '
+        savepoint = connection.begin_nested()
+    # A separate DBAPI cursor: the statement's own one still holds its
+    # results, and SQLAlchemy events do not see this query
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters or ())
+        return [list(row) for row in cursor.fetchall()]
+    except Exception as e:
+        return f'EXPLAIN failed: {e}'
+    finally:
+        cursor.close()
+        if savepoint is not None:
+            savepoint.rollback()
+
+
+def install_slow_query_log(engine, config, default_path):
+    """Log the statements of engine slower than the configured threshold
+
+    default_path is the log file used when SLOW_QUERY_LOG_FILE is unset.
+    """
+    threshold_ms = config.get('SLOW_QUERY_THRESHOLD_MS')
+    if not threshold_ms:
+        return
+    threshold = threshold_ms / 1000
+    _add_handler(
+        config.get('SLOW_QUERY_LOG_FILE') or default_path,
+        config.get('SLOW_QUERY_LOG_MAX_BYTES', 10 * 1024 * 1024),
+        config.get('SLOW_QUERY_LOG_BACKUPS', 5)
+    )
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def start_statement(conn, cursor, statement, parameters, context,
+                        executemany):
+        conn.info.setdefault('slow_query_start', []).append(
+            time.perf_counter()
+        )
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def check_statement(conn, cursor, statement, parameters, context,
+                        executemany):
+        elapsed = time.perf_counter() - conn.info['slow_query_start'].pop()
+        if elapsed < threshold:
+            return
+        sample = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(elapsed * 1000, 3),
+            'statement': statement,
+            'parameters': parameter_shapes(parameters, executemany),
+            **find_callers(sys._getframe(1)),
+            'plan': explain(conn, statement, parameters, executemany)
+        }
+        logger.info(json.dumps(sample, default=str))
+
+    @event.listens_for(engine, 'handle_error')
+    def discard_statement(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get(
+            'slow_query_start'
+        ):
+            connection.info['slow_query_start'].pop()
@@ -1,24 +1,51 @@
+from datetime import datetime
+from app import password_hasher
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
 from app.models.review import Review
-from app.persistence.repository import SQLAlchemyRepository
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from app.persistence.repository import SQLAlchemyRepository, CachedRepository
 from app.services.repositories.user_repository import UserRepository
+from app.services.repositories.review_repository import ReviewRepository
+from app.services.repositories.place_repository import PlaceRepository
+from app.services.importer import (
+    ImportResult, amenity_row, place_row, review_row
+)
+from app.utils.serialization import place_summary_serializer
+from app.utils.validation import checked_fields, review_schema, select
+
+
+class ReviewAlreadyExistsError(ValueError):
+    """Raised when a user tries to review the same place twice"""
+
+
+DEFAULT_BATCH_SIZE = 500
+# Place attributes a place update may change, besides the owner and
+# the amenities
+PLACE_UPDATE_FIELDS = (
+    "title", "description", "price", "latitude", "longitude"
+)
+# Review attributes a review update may change: moving a review to
+# another place or author would leave the place review totals wrong
+REVIEW_UPDATE_FIELDS = ("text", "rating")
 
 
 class HBnBFacade:
     def __init__(self):
         # Utilisation du UserRepository spécifique
         self.user_repo = UserRepository()
-        self.amenity_repo = SQLAlchemyRepository(Amenity)
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
+        # Places and amenities are read on most requests: cache them
+        self.amenity_repo = CachedRepository(
+            SQLAlchemyRepository(Amenity), 'amenities'
+        )
+        self.place_repo = CachedRepository(PlaceRepository(), 'places')
+        self.review_repo = ReviewRepository()
 
     def create_user(self, user_data):
         """create a user"""
-        user = User(**user_data)
-        if 'password' in user_data:  # S'assurer que le mot de passe est haché
-            user.hash_password(user_data['password'])
+        # User hashes the password itself
+        user = User(**user_data, checked=checked_fields(user_data))
         self.user_repo.add(user)
         return user
 
@@ -32,8 +59,36 @@ class HBnBFacade:
             email
         )  # Utilisation de la méthode spécifique
 
+    def get_users_page(self, limit, after=None):
+        """Get one page of users and the cursor of the next page"""
+        return self.user_repo.get_page(limit, after)
+
+    def authenticate_user(self, email, password):
+        """Return the user with these credentials, or None
+
+        A hash made with an outdated cost factor is replaced on success.
+        """
+        user = self.user_repo.get_user_by_email(email)
+        if not user or not user.verify_password(password):
+            return None
+        if user.password_needs_rehash():
+            try:
+                self.user_repo.update(
+                    user.id, {'password': password_hasher.hash(password)}
+                )
+            except SQLAlchemyError:
+                # Keep the old hash; it is upgraded on a later login
+                pass
+        return user
+
     def update_user(self, user_id, updated_data):
         """Update user informations"""
+        if 'password' in updated_data:
+            # Never store the plain text password
+            updated_data = updated_data.copy()
+            updated_data['password'] = password_hasher.hash(
+                updated_data['password']
+            )
         self.user_repo.update(user_id, updated_data)
         return self.user_repo.get(user_id)
 
@@ -50,7 +105,9 @@ class HBnBFacade:
         name = amenity_data.get('name')
 
         # Create and save the amenity
-        amenity = Amenity(name=name)
+        amenity = Amenity(
+            name=name, checked=checked_fields(amenity_data)
+        )
         self.amenity_repo.add(amenity)
         return amenity
 
@@ -62,6 +119,10 @@ class HBnBFacade:
         """Retrieves all available amenities."""
         return self.amenity_repo.get_all()
 
+    def get_amenities_page(self, limit, after=None):
+        """Retrieves one page of amenities and the next page cursor."""
+        return self.amenity_repo.get_page(limit, after)
+
     def update_amenity(self, amenity_id, amenity_data):
         """Updates the information of an existing amenity.
 
@@ -80,7 +141,7 @@ class HBnBFacade:
         # Update the amenity with new data
         if 'name' in amenity_data:
             self.amenity_repo.update(
-                amenity_id, {'name': amenity_data['name']}
+                amenity_id, select(amenity_data, ('name',))
             )
 
         # Return the updated amenity
@@ -99,7 +160,8 @@ class HBnBFacade:
             price=place_data["price"],
             latitude=place_data["latitude"],
             longitude=place_data["longitude"],
-            owner_id=owner_id
+            owner_id=owner_id,
+            checked=checked_fields(place_data)
         )
 
         # Add amenities if provided
@@ -113,15 +175,19 @@ class HBnBFacade:
         # Return in the format expected by the API
         return place.to_dict()
 
+    def get_place_with_details(self, place_id):
+        """Retrieves a Place with its owner and amenities, or None.
+
+        Owner and amenities are loaded with the place in a single query.
+        """
+        return self.place_repo.get_with_details(place_id)
+
     def get_place_by_id(self, place_id):
         """Retrieves a place by ID, including its owner and amenities."""
-        place = self.place_repo.get(place_id)
+        place = self.get_place_with_details(place_id)
         if not place:
             return None
 
-        # Load owner relationship
-        place.owner = self.user_repo.get(place.owner_id)
-
         # Return in the detailed format expected by the API
         return place.to_detail_dict()
 
@@ -131,24 +197,58 @@ class HBnBFacade:
         # Return in the summarized format expected by the API
         return [place.to_summary_dict() for place in places]
 
+    def get_places_page(self, limit, after=None):
+        """Retrieves one page of places and the next page cursor."""
+        return self.place_repo.get_page(limit, after)
+
+    def export_places(self, batch_size):
+        """Yields every place, reading batch_size places at a time."""
+        return self.place_repo.iter_all(batch_size)
+
+    def search_places(self, filters, limit, after=None):
+        """Searches places by price, bounding box and amenities.
+
+        Args:
+            filters (dict): Optional min_price, max_price, bbox,
+                amenity_ids and sort keys
+            limit (int): Maximum number of places to return
+            after (str): next_cursor of the previous page
+
+        Returns:
+            tuple: Summarized places and the cursor of the next page
+            (None when there are no more results)
+
+        Raises:
+            ValueError: If the cursor is invalid or from another sort
+        """
+        places, next_cursor = self.place_repo.search(
+            limit=limit, after=after, **filters
+        )
+        return place_summary_serializer.many(places), next_cursor
+
+    def get_places_near(self, latitude, longitude, radius_km, limit):
+        """Retrieves places within radius_km of a point, nearest first.
+
+        Returns:
+            list: Summarized places with their distance_km
+        """
+        results = []
+        for place, distance in self.place_repo.find_near(
+                latitude, longitude, radius_km, limit):
+            summary = place_summary_serializer.one(place)
+            summary['distance_km'] = round(distance, 3)
+            results.append(summary)
+        return results
+
     def update_place(self, place_id, place_data):
         """Updates a place's details while ensuring data integrity."""
         place = self.place_repo.get(place_id)
         if not place:
             return None
 
-        update_data = {}
-
-        if "title" in place_data:
-            update_data["title"] = Place.validate_title(place_data["title"])
-        if "description" in place_data:
-            update_data["description"] = place_data["description"]
-        if "price" in place_data:
-            update_data["price"] = place_data["price"]
-        if "latitude" in place_data:
-            update_data["latitude"] = place_data["latitude"]
-        if "longitude" in place_data:
-            update_data["longitude"] = place_data["longitude"]
+        # The fields are checked by the model hooks, unless place_data
+        # comes from place_schema.clean()
+        update_data = select(place_data, PLACE_UPDATE_FIELDS)
         if "owner_id" in place_data:
             owner_id = place_data["owner_id"]
             if self.user_repo.get(owner_id):
@@ -190,6 +290,7 @@ class HBnBFacade:
 
         Raises:
             ValueError: If validation fails
+            ReviewAlreadyExistsError: If the user already reviewed the place
         """
         # Validate required fields
         if 'user_id' not in review_data:
@@ -201,14 +302,6 @@ class HBnBFacade:
         if 'rating' not in review_data:
             raise ValueError("rating is required")
 
-        # Validate rating is a number between 0 and 5
-        try:
-            rating = float(review_data['rating'])
-            if rating < 0 or rating > 5:
-                raise ValueError("rating must be between 0 and 5")
-        except (ValueError, TypeError):
-            raise ValueError("rating must be a number between 0 and 5")
-
         # Verify user and place exist
         user = self.user_repo.get(review_data['user_id'])
         if not user:
@@ -222,9 +315,21 @@ class HBnBFacade:
                 f"Place with id {review_data['place_id']} does not exist"
             )
 
-        # Create and save the review
-        review = Review(**review_data)
-        self.review_repo.add(review)
+        # Create and save the review; the unique (user_id, place_id) index
+        # rejects duplicates, including concurrent ones. The place's review
+        # aggregates are updated in the same transaction.
+        review = Review(
+            **review_data, checked=checked_fields(review_data)
+        )
+        self.place_repo.adjust_review_totals(place.id, 1, review.rating)
+        try:
+            self.review_repo.add(review)
+        except IntegrityError:
+            raise ReviewAlreadyExistsError(
+                "You have already reviewed this place"
+            )
+        finally:
+            self.place_repo.invalidate([place.id])
         return review
 
     def get_review(self, review_id):
@@ -248,6 +353,50 @@ class HBnBFacade:
         """
         return self.review_repo.get_all()
 
+    def get_reviews_page(self, limit, after=None):
+        """
+        Retrieve one page of reviews.
+
+        Args:
+            limit (int): Maximum number of reviews to return
+            after (str): Cursor of the previous page, if any
+
+        Returns:
+            tuple: List of reviews and the cursor of the next page (or None)
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        return self.review_repo.get_page(limit, after)
+
+    def export_reviews(self, batch_size):
+        """
+        Yield every review without loading the whole table.
+
+        Args:
+            batch_size (int): Number of reviews read from the database
+                at a time
+
+        Returns:
+            iterator: Reviews ordered by creation date
+        """
+        return self.review_repo.iter_all(batch_size)
+
+    def has_user_reviewed_place(self, user_id, place_id):
+        """
+        Check whether a user has already reviewed a place.
+
+        Args:
+            user_id (str): ID of the user
+            place_id (str): ID of the place
+
+        Returns:
+            bool: True if a review exists for this user and place
+        """
+        return self.review_repo.get_review_by_user_and_place(
+            user_id, place_id
+        ) is not None
+
     def get_reviews_by_place(self, place_id):
         """
         Retrieve all reviews for a specific place.
@@ -265,12 +414,8 @@ class HBnBFacade:
         if not place:
             raise ValueError(f"Place with id {place_id} does not exist")
 
-        # Filter reviews by place_id
-        all_reviews = self.review_repo.get_all()
-        return [
-            review for review in all_reviews
-            if review.place_id == place_id
-        ]
+        # Filter reviews by place_id in the database (uses the place_id index)
+        return self.review_repo.get_all_by_attribute('place_id', place_id)
 
     def update_review(self, review_id, review_data):
         """
@@ -278,7 +423,8 @@ class HBnBFacade:
 
         Args:
             review_id (str): ID of the review to update
-            review_data (dict): Updated review data
+            review_data (dict): Updated review data; only text and
+                rating are applied
 
         Returns:
             Review: Updated review object
@@ -291,18 +437,20 @@ class HBnBFacade:
         if not review:
             raise ValueError(f"Review with id {review_id} does not exist")
 
-        # Validate rating if provided
+        # Update review, and the place's rating total in the same
+        # transaction when the rating changes
+        review_data = select(review_data, REVIEW_UPDATE_FIELDS)
         if 'rating' in review_data:
-            try:
-                rating = float(review_data['rating'])
-                if rating < 0 or rating > 5:
-                    raise ValueError("rating must be between 0 and 5")
-                review_data['rating'] = rating
-            except (ValueError, TypeError):
-                raise ValueError("rating must be a number between 0 and 5")
-
-        # Update review
-        self.review_repo.update(review_id, review_data)
+            new_rating = review_data['rating']
+            if 'rating' not in checked_fields(review_data):
+                new_rating = review_schema.check('rating', new_rating)
+            self.place_repo.adjust_review_totals(
+                review.place_id, 0, new_rating - review.rating
+            )
+        try:
+            self.review_repo.update(review_id, review_data)
+        finally:
+            self.place_repo.invalidate([review.place_id])
         return self.review_repo.get(review_id)
 
     def delete_review(self, review_id):
@@ -323,6 +471,534 @@ class HBnBFacade:
         if not review:
             raise ValueError(f"Review with id {review_id} does not exist")
 
-        # Delete the review
-        self.review_repo.delete(review_id)
+        # Delete the review and remove it from the place's aggregates
+        self.place_repo.adjust_review_totals(
+            review.place_id, -1, -review.rating
+        )
+        try:
+            self.review_repo.delete(review_id)
+        finally:
+            self.place_repo.invalidate([review.place_id])
         return True
+
+    def backfill_geohashes(self):
+        """
+        Compute the missing geohash of places created before the column
+        existed, so they show up in radius queries.
+
+        Returns:
+            int: Number of places updated
+        """
+        updated = self.place_repo.backfill_geohashes()
+        if updated:
+            self.place_repo.invalidate_all()
+        return updated
+
+    def rebuild_review_totals(self):
+        """
+        Recompute review_count and rating_sum of every place from the
+        reviews table, repairing any drift in the stored aggregates.
+
+        Returns:
+            int: Number of places updated
+        """
+        updated = self.place_repo.rebuild_review_totals()
+        self.place_repo.invalidate_all()
+        return updated
+
+    # Bulk operations
+    #
+    # Each method takes a list of items and returns one result per item,
+    # in the same order: {'index', 'id'} on success, {'index', 'error'}
+    # otherwise. Related objects are fetched once per call and valid items
+    # are written batch_size at a time, one transaction per batch.
+
+    def get_places_by_ids(self, place_ids):
+        """Retrieves several places with one query, keyed by ID."""
+        return {
+            place.id: place for place in self.place_repo.get_many(place_ids)
+        }
+
+    def get_reviews_by_ids(self, review_ids):
+        """Retrieves several reviews with one query, keyed by ID."""
+        return {
+            review.id: review
+            for review in self.review_repo.get_many(review_ids)
+        }
+
+    def create_places(self, places_data, batch_size=DEFAULT_BATCH_SIZE):
+        """Creates many places, committing them in batches."""
+        known_owners = {
+            user.id for user in self.user_repo.get_many(
+                data.get('owner_id') for data in places_data
+            )
+        }
+        amenities = self._get_amenities_for(places_data)
+
+        results = [None] * len(places_data)
+        pending = []
+        for index, place_data in enumerate(places_data):
+            try:
+                if place_data.get('owner_id') not in known_owners:
+                    raise ValueError("Invalid owner ID.")
+                place = Place(
+                    title=place_data["title"],
+                    description=place_data.get("description", ""),
+                    price=place_data["price"],
+                    latitude=place_data["latitude"],
+                    longitude=place_data["longitude"],
+                    owner_id=place_data["owner_id"],
+                    checked=checked_fields(place_data)
+                )
+            except KeyError as e:
+                results[index] = self._item_error(
+                    index, f"{e.args[0]} is required"
+                )
+                continue
+            except (ValueError, TypeError) as e:
+                results[index] = self._item_error(index, str(e))
+                continue
+
+            for amenity_id in place_data.get("amenities") or []:
+                if amenity_id in amenities:
+                    place.add_amenity(amenities[amenity_id])
+            pending.append((index, place))
+
+        self._add_in_batches(self.place_repo, pending, results, batch_size)
+        return results
+
+    def update_places(self, places_data, batch_size=DEFAULT_BATCH_SIZE):
+        """Updates many places, each item holding the place id."""
+        existing = self.get_places_by_ids(
+            data.get('id') for data in places_data
+        )
+        known_owners = {
+            user.id for user in self.user_repo.get_many(
+                data['owner_id'] for data in places_data
+                if 'owner_id' in data
+            )
+        }
+        amenities = self._get_amenities_for(places_data)
+
+        results = [None] * len(places_data)
+        pending = []
+        for index, place_data in enumerate(places_data):
+            place_id = place_data.get('id')
+            if place_id not in existing:
+                results[index] = self._item_error(index, "Place not found")
+                continue
+
+            update_data = select(place_data, PLACE_UPDATE_FIELDS)
+            if place_data.get("owner_id") in known_owners:
+                update_data["owner_id"] = place_data["owner_id"]
+            if "amenities" in place_data:
+                update_data["amenities"] = [
+                    amenities[amenity_id]
+                    for amenity_id in dict.fromkeys(place_data["amenities"])
+                    if amenity_id in amenities
+                ]
+            pending.append((index, place_id, update_data))
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                self.place_repo.update_many(
+                    {place_id: data for _, place_id, data in batch}
+                )
+            except (SQLAlchemyError, ValueError):
+                # Retry one by one to report the items that failed
+                for index, place_id, data in batch:
+                    try:
+                        self.place_repo.update_many({place_id: data})
+                    except (SQLAlchemyError, ValueError) as e:
+                        results[index] = self._item_error(index, str(e))
+                    else:
+                        results[index] = {'index': index, 'id': place_id}
+            else:
+                for index, place_id, _ in batch:
+                    results[index] = {'index': index, 'id': place_id}
+        return results
+
+    def delete_places(self, place_ids, batch_size=DEFAULT_BATCH_SIZE):
+        """Deletes many places and their reviews."""
+        return self._delete_in_batches(
+            self.place_repo, place_ids, "Place not found", batch_size
+        )
+
+    def create_reviews(self, reviews_data, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Create many reviews, committing them in batches.
+
+        Args:
+            reviews_data (list): Review data dicts containing user_id,
+            place_id, text, and rating
+            batch_size (int): Number of reviews per transaction
+
+        Returns:
+            list: One result per review
+        """
+        places = self.get_places_by_ids(
+            data.get('place_id') for data in reviews_data
+        )
+        known_users = {
+            user.id for user in self.user_repo.get_many(
+                data.get('user_id') for data in reviews_data
+            )
+        }
+        reviewed = self.review_repo.get_reviewed_pairs(
+            known_users, places.keys()
+        )
+
+        results = [None] * len(reviews_data)
+        pending = []
+        for index, review_data in enumerate(reviews_data):
+            user_id = review_data.get('user_id')
+            place = places.get(review_data.get('place_id'))
+            try:
+                if user_id not in known_users:
+                    raise ValueError(f"User with id {user_id} does not exist")
+                if not place:
+                    raise ValueError(
+                        f"Place with id {review_data.get('place_id')} "
+                        "does not exist"
+                    )
+                if place.owner_id == user_id:
+                    raise ValueError("You cannot review your own place")
+                if (user_id, place.id) in reviewed:
+                    raise ValueError("You have already reviewed this place")
+                review = Review(
+                    text=review_data.get('text'),
+                    rating=review_data.get('rating'),
+                    place_id=place.id,
+                    user_id=user_id,
+                    checked=checked_fields(review_data)
+                )
+            except ValueError as e:
+                results[index] = self._item_error(index, str(e))
+                continue
+            # Also catches duplicates within the same import
+            reviewed.add((user_id, place.id))
+            pending.append((index, review))
+
+        try:
+            self._add_in_batches(
+                self.review_repo, pending, results, batch_size,
+                conflict_error="You have already reviewed this place",
+                before_add=lambda reviews: self._adjust_review_totals(
+                    reviews, 1
+                )
+            )
+        finally:
+            self.place_repo.invalidate(
+                {review.place_id for _, review in pending}
+            )
+        return results
+
+    def delete_reviews(self, review_ids, batch_size=DEFAULT_BATCH_SIZE):
+        """Delete many reviews."""
+        place_ids = set()
+
+        def before_delete(batch):
+            reviews = self.review_repo.get_many(batch)
+            place_ids.update(review.place_id for review in reviews)
+            # Aggregates are adjusted in the transaction that deletes
+            self._adjust_review_totals(reviews, -1)
+
+        try:
+            return self._delete_in_batches(
+                self.review_repo, review_ids, "Review not found",
+                batch_size, before_delete=before_delete
+            )
+        finally:
+            self.place_repo.invalidate(place_ids)
+
+    def _adjust_review_totals(self, reviews, sign):
+        """Add (sign=1) or remove (sign=-1) reviews from place aggregates"""
+        totals = {}
+        for review in reviews:
+            count, rating = totals.get(review.place_id, (0, 0))
+            totals[review.place_id] = (count + 1, rating + review.rating)
+        for place_id, (count, rating) in totals.items():
+            self.place_repo.adjust_review_totals(
+                place_id, sign * count, sign * rating
+            )
+
+    def _get_amenities_for(self, items):
+        """Fetch every amenity referenced by the items, keyed by ID"""
+        return {
+            amenity.id: amenity for amenity in self.amenity_repo.get_many(
+                amenity_id for data in items
+                for amenity_id in data.get('amenities') or []
+            )
+        }
+
+    def import_records(self, kind, records, batch_size=DEFAULT_BATCH_SIZE,
+                       skip_to=0, max_errors=None, checkpoint=None):
+        """Imports places, amenities or reviews from a stream of records.
+
+        Records are validated and inserted batch_size at a time, one
+        transaction per batch. Foreign keys are checked with one query
+        per batch and per referenced table.
+
+        Args:
+            kind (str): 'places', 'amenities' or 'reviews'
+            records (iterable): (line, record, error) triples, as
+                yielded by importer.read_records
+            batch_size (int): Number of records per transaction
+            skip_to (int): Skip the records up to this line, to resume
+                from the last_line of an interrupted import
+            max_errors (int): Number of row errors to keep (all if None)
+            checkpoint (callable): Called with the ImportResult after
+                every committed batch
+
+        Returns:
+            ImportResult: Counters, last committed line and row errors
+        """
+        import_batch = {
+            'places': self._import_places,
+            'amenities': self._import_amenities,
+            'reviews': self._import_reviews
+        }[kind]
+        result = ImportResult(max_errors)
+        batch = []
+        unreadable = []
+
+        def flush(batch, unreadable, last_line):
+            first_error = len(result.errors)
+            for error_line, error in unreadable:
+                result.add_error(error_line, error)
+            import_batch(batch, result)
+            # Report the errors of the batch in file order
+            result.errors[first_error:] = sorted(
+                result.errors[first_error:], key=lambda e: e['line']
+            )
+            result.last_line = last_line
+            if checkpoint:
+                checkpoint(result)
+
+        for line, record, error in records:
+            if line <= skip_to:
+                continue
+            if error:
+                unreadable.append((line, error))
+            else:
+                batch.append((line, record))
+            if len(batch) + len(unreadable) >= batch_size:
+                flush(batch, unreadable, line)
+                batch, unreadable = [], []
+        if batch or unreadable:
+            flush(batch, unreadable, line)
+        return result
+
+    def _import_places(self, batch, result):
+        now = datetime.utcnow()
+        known_owners = self.user_repo.existing_ids(
+            record['owner_id'] for _, record in batch
+            if isinstance(record.get('owner_id'), str)
+        )
+        known_amenities = self.amenity_repo.existing_ids(
+            amenity_id for _, record in batch
+            if isinstance(record.get('amenities'), list)
+            for amenity_id in record['amenities']
+            if isinstance(amenity_id, str)
+        )
+        pending = []
+        for line, record in batch:
+            try:
+                row, amenity_ids = place_row(record, now)
+                if row['owner_id'] not in known_owners:
+                    raise ValueError("Invalid owner ID.")
+                for amenity_id in amenity_ids:
+                    if amenity_id not in known_amenities:
+                        raise ValueError(
+                            f"Amenity with id {amenity_id} does not exist"
+                        )
+            except ValueError as e:
+                result.add_error(line, str(e))
+                continue
+            pending.append((line, (row, amenity_ids)))
+
+        def insert(items):
+            self.place_repo.insert_rows(
+                [row for row, _ in items],
+                amenity_links=[
+                    {'place_id': row['id'], 'amenity_id': amenity_id}
+                    for row, amenity_ids in items
+                    for amenity_id in amenity_ids
+                ]
+            )
+
+        self._insert_import_batch(pending, result, insert)
+
+    def _import_amenities(self, batch, result):
+        now = datetime.utcnow()
+        pending = []
+        for line, record in batch:
+            try:
+                pending.append((line, amenity_row(record, now)))
+            except ValueError as e:
+                result.add_error(line, str(e))
+        self._insert_import_batch(
+            pending, result, self.amenity_repo.insert_rows
+        )
+
+    def _import_reviews(self, batch, result):
+        now = datetime.utcnow()
+        rows = []
+        for line, record in batch:
+            try:
+                rows.append((line, review_row(record, now)))
+            except ValueError as e:
+                result.add_error(line, str(e))
+        known_users = self.user_repo.existing_ids(
+            row['user_id'] for _, row in rows if row['user_id']
+        )
+        place_owners = self.place_repo.get_owner_ids(
+            row['place_id'] for _, row in rows if row['place_id']
+        )
+        reviewed = self.review_repo.find_existing_pairs(
+            (row['user_id'], row['place_id']) for _, row in rows
+            if row['user_id'] in known_users
+            and row['place_id'] in place_owners
+        )
+
+        # Same checks and messages as create_reviews
+        pending = []
+        for line, row in rows:
+            user_id, place_id = row['user_id'], row['place_id']
+            if user_id not in known_users:
+                result.add_error(
+                    line, f"User with id {user_id} does not exist"
+                )
+            elif place_id not in place_owners:
+                result.add_error(
+                    line, f"Place with id {place_id} does not exist"
+                )
+            elif place_owners[place_id] == user_id:
+                result.add_error(line, "You cannot review your own place")
+            elif (user_id, place_id) in reviewed:
+                result.add_error(line, "You have already reviewed this place")
+            else:
+                # Also catches duplicates within the same import
+                reviewed.add((user_id, place_id))
+                pending.append((line, row))
+
+        try:
+            self._insert_import_batch(
+                pending, result, self.review_repo.insert_rows
+            )
+        finally:
+            self.place_repo.invalidate({row['place_id'] for _, row in pending})
+
+    def _insert_import_batch(self, pending, result, insert):
+        """Insert (line, item) pairs with insert(items) in one transaction
+
+        A batch that fails is retried one item at a time so the error is
+        reported on the rows that caused it.
+        """
+        if not pending:
+            return
+        try:
+            insert([item for _, item in pending])
+        except SQLAlchemyError:
+            for line, item in pending:
+                try:
+                    insert([item])
+                except IntegrityError:
+                    result.add_error(
+                        line, "Conflicts with an existing record"
+                    )
+                except SQLAlchemyError:
+                    result.add_error(line, "Could not save item")
+                else:
+                    result.succeeded += 1
+        else:
+            result.succeeded += len(pending)
+
+    @staticmethod
+    def _item_error(index, message):
+        """Build the result of an item that could not be processed"""
+        return {'index': index, 'error': message}
+
+    def _add_in_batches(self, repo, pending, results, batch_size,
+                        conflict_error="Conflicts with an existing record",
+                        before_add=None):
+        """Add (index, obj) pairs one transaction per batch
+
+        A batch that fails to commit is retried one object at a time so
+        the error is reported on the items that caused it. before_add, if
+        given, is called with the objects about to be added so related
+        rows can be updated in the same transaction.
+        """
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            # Read the ids now: objects are expired once committed
+            ids = [obj.id for _, obj in batch]
+            try:
+                if before_add:
+                    before_add([obj for _, obj in batch])
+                repo.add_many([obj for _, obj in batch])
+            except SQLAlchemyError:
+                for (index, obj), obj_id in zip(batch, ids):
+                    try:
+                        if before_add:
+                            before_add([obj])
+                        repo.add(obj)
+                    except IntegrityError:
+                        results[index] = self._item_error(
+                            index, conflict_error
+                        )
+                    except SQLAlchemyError:
+                        results[index] = self._item_error(
+                            index, "Could not save item"
+                        )
+                    else:
+                        results[index] = {'index': index, 'id': obj_id}
+            else:
+                for (index, _), obj_id in zip(batch, ids):
+                    results[index] = {'index': index, 'id': obj_id}
+
+    def _delete_in_batches(self, repo, obj_ids, not_found_error, batch_size,
+                           before_delete=None):
+        """Delete objects by ID one transaction per batch
+
+        Like _add_in_batches, a batch that fails to commit is retried one
+        ID at a time so the error is reported on the items that caused
+        it. before_delete, if given, is called with the IDs about to be
+        deleted so related rows can be updated in the same transaction.
+        """
+        results = []
+        for start in range(0, len(obj_ids), batch_size):
+            batch = obj_ids[start:start + batch_size]
+            try:
+                if before_delete:
+                    before_delete(batch)
+                existing = set(repo.delete_many(batch))
+            except SQLAlchemyError:
+                for offset, obj_id in enumerate(batch):
+                    index = start + offset
+                    try:
+                        if before_delete:
+                            before_delete([obj_id])
+                        deleted = repo.delete_many([obj_id])
+                    except IntegrityError:
+                        results.append(self._item_error(
+                            index, "Still referenced by other records"
+                        ))
+                    except SQLAlchemyError:
+                        results.append(self._item_error(
+                            index, "Could not delete item"
+                        ))
+                    else:
+                        results.append(
+                            {'index': index, 'id': obj_id} if deleted
+                            else self._item_error(index, not_found_error)
+                        )
+            else:
+                results.extend(
+                    {'index': start + offset, 'id': obj_id}
+                    if obj_id in existing
+                    else self._item_error(start + offset, not_found_error)
+                    for offset, obj_id in enumerate(batch)
+                )
+        return results
@@ -0,0 +1,190 @@
+"""Reading and validating the records of a bulk import.
+
+HBnBFacade.import_records imports places, amenities or reviews from a
+file streamed one record at a time. This module holds the parts that do
+not touch the database:
+
+- ``read_records`` yields the records of an NDJSON or CSV text stream
+  with their line number
+- ``place_row``, ``amenity_row`` and ``review_row`` validate a record
+  with the schemas the models and the API use (app/utils/validation.py)
+  and build the table row inserted for it, without creating ORM objects
+  (which would cap an import at a few thousand rows per second)
+- ``ImportResult`` counts the imported rows and keeps the per-row errors
+"""
+import csv
+import uuid
+
+from app.utils.geo import encode_geohash
+from app.utils.serialization import loads
+from app.utils.validation import (
+    amenity_schema, place_schema, review_schema
+)
+
+IMPORT_KINDS = ('places', 'amenities', 'reviews')
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+
+def _split_ids(value):
+    """CSV cells list amenity ids separated by semicolons"""
+    return [part.strip() for part in value.split(';') if part.strip()]
+
+
+# CSV cells are strings: convert the non-text columns of each kind
+CSV_CONVERTERS = {
+    'places': {
+        'price': float, 'latitude': float, 'longitude': float,
+        'amenities': _split_ids
+    },
+    'amenities': {},
+    'reviews': {'rating': int}
+}
+
+
+def _convert_csv(kind, record):
+    converted = {}
+    for key, value in record.items():
+        if key is None or value is None or value == '':
+            # Extra cells, or columns left empty
+            continue
+        converter = CSV_CONVERTERS[kind].get(key)
+        try:
+            converted[key] = converter(value) if converter else value
+        except ValueError:
+            # Left as is: validation reports the usual error
+            converted[key] = value
+    return converted
+
+
+def read_records(stream, fmt, kind):
+    """Yield (line, record, error) for each record of a text stream
+
+    record is a dict, or None when the record cannot be decoded, in
+    which case error says why. A stream that stops being readable
+    (invalid UTF-8, broken CSV quoting) ends with one last error.
+    """
+    line = 0
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(stream)
+            for record in reader:
+                line = reader.line_num
+                yield line, _convert_csv(kind, record), None
+            return
+        for line, text in enumerate(stream, 1):
+            if not text.strip():
+                continue
+            try:
+                record = loads(text)
+            except ValueError:
+                yield line, None, "Invalid JSON"
+                continue
+            if not isinstance(record, dict):
+                yield line, None, "Record must be a JSON object"
+                continue
+            yield line, record, None
+    except (UnicodeDecodeError, csv.Error) as e:
+        yield line + 1, None, f"Cannot read the file: {e}"
+
+
+def _text(record, key):
+    value = record.get(key)
+    return value if isinstance(value, str) else None
+
+
+def _row_id(record):
+    """Keep the id given in the record, if any, to preserve references"""
+    return _text(record, 'id') or str(uuid.uuid4())
+
+
+def place_row(record, now):
+    """Validate a place record
+
+    Returns:
+        tuple: The places row and the list of amenity ids to link
+    """
+    check = place_schema.check
+    title = check('title', record.get('title'))
+    price = check('price', record.get('price'))
+    latitude = check('latitude', record.get('latitude'))
+    longitude = check('longitude', record.get('longitude'))
+    owner_id = _text(record, 'owner_id')
+    if not owner_id:
+        raise ValueError("Invalid owner ID.")
+    amenity_ids = record.get('amenities') or []
+    if not isinstance(amenity_ids, list) or not all(
+        isinstance(amenity_id, str) for amenity_id in amenity_ids
+    ):
+        raise ValueError("Amenities must be a list of amenity IDs")
+
+    row = {
+        'id': _row_id(record),
+        'title': title,
+        'description': _text(record, 'description') or "",
+        'price': price,
+        'latitude': latitude,
+        'longitude': longitude,
+        'geohash': encode_geohash(latitude, longitude),
+        'review_count': 0,
+        'rating_sum': 0,
+        'owner_id': owner_id,
+        'created_at': now,
+        'updated_at': now
+    }
+    return row, list(dict.fromkeys(amenity_ids))
+
+
+def amenity_row(record, now):
+    """Validate an amenity record and return its amenities row"""
+    return {
+        'id': _row_id(record),
+        'name': amenity_schema.check('name', record.get('name')),
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def review_row(record, now):
+    """Validate a review record and return its reviews row
+
+    Whether the user and place exist is checked by the caller.
+    """
+    return {
+        'id': _row_id(record),
+        'text': review_schema.check('text', record.get('text')),
+        'rating': review_schema.check('rating', record.get('rating')),
+        'user_id': _text(record, 'user_id'),
+        'place_id': _text(record, 'place_id'),
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+class ImportResult:
+    """Progress of an import: counters and the first max_errors errors
+
+    last_line is the line of the last record of the last committed
+    batch; resuming an interrupted import after it skips nothing that
+    was not saved.
+    """
+
+    def __init__(self, max_errors=None):
+        self.max_errors = max_errors
+        self.last_line = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self):
+        return {
+            'last_line': self.last_line,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors)
+        }
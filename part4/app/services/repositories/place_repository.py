@@ -0,0 +1,291 @@
+from datetime import datetime
+from sqlalchemy import (
+    and_, bindparam, false, func, insert, or_, tuple_, update
+)
+from sqlalchemy.orm import joinedload
+from app import db
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.persistence.repository import (
+    SQLAlchemyRepository, decode_key_cursor, encode_key_cursor
+)
+from app.utils.geo import (
+    PREFIX_UPPER_BOUND, covering_prefixes, encode_geohash, haversine_km
+)
+
+
+class PlaceRepository(SQLAlchemyRepository):
+    """Repository for Place model"""
+
+    # Average rating from the stored aggregates, NULL without reviews
+    AVERAGE_RATING = (
+        Place.rating_sum * 1.0 / func.nullif(Place.review_count, 0)
+    )
+
+    # Supported sort orders for search, as (key, descending) pairs ending
+    # on id so every place has a distinct position for the keyset cursor.
+    # Places without reviews have no AVERAGE_RATING and come last
+    SORT_KEYS = {
+        'oldest': ((Place.created_at, False), (Place.id, False)),
+        'newest': ((Place.created_at, True), (Place.id, True)),
+        'price_asc': ((Place.price, False), (Place.id, False)),
+        'price_desc': ((Place.price, True), (Place.id, True)),
+        'rating_desc': (
+            (AVERAGE_RATING, True), (Place.review_count, True),
+            (Place.id, False)
+        ),
+    }
+
+    def __init__(self):
+        super().__init__(Place)
+
+    def get_with_details(self, place_id):
+        """Load a place with its owner and amenities in one statement"""
+        return self._read_query().options(
+            joinedload(Place.owner),
+            joinedload(Place.amenities)
+        ).filter(Place.id == place_id).first()
+
+    def adjust_review_totals(self, place_id, count_delta, rating_delta):
+        """Add deltas to the review aggregates of a place
+
+        Runs as one atomic UPDATE without committing, so the change is
+        committed (or rolled back) together with the review write.
+        """
+        db.session.query(Place).filter(Place.id == place_id).update({
+            Place.review_count: Place.review_count + count_delta,
+            Place.rating_sum: Place.rating_sum + rating_delta
+        }, synchronize_session='evaluate')
+
+    def insert_rows(self, rows, amenity_links=()):
+        """Insert place rows and their place_amenity links in one commit
+
+        amenity_links holds {'place_id': ..., 'amenity_id': ...} dicts.
+        """
+        self._execute_and_commit([
+            (insert(Place.__table__), rows),
+            (insert(place_amenity), list(amenity_links))
+        ])
+
+    def get_owner_ids(self, place_ids):
+        """Map the ids of existing places to the id of their owner"""
+        place_ids = list(set(place_ids))
+        if not place_ids:
+            return {}
+        rows = self.model.query.with_entities(
+            Place.id, Place.owner_id
+        ).filter(Place.id.in_(place_ids))
+        return {row.id: row.owner_id for row in rows}
+
+    def rebuild_review_totals(self):
+        """Recompute every place's review aggregates from the reviews table
+
+        Returns:
+            int: Number of places updated
+        """
+        review_count = db.session.query(func.count(Review.id)).filter(
+            Review.place_id == Place.id
+        ).correlate(Place).scalar_subquery()
+        rating_sum = db.session.query(
+            func.coalesce(func.sum(Review.rating), 0)
+        ).filter(
+            Review.place_id == Place.id
+        ).correlate(Place).scalar_subquery()
+        updated = db.session.query(Place).update({
+            Place.review_count: review_count,
+            Place.rating_sum: rating_sum
+        }, synchronize_session=False)
+        self._commit()
+        return updated
+
+    def backfill_geohashes(self, batch_size=1000):
+        """Compute the geohash of places that have none
+
+        Places written before the geohash column existed have a NULL one
+        and never match a radius query. Commits every batch_size places.
+
+        Returns:
+            int: Number of places updated
+        """
+        places = Place.__table__
+        statement = update(places).where(
+            places.c.id == bindparam('place_id')
+        ).values(geohash=bindparam('geohash'))
+        updated = 0
+        while True:
+            rows = db.session.query(
+                Place.id, Place.latitude, Place.longitude
+            ).filter(Place.geohash.is_(None)).limit(batch_size).all()
+            if not rows:
+                return updated
+            self._execute_and_commit([(statement, [
+                {
+                    'place_id': row.id,
+                    'geohash': encode_geohash(row.latitude, row.longitude)
+                }
+                for row in rows
+            ])])
+            updated += len(rows)
+
+    def search(self, min_price=None, max_price=None, bbox=None,
+               amenity_ids=None, sort='oldest', limit=50, after=None):
+        """Filter places in SQL
+
+        Args:
+            min_price (float): Minimum price per night
+            max_price (float): Maximum price per night
+            bbox (tuple): (min_lat, min_lon, max_lat, max_lon)
+            amenity_ids (list): Amenities every returned place must have
+            sort (str): One of SORT_KEYS
+            limit (int): Maximum number of places to return
+            after (str): Cursor of the previous page, from the same sort
+
+        Returns:
+            tuple: List of places and the cursor of the next page (None
+            when there are no more results)
+        """
+        if sort not in self.SORT_KEYS:
+            raise ValueError(f"Invalid sort order: {sort}")
+
+        query = self._read_query()
+        if after:
+            # Seek past the last place of the previous page instead of
+            # counting rows with OFFSET
+            query = query.filter(self._after(sort, after))
+        if min_price is not None:
+            query = query.filter(Place.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Place.price <= max_price)
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            query = query.filter(
+                Place.latitude.between(min_lat, max_lat),
+                Place.longitude.between(min_lon, max_lon)
+            )
+        if amenity_ids:
+            required = set(amenity_ids)
+            # Places linked to every required amenity
+            matching = db.session.query(place_amenity.c.place_id).filter(
+                place_amenity.c.amenity_id.in_(required)
+            ).group_by(place_amenity.c.place_id).having(
+                func.count(place_amenity.c.amenity_id) == len(required)
+            )
+            query = query.filter(Place.id.in_(matching))
+
+        order_by = [
+            key.desc().nulls_last() if key is self.AVERAGE_RATING
+            else key.desc() if descending else key
+            for key, descending in self.SORT_KEYS[sort]
+        ]
+        places = query.order_by(*order_by).limit(limit + 1).all()
+        page = places[:limit]
+        next_cursor = (
+            self._cursor(sort, page[-1]) if len(places) > limit else None
+        )
+        return page, next_cursor
+
+    def _cursor(self, sort, place):
+        """Search cursor holding the sort and the sort key values of place"""
+        values = [sort]
+        for key, descending in self.SORT_KEYS[sort]:
+            if key is self.AVERAGE_RATING:
+                values.append([place.rating_sum, place.review_count])
+            else:
+                value = getattr(place, key.key)
+                if isinstance(value, datetime):
+                    value = value.isoformat()
+                values.append(value)
+        return encode_key_cursor(values)
+
+    def _after(self, sort, cursor):
+        """Condition matching the places after cursor in the sort order"""
+        values = decode_key_cursor(cursor)
+        keys = self.SORT_KEYS[sort]
+        if len(values) != len(keys) + 1 or values[0] != sort:
+            raise ValueError("Invalid cursor")
+        values = values[1:]
+        try:
+            values = [
+                datetime.fromisoformat(value)
+                if key is Place.created_at else value
+                for (key, descending), value in zip(keys, values)
+            ]
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+
+        if len({descending for key, descending in keys}) == 1:
+            # One direction: a row value comparison, which databases
+            # answer with a range scan of a (key, id) index
+            columns = tuple_(*(key for key, descending in keys))
+            if keys[0][1]:
+                return columns < tuple_(*values)
+            return columns > tuple_(*values)
+
+        # Mixed directions: after on the first key, or equal on it and
+        # after on the next one, and so on
+        conditions = []
+        equal = []
+        for (key, descending), value in zip(keys, values):
+            if key is self.AVERAGE_RATING:
+                after, same = self._after_average(value)
+            else:
+                after = key < value if descending else key > value
+                same = key == value
+            conditions.append(and_(*equal, after))
+            equal.append(same)
+        return or_(*conditions)
+
+    @staticmethod
+    def _after_average(value):
+        """(after, equal) conditions on the average rating of a cursor
+
+        Averages are compared as rating_sum * review_count cross
+        products, exact integers where a division would round.
+        """
+        try:
+            rating_sum, review_count = (int(number) for number in value)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if not review_count:
+            # Places without reviews come last
+            return false(), Place.review_count == 0
+        lower = Place.rating_sum * review_count < (
+            rating_sum * Place.review_count
+        )
+        equal = Place.rating_sum * review_count == (
+            rating_sum * Place.review_count
+        )
+        return (
+            or_(Place.review_count == 0, lower),
+            and_(Place.review_count > 0, equal)
+        )
+
+    def find_near(self, latitude, longitude, radius_km, limit=50):
+        """Find places within radius_km of a point, nearest first
+
+        Candidates come from index range scans on the geohash cells that
+        cover the circle, then exact distances are checked in Python.
+
+        Returns:
+            list: (place, distance_km) tuples sorted by distance
+        """
+        query = self._read_query()
+        prefixes = covering_prefixes(latitude, longitude, radius_km)
+        if prefixes:
+            query = query.filter(or_(*(
+                and_(
+                    Place.geohash >= prefix,
+                    Place.geohash < prefix + PREFIX_UPPER_BOUND
+                )
+                for prefix in prefixes
+            )))
+
+        results = []
+        for place in query:
+            distance = haversine_km(
+                latitude, longitude, place.latitude, place.longitude
+            )
+            if distance <= radius_km:
+                results.append((place, distance))
+        results.sort(key=lambda result: result[1])
+        return results[:limit]
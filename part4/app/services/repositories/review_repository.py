@@ -0,0 +1,66 @@
+from sqlalchemy import bindparam, insert, tuple_, update
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.repository import SQLAlchemyRepository
+
+
+class ReviewRepository(SQLAlchemyRepository):
+    """Repository for Review model"""
+
+    def __init__(self):
+        super().__init__(Review)
+
+    def get_review_by_user_and_place(self, user_id, place_id):
+        """Find the review a user left on a place (uses the unique index)"""
+        return self._read_query().filter_by(
+            user_id=user_id, place_id=place_id
+        ).first()
+
+    def get_reviewed_pairs(self, user_ids, place_ids):
+        """Return the (user_id, place_id) pairs that already have a review"""
+        user_ids, place_ids = list(set(user_ids)), list(set(place_ids))
+        if not user_ids or not place_ids:
+            return set()
+        rows = self.model.query.with_entities(
+            Review.user_id, Review.place_id
+        ).filter(
+            Review.user_id.in_(user_ids), Review.place_id.in_(place_ids)
+        )
+        return {(row.user_id, row.place_id) for row in rows}
+
+    def find_existing_pairs(self, pairs):
+        """Return the (user_id, place_id) pairs of pairs already reviewed
+
+        Looks up each pair in the unique index, which is much cheaper
+        than get_reviewed_pairs when the pairs are known.
+        """
+        pairs = list(set(pairs))
+        if not pairs:
+            return set()
+        rows = self.model.query.with_entities(
+            Review.user_id, Review.place_id
+        ).filter(tuple_(Review.user_id, Review.place_id).in_(pairs))
+        return {(row.user_id, row.place_id) for row in rows}
+
+    def insert_rows(self, rows):
+        """Insert review rows and add them to the review aggregates of
+        their places, in one transaction"""
+        totals = {}
+        for row in rows:
+            count, rating = totals.get(row['place_id'], (0, 0))
+            totals[row['place_id']] = (count + 1, rating + row['rating'])
+        places = Place.__table__
+        add_totals = update(places).where(
+            places.c.id == bindparam('b_place_id')
+        ).values(
+            review_count=places.c.review_count + bindparam('b_count'),
+            rating_sum=places.c.rating_sum + bindparam('b_rating')
+        )
+        self._execute_and_commit([
+            (insert(Review.__table__), rows),
+            (add_totals, [
+                {'b_place_id': place_id, 'b_count': count,
+                 'b_rating': rating}
+                for place_id, (count, rating) in totals.items()
+            ])
+        ])
@@ -10,7 +10,7 @@ class UserRepository(SQLAlchemyRepository):
 
     def get_user_by_email(self, email):
         """Find a user by their email address"""
-        return self.model.query.filter_by(email=email).first()
+        return self._read_query().filter_by(email=email).first()
 
     def save(self):
         """Save changes to the database"""
@@ -0,0 +1,114 @@
+"""Geospatial helpers: geohash encoding and great-circle distances.
+
+Places store a geohash of their coordinates in an indexed column. Nearby
+cells share a prefix, so a radius query becomes a handful of index range
+scans over the cells covering the search circle, followed by an exact
+haversine check on the candidates.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# Precision stored on places (9 characters is a cell of about 5m x 5m)
+GEOHASH_PRECISION = 9
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Sorts after every geohash character, used as an exclusive prefix bound
+PREFIX_UPPER_BOUND = '{'
+
+
+# Spreads the 8 bits of a byte over the even bits of a 16-bit value
+_SPREAD = [
+    sum(((byte >> i) & 1) << (2 * i) for i in range(8)) for byte in range(256)
+]
+
+
+def _cell_index(value, low, span, bits):
+    """Index of the cell holding value among 2**bits cells over the range
+
+    Computed exactly from the float's integer ratio, so it matches the
+    classic bisection (value >= mid goes up) bit for bit.
+    """
+    num, den = float(value).as_integer_ratio()
+    index = ((num - low * den) << bits) // (span * den)
+    return min(index, (1 << bits) - 1)
+
+
+def _spread(value):
+    """Put the bits of value (up to 32) on the even bits of the result"""
+    return (
+        _SPREAD[value & 255]
+        | _SPREAD[(value >> 8) & 255] << 16
+        | _SPREAD[(value >> 16) & 255] << 32
+        | _SPREAD[(value >> 24) & 255] << 48
+    )
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Return the geohash of a point"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    lon = _cell_index(longitude, -180, 360, lon_bits)
+    lat = _cell_index(latitude, -90, 180, lat_bits)
+    # Bits alternate between longitude and latitude, longitude first;
+    # with an odd bit count longitude has one more bit
+    extra = lon_bits - lat_bits
+    bits = (_spread(lon) << 1 | _spread(lat << extra)) >> extra
+    return ''.join(
+        _BASE32[(bits >> shift) & 31]
+        for shift in range(total_bits - 5, -1, -5)
+    )
+
+
+def cell_size(precision):
+    """Return the (latitude, longitude) size in degrees of a geohash cell"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometers"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = (math.sin(d_phi / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def covering_prefixes(latitude, longitude, radius_km):
+    """Return geohash prefixes whose cells cover a search circle
+
+    Picks the finest precision whose cells are at least radius_km wide,
+    so the cell containing the center and its 8 neighbours cover the
+    circle. Returns an empty list when no precision is coarse enough
+    (huge radius or a circle reaching a pole); callers must then scan.
+    """
+    # Cells get narrower towards the poles, size them for the worst case
+    max_lat = min(90.0, abs(latitude) + radius_km / KM_PER_DEGREE)
+    lon_scale = math.cos(math.radians(max_lat))
+
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lon_deg = cell_size(precision)
+        if (lat_deg * KM_PER_DEGREE >= radius_km and
+                lon_deg * KM_PER_DEGREE * lon_scale >= radius_km):
+            break
+    else:
+        return []
+
+    prefixes = set()
+    for d_lat in (-lat_deg, 0.0, lat_deg):
+        lat = latitude + d_lat
+        if not -90.0 <= lat <= 90.0:
+            continue
+        for d_lon in (-lon_deg, 0.0, lon_deg):
+            # Wrap around the antimeridian
+            lon = (longitude + d_lon + 180.0) % 360.0 - 180.0
+            prefixes.add(encode_geohash(lat, lon, precision))
+    return sorted(prefixes)
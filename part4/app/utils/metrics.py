@@ -0,0 +1,295 @@
+"""Request metrics in the Prometheus text format.
+
+With ``METRICS_ENABLED``, Metrics records:
+
+- the latency of every request, per method, URL rule and status
+- the number of SQL statements each request runs and the time they
+  take, from the engines' before/after_cursor_execute events, plus the
+  duration of every statement
+- the time spent in ``timed()`` blocks: bcrypt hashing and checking,
+  building and encoding JSON responses
+
+and serves them, with the counters and gauges of the registered
+collectors (pool and cache statistics), at ``METRICS_PATH``, to admins
+only: scrape it with an admin's access token. Values are kept per
+process: with several workers, each one reports its own.
+
+Latencies stop when the response is returned to the server, so the
+body of a streamed response (NDJSON exports) is not included.
+When disabled, nothing is hooked and ``timed()`` only looks up the
+application state.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from flask import Response, current_app, g, has_app_context, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+from sqlalchemy import event
+
+# Upper bounds of the histogram buckets
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+    5.0, 10.0
+)
+SQL_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 1.0
+)
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _metric_name(*parts):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', '_'.join(parts))
+
+
+class Histogram:
+    """Thread-safe Prometheus histogram with a fixed set of label names"""
+
+    def __init__(self, name, description, labelnames=(), buckets=()):
+        self.name = name
+        self.description = description
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        # The last slot counts the values above every bucket
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [
+                    [0] * (len(self.buckets) + 1), 0.0
+                ]
+            series[0][index] += 1
+            series[1] += value
+
+    def expose(self):
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram'
+        ]
+        with self._lock:
+            series = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self.series.items()
+            ]
+        bucket_names = self.labelnames + ('le',)
+        for labels, counts, total in sorted(series):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{_format_labels(bucket_names, labels + (bound,))} '
+                    f'{cumulative}'
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {total}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+def _samples(prefix, stats, counters):
+    """Flatten a stats dict into (name, type, value) triples of numbers
+
+    Keys in counters are monotonic totals: they are counters, named
+    with a _total suffix. Every other number is a gauge.
+    """
+    for key, value in stats.items():
+        name = _metric_name(prefix, str(key))
+        if isinstance(value, dict):
+            yield from _samples(name, value, counters)
+        elif isinstance(value, (bool, int, float)):
+            if key in counters:
+                yield f'{name}_total', 'counter', float(value)
+            else:
+                yield name, 'gauge', float(value)
+
+
+class _MetricsState:
+    """Per-application histograms and collectors"""
+
+    def __init__(self):
+        self.requests = Histogram(
+            'hbnb_request_duration_seconds',
+            'Time to handle a request',
+            ('method', 'endpoint', 'status'), LATENCY_BUCKETS
+        )
+        self.request_statements = Histogram(
+            'hbnb_request_sql_statements',
+            'SQL statements run by a request',
+            ('method', 'endpoint'), STATEMENT_COUNT_BUCKETS
+        )
+        self.request_sql = Histogram(
+            'hbnb_request_sql_duration_seconds',
+            'Time a request spends running SQL statements',
+            ('method', 'endpoint'), LATENCY_BUCKETS
+        )
+        self.statements = Histogram(
+            'hbnb_sql_statement_duration_seconds',
+            'Time to run one SQL statement',
+            ('bind',), SQL_BUCKETS
+        )
+        self.operations = Histogram(
+            'hbnb_operation_duration_seconds',
+            'Time spent in instrumented operations (bcrypt, serialization)',
+            ('operation',), LATENCY_BUCKETS
+        )
+        self.histograms = (
+            self.requests, self.request_statements, self.request_sql,
+            self.statements, self.operations
+        )
+        self.collectors = []
+
+    def expose(self):
+        lines = []
+        for histogram in self.histograms:
+            lines.extend(histogram.expose())
+        for prefix, collect, counters in self.collectors:
+            for name, kind, value in _samples(prefix, collect(), counters):
+                lines.append(f'# TYPE {name} {kind}')
+                lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _current_state():
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('metrics')
+
+
+@contextmanager
+def timed(operation):
+    """Record the duration of the block under operation, if enabled"""
+    state = _current_state()
+    if state is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        state.operations.observe(time.perf_counter() - start, (operation,))
+
+
+class Metrics:
+    """Flask extension recording request metrics"""
+
+    def init_app(self, app, engines=None):
+        """Hook the requests and the engines of app, if enabled
+
+        engines maps bind names to engines (db.engines); None is the
+        default bind.
+        """
+        if not app.config.get('METRICS_ENABLED', False):
+            app.extensions['metrics'] = None
+            return
+        state = app.extensions['metrics'] = _MetricsState()
+        for bind, engine in (engines or {}).items():
+            self._instrument_engine(state, engine, bind or 'default')
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.add_url_rule(
+            app.config.get('METRICS_PATH', '/metrics'), 'metrics',
+            self._metrics_view
+        )
+
+    def add_collector(self, app, prefix, collect, counters=()):
+        """Expose the numbers of the dict collect() returns
+
+        Nested keys are joined to prefix with underscores. The keys in
+        counters, at any depth, are counters and get a _total suffix;
+        the other numbers are gauges. E.g. prefix 'hbnb_response_cache',
+        counters ('hits',) and {'hits': 3, 'size': 2} give
+        hbnb_response_cache_hits_total 3.0 and hbnb_response_cache_size
+        2.0.
+        """
+        state = app.extensions.get('metrics')
+        if state is not None:
+            state.collectors.append((prefix, collect, frozenset(counters)))
+
+    @staticmethod
+    def _instrument_engine(state, engine, bind):
+        labels = (bind,)
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_statement(conn, cursor, statement, parameters, context,
+                            executemany):
+            conn.info.setdefault('metrics_start', []).append(
+                time.perf_counter()
+            )
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def finish_statement(conn, cursor, statement, parameters, context,
+                             executemany):
+            elapsed = time.perf_counter() - conn.info['metrics_start'].pop()
+            state.statements.observe(elapsed, labels)
+            totals = g.get('metrics_sql') if has_app_context() else None
+            if totals is not None:
+                totals[0] += 1
+                totals[1] += elapsed
+
+        @event.listens_for(engine, 'handle_error')
+        def discard_statement(exception_context):
+            connection = exception_context.connection
+            if connection is not None and connection.info.get(
+                'metrics_start'
+            ):
+                connection.info['metrics_start'].pop()
+
+    @staticmethod
+    def _start_request():
+        g.metrics_start = time.perf_counter()
+        # Statement count and seconds, updated by the engine events
+        g.metrics_sql = [0, 0.0]
+
+    @staticmethod
+    def _finish_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        state = current_app.extensions['metrics']
+        rule = request.url_rule
+        endpoint = rule.rule if rule is not None else 'unmatched'
+        count, sql_time = g.pop('metrics_sql')
+        labels = (request.method, endpoint)
+        state.request_statements.observe(count, labels)
+        state.request_sql.observe(sql_time, labels)
+        state.requests.observe(
+            time.perf_counter() - start, labels + (response.status_code,)
+        )
+        return response
+
+    @staticmethod
+    def _metrics_view():
+        # The metrics describe the traffic and the internals of the
+        # service: only admins may read them
+        verify_jwt_in_request()
+        if not get_jwt().get('is_admin', False):
+            return {'error': 'Admin privileges required'}, 403
+        state = current_app.extensions['metrics']
+        return Response(state.expose(), mimetype=None,
+                        content_type=CONTENT_TYPE)
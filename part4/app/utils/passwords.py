@@ -0,0 +1,132 @@
+"""Password hashing service.
+
+bcrypt is slow on purpose, so running it in the request thread keeps a
+worker busy for the whole computation. PasswordHasher runs it in a small
+process pool instead, configured with:
+
+- ``BCRYPT_LOG_ROUNDS``: cost factor of new hashes
+- ``PASSWORD_HASH_WORKERS``: size of the process pool; 0 hashes in the
+  calling thread (development and tests)
+- ``PASSWORD_HASH_MAX_PENDING``: hashing jobs allowed in flight at once;
+  callers wait up to ``PASSWORD_HASH_TIMEOUT`` seconds for a slot, then
+  get a PasswordHasherBusyError instead of queueing without bound
+
+Hashes are standard ``$2b$`` strings, compatible with Flask-Bcrypt.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from flask import current_app
+
+from app.utils.metrics import timed
+
+DEFAULT_ROUNDS = 12
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Raised when no hashing slot frees up within the timeout"""
+
+
+def _hash_password(password, rounds):
+    """Hash a password (bytes); runs in a pool process"""
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(password, password_hash):
+    """Check a password (bytes) against a hash; runs in a pool process"""
+    return bcrypt.checkpw(password, password_hash)
+
+
+def get_rounds(password_hash):
+    """Cost factor of a bcrypt hash ('$2b$12$...' gives 12)"""
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class _HasherState:
+    """Per-application settings and process pool"""
+
+    def __init__(self, rounds, workers, max_pending, timeout):
+        self.rounds = rounds
+        self.workers = workers
+        self.timeout = timeout
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.executor = None
+        self.pid = None
+
+    def _get_executor(self):
+        # Created on first use, and again in a forked server process,
+        # which cannot use the pool of its parent
+        with self.lock:
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+                self.pid = os.getpid()
+            return self.executor
+
+    def run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if not self.slots.acquire(timeout=self.timeout):
+            raise PasswordHasherBusyError(
+                "Too many password hashing requests"
+            )
+        try:
+            return self._get_executor().submit(func, *args).result()
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        with self.lock:
+            if self.executor is not None and self.pid == os.getpid():
+                self.executor.shutdown()
+            self.executor = None
+
+
+class PasswordHasher:
+    """Flask extension hashing and checking passwords with bcrypt"""
+
+    def init_app(self, app):
+        app.extensions['password_hasher'] = _HasherState(
+            app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_ROUNDS),
+            app.config.get('PASSWORD_HASH_WORKERS', 0),
+            app.config.get('PASSWORD_HASH_MAX_PENDING', 8),
+            app.config.get('PASSWORD_HASH_TIMEOUT', 5)
+        )
+
+    @property
+    def _state(self):
+        return current_app.extensions['password_hasher']
+
+    @property
+    def rounds(self):
+        return self._state.rounds
+
+    def hash(self, password):
+        """Return the bcrypt hash of a password at the configured cost"""
+        state = self._state
+        with timed('bcrypt_hash'):
+            return state.run(_hash_password, password.encode('utf-8'),
+                             state.rounds)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        if not password_hash or password is None:
+            return False
+        with timed('bcrypt_verify'):
+            return self._state.run(
+                _check_password, password.encode('utf-8'),
+                password_hash.encode('utf-8')
+            )
+
+    def needs_rehash(self, password_hash):
+        """Whether a hash was made with a different cost than configured"""
+        return get_rounds(password_hash) != self._state.rounds
+
+    def shutdown(self):
+        """Stop the process pool of the current application"""
+        self._state.shutdown()
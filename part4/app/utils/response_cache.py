@@ -0,0 +1,236 @@
+"""Whole-response cache for public list endpoints.
+
+The place and amenity lists are the same for every anonymous visitor, so
+ResponseCache stores their rendered JSON (body, status and headers) and
+serves it again without touching the database. Entries are keyed by path,
+query string and auth scope; requests sending credentials are not cached.
+
+Freshness is controlled by:
+
+- ``RESPONSE_CACHE_TTL``: seconds an entry is served as is
+- ``RESPONSE_CACHE_STALE_TTL``: seconds an expired entry may still be
+  served while a single request rebuilds it (stale-while-revalidate)
+- writes: CachedRepository calls ``invalidate(namespace)`` after every
+  write to places or amenities, which makes the entries built from that
+  namespace stale immediately
+
+Entries are built from the primary database, not the read replica.
+A missing entry is built by one request at a time per key, so a cold
+cache does not send every concurrent visitor to the database.
+Invalidations only reach the current process: with several workers, the
+TTL bounds how long another worker serves a list from before a write.
+"""
+import functools
+import threading
+import time
+from urllib.parse import urlencode
+
+from flask import current_app, request
+from flask_restx.utils import unpack
+from werkzeug.wrappers import Response
+
+from app.persistence.cache import LocalCacheBackend
+from app.persistence.routing import primary_reads
+from app.utils.serialization import output_json
+
+# Requests building an entry wait this long for another one building the
+# same key before building it themselves
+BUILD_WAIT_TIMEOUT = 10  # seconds
+
+
+class _ResponseCacheState:
+    """Per-application backend, write generations and counters"""
+
+    def __init__(self, backend, ttl, stale_ttl, lock_count=64):
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock = threading.Lock()
+        self.generations = {}
+        # Striped locks, so concurrent builds of one key are serialized
+        # without keeping a lock per key
+        self.build_locks = [threading.Lock() for _ in range(lock_count)]
+        self.counters = {'hits': 0, 'stale_hits': 0, 'misses': 0}
+
+    def build_lock(self, key):
+        return self.build_locks[hash(key) % len(self.build_locks)]
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+
+class ResponseCache:
+    """Flask extension caching the responses of public GET endpoints"""
+
+    def init_app(self, app):
+        ttl = app.config.get('RESPONSE_CACHE_TTL', 10)
+        stale_ttl = app.config.get('RESPONSE_CACHE_STALE_TTL', 30)
+        backend = None
+        if app.config.get('RESPONSE_CACHE_ENABLED', False):
+            backend = app.config.get('RESPONSE_CACHE_BACKEND', 'local')
+            if backend == 'local':
+                backend = LocalCacheBackend(
+                    app.config.get('RESPONSE_CACHE_MAX_SIZE', 1000),
+                    ttl + stale_ttl
+                )
+            elif isinstance(backend, str):
+                raise ValueError(
+                    f"Unknown RESPONSE_CACHE_BACKEND: {backend}"
+                )
+        app.extensions['response_cache'] = _ResponseCacheState(
+            backend, ttl, stale_ttl
+        )
+
+    @property
+    def _state(self):
+        return current_app.extensions.get('response_cache')
+
+    @property
+    def enabled(self):
+        state = self._state
+        return state is not None and state.backend is not None
+
+    def invalidate(self, namespace):
+        """Mark every entry built from namespace as stale"""
+        state = self._state
+        if state is None:
+            return
+        with state.lock:
+            state.generations[namespace] = (
+                state.generations.get(namespace, 0) + 1
+            )
+
+    def clear(self):
+        if self.enabled:
+            self._state.backend.clear()
+
+    def stats(self):
+        """Hit, stale hit and miss counters plus backend statistics"""
+        state = self._state
+        if state is None or state.backend is None:
+            return {'enabled': False}
+        return dict(
+            state.counters, enabled=True, backend=state.backend.stats()
+        )
+
+    def cached(self, *namespaces):
+        """Cache the 200 responses of a Resource GET method
+
+        namespaces are the repository namespaces the response is built
+        from; a write to any of them makes the cached response stale.
+        """
+        def decorator(method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                scope = self._scope()
+                if not self.enabled or scope is None:
+                    return method(*args, **kwargs)
+                return self._respond(
+                    self._key(scope), namespaces,
+                    lambda: method(*args, **kwargs)
+                )
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _scope():
+        """Auth scope of the request, None when it must not be cached"""
+        if request.method != 'GET' or 'Authorization' in request.headers:
+            return None
+        return 'anonymous'
+
+    @staticmethod
+    def _key(scope):
+        # Same parameters in another order give the same entry
+        query = urlencode(sorted(request.args.items(multi=True)))
+        return f'{scope}:{request.path}?{query}'
+
+    def _generation(self, namespaces):
+        generations = self._state.generations
+        return tuple(generations.get(namespace, 0) for namespace in namespaces)
+
+    def _respond(self, key, namespaces, build):
+        state = self._state
+        generation = self._generation(namespaces)
+        entry = self._lookup(state, key)
+        if entry is not None and self._is_fresh(state, entry, generation):
+            state.count('hits')
+            return self._to_response(entry, 'HIT')
+
+        lock = state.build_lock(key)
+        if entry is not None:
+            # Serve the stale copy unless nobody is rebuilding it yet
+            if not lock.acquire(blocking=False):
+                state.count('stale_hits')
+                return self._to_response(entry, 'STALE')
+        else:
+            acquired = lock.acquire(timeout=BUILD_WAIT_TIMEOUT)
+            # Another request may have built it while this one waited
+            entry = self._lookup(state, key)
+            if entry is not None and self._is_fresh(
+                state, entry, self._generation(namespaces)
+            ):
+                if acquired:
+                    lock.release()
+                state.count('hits')
+                return self._to_response(entry, 'HIT')
+            if not acquired:
+                return build()
+
+        try:
+            # Build with the generation seen before reading the database:
+            # a write during the build leaves the new entry stale
+            generation = self._generation(namespaces)
+            # Entries outlive the request: build them from the primary,
+            # a lagging replica would pin stale lists for the whole TTL
+            with primary_reads():
+                response = self._render(build())
+            if response.status_code == 200:
+                state.backend.set(key, {
+                    'generation': generation,
+                    'created_at': time.time(),
+                    'status': response.status_code,
+                    'headers': list(response.headers.items()),
+                    'body': response.get_data()
+                })
+        finally:
+            lock.release()
+        state.count('misses')
+        response.headers['X-Cache'] = 'MISS'
+        return response
+
+    @staticmethod
+    def _lookup(state, key):
+        entry = state.backend.get(key)
+        if entry is not None and (
+            time.time() - entry['created_at'] > state.ttl + state.stale_ttl
+        ):
+            return None
+        return entry
+
+    @staticmethod
+    def _is_fresh(state, entry, generation):
+        return (
+            entry['generation'] == generation
+            and time.time() - entry['created_at'] <= state.ttl
+        )
+
+    @staticmethod
+    def _render(result):
+        """Turn what a Resource method returned into a JSON Response"""
+        if isinstance(result, Response):
+            return result
+        data, code, headers = unpack(result)
+        response = output_json(data, code, headers)
+        response.headers['Content-Type'] = 'application/json'
+        return response
+
+    @staticmethod
+    def _to_response(entry, cache_status):
+        response = Response(
+            entry['body'], status=entry['status'], headers=entry['headers']
+        )
+        response.headers['X-Cache'] = cache_status
+        # Answer If-None-Match and If-Modified-Since from the entry
+        return response.make_conditional(request)
@@ -0,0 +1,203 @@
+"""Field validation shared by the API handlers, the models and imports.
+
+Each model's fields are declared once below as a Schema. A rule factory
+such as ``text()`` or ``number_between()`` builds one check function per
+field when this module is imported (regular expressions included). A
+check takes the (obj, key, value) arguments of a SQLAlchemy
+``@validates`` hook and returns the value (converted, for ratings) or
+raises ValueError, so:
+
+- the models use the checks as their hooks, ``schema.validator(field)``,
+  with no call in between
+- other code calls ``schema.check(field, value)``
+- the API handlers call ``schema.clean(data)``, which lists the messages
+  of every invalid field, as in their ``{'error': 'Invalid input data',
+  'details': [...]}`` responses, and returns the checked values as
+  CheckedData
+- importer.py validates the rows of bulk imports with ``check()``
+
+so a value accepted by the API is accepted by the model, with the same
+error message when it is not. The models store the checked fields of
+CheckedData without running their hooks (see ``BaseModel.set_fields``):
+each rule runs once per write. A field stays checked only while it holds
+the value clean() checked: one set afterwards goes through its hook.
+"""
+import re
+
+from sqlalchemy.orm import validates
+
+EMAIL_PATTERN = re.compile(
+    r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+)
+
+
+def text(message, max_length=None, too_long=None):
+    """Non-blank string, of at most max_length characters"""
+    def check(obj, key, value):
+        if not isinstance(value, str) or value.strip() == "":
+            raise ValueError(message)
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(too_long)
+        return value
+    return check
+
+
+def matches(pattern, message):
+    """String matching a compiled regular expression"""
+    match = pattern.match
+
+    def check(obj, key, value):
+        if not isinstance(value, str) or not match(value):
+            raise ValueError(message)
+        return value
+    return check
+
+
+def positive_number(type_message, message):
+    """int or float greater than 0"""
+    def check(obj, key, value):
+        if not isinstance(value, (int, float)):
+            raise ValueError(type_message)
+        if value <= 0:
+            raise ValueError(message)
+        return value
+    return check
+
+
+def number_between(low, high, type_message, message):
+    """int or float from low to high, bounds included"""
+    def check(obj, key, value):
+        if not isinstance(value, (int, float)):
+            raise ValueError(type_message)
+        if not (low <= value <= high):
+            raise ValueError(message)
+        return value
+    return check
+
+
+def integer_between(low, high, message):
+    """Value converted with int(), from low to high; returns the int"""
+    def check(obj, key, value):
+        try:
+            value = int(value)
+        except (ValueError, TypeError):
+            raise ValueError(message)
+        if not (low <= value <= high):
+            raise ValueError(message)
+        return value
+    return check
+
+
+class CheckedData(dict):
+    """Input data returned by Schema.clean(), with converted values
+
+    checked maps the schema fields that passed their checks to their
+    checked value.
+    """
+
+    def __init__(self, data, checked):
+        super().__init__(data)
+        self.checked = checked
+
+    @property
+    def fields(self):
+        """The checked fields still holding their checked value"""
+        return frozenset(
+            field for field, value in self.checked.items()
+            if field in self and self[field] is value
+        )
+
+    def copy(self):
+        return CheckedData(self, self.checked)
+
+
+def checked_fields(data):
+    """The fields of data whose value was checked (none for a plain dict)"""
+    if isinstance(data, CheckedData):
+        return data.fields
+    return frozenset()
+
+
+def select(data, keys):
+    """The items of data whose key is in keys, still CheckedData if it was"""
+    items = {key: data[key] for key in keys if key in data}
+    if isinstance(data, CheckedData):
+        return CheckedData(items, data.checked)
+    return items
+
+
+class Schema:
+    """The checks of a model's fields, in declaration order"""
+
+    def __init__(self, **checks):
+        self.checks = checks
+
+    def check(self, field, value):
+        """Return the validated value of field or raise ValueError"""
+        return self.checks[field](None, field, value)
+
+    def validator(self, field):
+        """The check of field as a model @validates method"""
+        return validates(field)(self.checks[field])
+
+    def clean(self, data, partial=False):
+        """Check the fields of data, returning (values, errors)
+
+        values is a CheckedData copy of data holding the converted value
+        of every valid field; errors has the message of every invalid
+        field, in declaration order. A missing field is checked as None,
+        unless partial is True (as for updates): then only the fields
+        present in data are checked.
+        """
+        values = dict(data)
+        checked = {}
+        errors = []
+        for field, check in self.checks.items():
+            if partial and field not in data:
+                continue
+            try:
+                values[field] = checked[field] = check(
+                    None, field, data.get(field)
+                )
+            except ValueError as e:
+                errors.append(str(e))
+        return CheckedData(values, checked), errors
+
+
+user_schema = Schema(
+    first_name=text("First name cannot be empty"),
+    last_name=text("Last name cannot be empty"),
+    email=matches(EMAIL_PATTERN, "Invalid email format")
+)
+
+place_schema = Schema(
+    title=text(
+        "Title cannot be empty", 100,
+        "Title must be a maximum of 100 characters"
+    ),
+    price=positive_number(
+        "Price must be a number", "Price must be a positive number"
+    ),
+    latitude=number_between(
+        -90.0, 90.0, "Latitude must be a number",
+        "Latitude must be between -90 and 90"
+    ),
+    longitude=number_between(
+        -180.0, 180.0, "Longitude must be a number",
+        "Longitude must be between -180 and 180"
+    )
+)
+
+review_schema = Schema(
+    text=text("Review text cannot be empty"),
+    rating=integer_between(
+        1, 5, "Rating must be an integer between 1 and 5"
+    )
+)
+
+amenity_schema = Schema(
+    name=text(
+        "Amenity name cannot be empty", 50,
+        "Amenity name must be a maximum of 50 characters"
+    )
+)
@@ -0,0 +1,7 @@
+"""Performance benchmarks for the HBnB API.
+
+Each module is a standalone script meant to be run from the ``part4``
+directory, for example::
+
+    python -m benchmarks.reviews_by_place --reviews 1000000
+"""
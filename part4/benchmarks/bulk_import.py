@@ -0,0 +1,111 @@
+"""Benchmark the bulk import of amenities, places and reviews.
+
+Seeds users, writes NDJSON (or CSV) files of synthetic amenities, places
+and reviews referencing them, then imports each file with
+``HBnBFacade.import_records`` (the code behind ``flask import-data`` and
+the ``/import`` endpoints) and prints rows per second.
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+
+from app.services import facade
+from app.services.importer import read_records
+from benchmarks.common import benchmark_app, seed_users
+
+
+def write_records(path, fmt, records):
+    """Write dicts as NDJSON, or as CSV with amenity ids joined by ;"""
+    with open(path, 'w', newline='') as f:
+        if fmt == 'ndjson':
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+            return
+        writer = None
+        for record in records:
+            if 'amenities' in record:
+                record['amenities'] = ';'.join(record['amenities'])
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(record))
+                writer.writeheader()
+            writer.writerow(record)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=100000)
+    parser.add_argument('--reviews', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--amenities', type=int, default=50)
+    parser.add_argument('--format', dest='fmt', default='ndjson',
+                        choices=('ndjson', 'csv'))
+    parser.add_argument('--batch-size', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.reviews > args.places * (args.users - 1):
+        parser.error('too many reviews for the places and users')
+
+    with benchmark_app() as app, tempfile.TemporaryDirectory() as tmpdir:
+        user_ids = seed_users(args.users)
+        amenity_ids = [f'amenity-{i}' for i in range(args.amenities)]
+        place_ids = [f'place-{i}' for i in range(args.places)]
+        files = {
+            'amenities': [
+                {'id': amenity_id, 'name': f'Amenity {i}'}
+                for i, amenity_id in enumerate(amenity_ids)
+            ],
+            'places': (
+                {
+                    'id': place_id,
+                    'title': f'Place {i}',
+                    'price': float(50 + i % 200),
+                    'latitude': (i % 180) - 90.0,
+                    'longitude': (i % 360) - 180.0,
+                    'owner_id': user_ids[i % len(user_ids)],
+                    'amenities': [
+                        amenity_ids[i % len(amenity_ids)],
+                        amenity_ids[(i + 1) % len(amenity_ids)]
+                    ]
+                }
+                for i, place_id in enumerate(place_ids)
+            ),
+            # Place i is owned by user i % users; review i goes to place
+            # p = i % places from user p + 1 + i // places (mod users),
+            # never its owner nor twice the same user
+            'reviews': (
+                {
+                    'text': 'Benchmark review',
+                    'rating': 1 + i % 5,
+                    'place_id': place_ids[i % len(place_ids)],
+                    'user_id': user_ids[
+                        (i % len(place_ids) + 1 + i // len(place_ids))
+                        % len(user_ids)
+                    ]
+                }
+                for i in range(args.reviews)
+            )
+        }
+        batch_size = args.batch_size or app.config['IMPORT_BATCH_SIZE']
+        for kind, records in files.items():
+            path = os.path.join(tmpdir, f'{kind}.{args.fmt}')
+            write_records(path, args.fmt, records)
+            with open(path, encoding='utf-8', newline='') as f:
+                start = time.perf_counter()
+                result = facade.import_records(
+                    kind, read_records(f, args.fmt, kind), batch_size
+                )
+                elapsed = time.perf_counter() - start
+            print(
+                f'{kind:<10} {result.succeeded:>8} rows  '
+                f'{result.failed:>6} failed  '
+                f'{result.succeeded / elapsed:10.0f} rows/s'
+            )
+            for error in result.errors[:5]:
+                print(f'  line {error["line"]}: {error["error"]}')
+
+
+if __name__ == '__main__':
+    main()
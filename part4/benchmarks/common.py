@@ -0,0 +1,199 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app import create_app, db, password_hasher
+from config import TestingConfig
+from app.models.user import User
+from app.models.amenity import Amenity
+from app.models.place import Place, place_amenity
+from app.models.review import Review
+from app.utils.geo import encode_geohash
+
+CHUNK_SIZE = 50000
+PASSWORD = 'benchmark'
+
+
+def make_config(db_path, **settings):
+    """Build a config class pointing at the benchmark database
+
+    settings override config attributes, e.g. BCRYPT_LOG_ROUNDS=12.
+    """
+    attributes = {
+        'DEBUG': False,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'
+    }
+    attributes.update(settings)
+    return type('BenchmarkConfig', (TestingConfig,), attributes)
+
+
+@contextmanager
+def benchmark_app(**settings):
+    """Yield an app bound to a fresh SQLite file inside an app context"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        app = create_app(
+            make_config(os.path.join(tmpdir, 'benchmark.db'), **settings)
+        )
+        with app.app_context():
+            db.create_all()
+            try:
+                yield app
+            finally:
+                db.session.remove()
+                db.engine.dispose()
+                password_hasher.shutdown()
+
+
+def bulk_insert(table, rows):
+    """Insert rows in chunks, one transaction per chunk"""
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(table), rows[start:start + CHUNK_SIZE])
+        db.session.commit()
+
+
+def seed_users(count):
+    """Bulk insert users sharing one password hash, returning their ids"""
+    now = datetime.utcnow()
+    password = password_hasher.hash(PASSWORD)
+    users = [
+        {
+            'id': str(uuid.uuid4()),
+            'first_name': 'Bench',
+            'last_name': f'User{i}',
+            'email': f'bench{i}@example.com',
+            'password': password,
+            'is_admin': False,
+            'created_at': now,
+            'updated_at': now
+        }
+        for i in range(count)
+    ]
+    bulk_insert(User.__table__, users)
+    return [user['id'] for user in users]
+
+
+def place_row(index, owner_id, latitude, longitude, now):
+    """Build the row of a synthetic place"""
+    return {
+        'id': str(uuid.uuid4()),
+        'title': f'Place {index}',
+        'description': '',
+        'price': float(50 + index % 200),
+        'latitude': latitude,
+        'longitude': longitude,
+        'geohash': encode_geohash(latitude, longitude),
+        'owner_id': owner_id,
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def seed_places(count, owner_ids, coordinates=None):
+    """Bulk insert places, returning their ids
+
+    coordinates is an optional callable returning (latitude, longitude)
+    for a place index; places are spread on a regular grid otherwise.
+    """
+    now = datetime.utcnow()
+    if coordinates is None:
+        def coordinates(i):
+            return (i % 180) - 90.0, (i % 360) - 180.0
+
+    place_ids = []
+    for start in range(0, count, CHUNK_SIZE):
+        rows = [
+            place_row(i, owner_ids[i % len(owner_ids)], *coordinates(i), now)
+            for i in range(start, min(start + CHUNK_SIZE, count))
+        ]
+        db.session.execute(insert(Place.__table__), rows)
+        db.session.commit()
+        place_ids.extend(row['id'] for row in rows)
+    return place_ids
+
+
+def seed_amenities(count):
+    """Bulk insert amenities, returning their ids"""
+    now = datetime.utcnow()
+    amenities = [
+        {
+            'id': str(uuid.uuid4()),
+            'name': f'Amenity {i}',
+            'created_at': now,
+            'updated_at': now
+        }
+        for i in range(count)
+    ]
+    bulk_insert(Amenity.__table__, amenities)
+    return [amenity['id'] for amenity in amenities]
+
+
+def seed_place_amenities(place_ids, amenity_ids, per_place):
+    """Link each place to per_place consecutive amenities"""
+    per_place = min(per_place, len(amenity_ids))
+    bulk_insert(place_amenity, [
+        {
+            'place_id': place_id,
+            'amenity_id': amenity_ids[(i + n) % len(amenity_ids)]
+        }
+        for i, place_id in enumerate(place_ids)
+        for n in range(per_place)
+    ])
+
+
+def seed_reviews(count, user_ids, place_ids):
+    """Bulk insert reviews without ever reviewing a place twice
+
+    The review totals stored on places are left as they are: call
+    rebuild_review_totals() when they matter.
+    """
+    now = datetime.utcnow()
+    # Review i goes to place i % len(place_ids) from user
+    # i // len(place_ids), so a user never reviews the same place twice
+    for start in range(0, count, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, count)
+        rows = [
+            {
+                'id': str(uuid.uuid4()),
+                'text': 'Benchmark review',
+                'rating': 1 + i % 5,
+                'user_id': user_ids[(i // len(place_ids)) % len(user_ids)],
+                'place_id': place_ids[i % len(place_ids)],
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(start, stop)
+        ]
+        db.session.execute(insert(Review.__table__), rows)
+        db.session.commit()
+
+
+def time_call(func, iterations):
+    """Run func several times and return the timings in milliseconds"""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+        db.session.expunge_all()
+    return timings
+
+
+def percentile(timings, fraction):
+    """Timing at the given fraction (0-1) of the sorted timings"""
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(label, timings, detail=''):
+    """Print a one-line summary for a set of timings"""
+    print(
+        f'{label:<28} median {statistics.median(timings):10.2f} ms  '
+        f'min {min(timings):10.2f} ms  {detail}'
+    )
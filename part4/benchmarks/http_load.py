@@ -0,0 +1,164 @@
+"""Compare the throughput of the development server and gunicorn.
+
+Seeds a fresh SQLite database, starts each server on it as a separate
+process, then runs concurrent keep-alive HTTP clients against a few read
+endpoints for a fixed time and prints requests per second and latency
+percentiles::
+
+    python -m benchmarks.http_load --servers dev,gunicorn --duration 10
+
+Both servers load the same ``wsgi:app`` with production settings, so
+only the server differs. gunicorn uses gunicorn.conf.py, tunable with
+its environment variables (WEB_CONCURRENCY, GUNICORN_THREADS, ...).
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from app import db
+from benchmarks.common import (
+    benchmark_app, seed_users, seed_places, percentile
+)
+
+SERVER_COMMANDS = {
+    'dev': [
+        sys.executable, '-m', 'flask', '--app', 'wsgi', 'run',
+        '--host', '127.0.0.1', '--port', '{port}',
+        '--no-reload', '--no-debugger'
+    ],
+    'gunicorn': [
+        sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+        '--bind', '127.0.0.1:{port}', 'wsgi:app'
+    ]
+}
+
+
+def start_server(kind, port, database_uri, settings=None):
+    """Start a server process and wait until it answers
+
+    settings are extra environment variables, e.g. config overrides.
+    """
+    command = [part.format(port=port) for part in SERVER_COMMANDS[kind]]
+    env = dict(
+        os.environ,
+        FLASK_ENV='production',
+        DATABASE_URL=database_uri,
+        SECRET_KEY='benchmark',
+        GUNICORN_ACCESS_LOG='',
+        # Only anonymous reads: no token is ever revoked
+        REVOCATION_BACKEND='local',
+        GUNICORN_ALLOW_LOCAL_REVOCATION='true',
+        **(settings or {})
+    )
+    process = subprocess.Popen(
+        command, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'{kind} server exited, is it installed?')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/api/v1/amenities/')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f'{kind} server did not start')
+
+
+def run_load(port, paths, concurrency, duration):
+    """Request paths round-robin until duration, per-client connections
+
+    Returns (elapsed seconds, latencies in ms, number of errors).
+    """
+    timings = []
+    errors = []
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        count = offset
+        while time.monotonic() < deadline:
+            path = paths[count % len(paths)]
+            count += 1
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors.append(path)
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+                continue
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status != 200:
+                errors.append(path)
+        connection.close()
+
+    threads = [
+        threading.Thread(target=client, args=(n,))
+        for n in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, timings, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--servers', default='dev,gunicorn',
+                        help='comma-separated servers to compare')
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='seconds of load per server')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with benchmark_app() as app:
+        user_ids = seed_users(100)
+        place_ids = seed_places(args.places, user_ids)
+        database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+        db.session.remove()
+        db.engine.dispose()
+
+        paths = [
+            '/api/v1/places/?limit=20',
+            f'/api/v1/places/{place_ids[0]}',
+            '/api/v1/amenities/'
+        ]
+        for kind in args.servers.split(','):
+            process = start_server(kind, args.port, database_uri)
+            try:
+                elapsed, timings, errors = run_load(
+                    args.port, paths, args.concurrency, args.duration
+                )
+            finally:
+                process.terminate()
+                process.wait()
+            if not timings:
+                print(f'{kind:<10} no successful request')
+                continue
+            print(
+                f'{kind:<10} {len(timings) / elapsed:9.1f} req/s  '
+                f'p50 {statistics.median(timings):7.1f} ms  '
+                f'p95 {percentile(timings, 0.95):7.1f} ms  '
+                f'p99 {percentile(timings, 0.99):7.1f} ms  '
+                f'errors {errors}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+"""Load-test the read endpoints of the API at several dataset sizes.
+
+For each scale, seeds a fresh SQLite database with bulk inserts (users,
+amenities, places linked to amenities, reviews), then runs concurrent
+clients against each endpoint in turn and reports, per endpoint, the
+throughput and the p50/p95/p99 latencies as JSON::
+
+    python -m benchmarks.load_suite --scales small,medium \\
+        --target client --output load.json
+    python -m benchmarks.load_suite --compare load.json
+
+The target is the Flask test client in this process (``client``, no
+network, measures the application) or a server started on the seeded
+database like benchmarks/http_load.py does (``dev`` or ``gunicorn``).
+A scale is a preset name or users:places:amenities:reviews counts.
+Requests use a fixed random seed, so two runs send the same requests.
+
+The entity and response caches are disabled, so every request reaches
+the database: with them, list endpoints mostly measure cache hits. Use
+``--cache`` to measure with both caches enabled; the report records
+which one was run, and a comparison between the two is refused.
+
+With ``--compare``, the run is compared to a previous JSON report and
+endpoints whose p95 grew by more than ``--threshold`` are listed; the
+exit status is 1 when there are any, for use between two commits.
+"""
+import argparse
+import http.client
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.services import facade
+from benchmarks.common import (
+    benchmark_app, percentile, seed_amenities, seed_place_amenities,
+    seed_places, seed_reviews, seed_users
+)
+from benchmarks.http_load import start_server
+
+SCALES = {
+    'small': {'users': 100, 'places': 1000, 'amenities': 20,
+              'reviews': 5000},
+    'medium': {'users': 1000, 'places': 10000, 'amenities': 50,
+               'reviews': 50000},
+    'large': {'users': 10000, 'places': 100000, 'amenities': 100,
+              'reviews': 500000}
+}
+AMENITIES_PER_PLACE = 3
+# Distinct ids each endpoint cycles through
+SAMPLE_SIZE = 200
+SECRET_KEY = 'benchmark'
+
+
+def parse_scale(name):
+    """Dataset counts of a preset name or of users:places:amenities:reviews"""
+    if name in SCALES:
+        return SCALES[name]
+    try:
+        users, places, amenities, reviews = (
+            int(count) for count in name.split(':')
+        )
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f'unknown scale {name!r}: use {", ".join(SCALES)} or '
+            'users:places:amenities:reviews'
+        )
+    return {'users': users, 'places': places, 'amenities': amenities,
+            'reviews': reviews}
+
+
+def seed_dataset(counts):
+    """Bulk insert a synthetic dataset, returning the ids of each table"""
+    user_ids = seed_users(counts['users'])
+    amenity_ids = seed_amenities(counts['amenities'])
+    place_ids = seed_places(counts['places'], user_ids)
+    if amenity_ids:
+        seed_place_amenities(place_ids, amenity_ids, AMENITIES_PER_PLACE)
+    seed_reviews(counts['reviews'], user_ids, place_ids)
+    facade.rebuild_review_totals()
+    return {'users': user_ids, 'places': place_ids, 'amenities': amenity_ids}
+
+
+def build_requests(ids, rng):
+    """(path, headers) lists of every endpoint, from sampled ids"""
+    def sample(values):
+        return rng.sample(values, min(SAMPLE_SIZE, len(values)))
+
+    place_ids = sample(ids['places'])
+    user_ids = sample(ids['users'])
+    coordinates = [
+        (rng.uniform(-89, 89), rng.uniform(-179, 179))
+        for _ in range(SAMPLE_SIZE)
+    ]
+    prices = [rng.randint(50, 200) for _ in range(SAMPLE_SIZE)]
+    return {
+        'places_list': [('/api/v1/places/?limit=20', {})],
+        'place_detail': [
+            (f'/api/v1/places/{place_id}', {}) for place_id in place_ids
+        ],
+        'place_reviews': [
+            (f'/api/v1/reviews/places/{place_id}/reviews', {})
+            for place_id in place_ids
+        ],
+        'places_search': [
+            (f'/api/v1/places/search?min_price={price}'
+             f'&max_price={price + 25}&limit=20', {})
+            for price in prices
+        ],
+        'places_nearby': [
+            (f'/api/v1/places/nearby?lat={lat:.4f}&lon={lon:.4f}'
+             '&radius_km=200&limit=20', {})
+            for lat, lon in coordinates
+        ],
+        'amenities_list': [('/api/v1/amenities/', {})],
+        'user_detail': [
+            (f'/api/v1/users/{user_id}', {
+                'Authorization': 'Bearer ' + create_access_token(
+                    identity=user_id, additional_claims={'is_admin': False}
+                )
+            })
+            for user_id in user_ids
+        ]
+    }
+
+
+def test_client_session(app):
+    """A get(path, headers) -> status function over a test client"""
+    client = app.test_client()
+
+    def get(path, headers):
+        return client.get(path, headers=headers).status_code
+    return get, lambda: None
+
+
+def http_session(port):
+    """A get(path, headers) -> status function over one connection"""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+
+    def get(path, headers):
+        nonlocal connection
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            return None
+    return get, lambda: connection.close()
+
+
+def run_endpoint(new_session, requests, concurrency, duration, warmup):
+    """Send requests from concurrent clients for duration seconds
+
+    Each client first sends warmup requests that are not measured.
+    """
+    timings = []
+    errors = []
+    ready = threading.Barrier(concurrency + 1)
+
+    def client(offset):
+        get, close = new_session()
+        for i in range(warmup):
+            get(*requests[(offset + i) % len(requests)])
+        ready.wait()
+        ready.wait()
+        count = offset
+        while time.perf_counter() < deadline:
+            path, headers = requests[count % len(requests)]
+            count += 1
+            start = time.perf_counter()
+            status = get(path, headers)
+            timings.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors.append(status)
+        close()
+
+    threads = [
+        threading.Thread(target=client, args=(n * 7,))
+        for n in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    # Start every client at once, after the warmup of all of them
+    ready.wait()
+    start = time.perf_counter()
+    deadline = start + duration
+    ready.wait()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return summarize(timings, errors, elapsed)
+
+
+def summarize(timings, errors, elapsed):
+    if not timings:
+        return {'requests': 0, 'errors': len(errors)}
+    return {
+        'requests': len(timings),
+        'errors': len(errors),
+        'throughput_rps': round(len(timings) / elapsed, 1),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'max_ms': round(max(timings), 3)
+    }
+
+
+def cache_settings(enabled):
+    """Config overrides enabling or disabling the entity/response caches"""
+    return {
+        'ENTITY_CACHE_ENABLED': enabled,
+        'RESPONSE_CACHE_ENABLED': enabled
+    }
+
+
+def run_scale(name, counts, args):
+    """Seed one scale and load every endpoint, returning its report"""
+    settings = cache_settings(args.cache)
+    with benchmark_app(SECRET_KEY=SECRET_KEY, **settings) as app:
+        start = time.perf_counter()
+        ids = seed_dataset(counts)
+        seed_seconds = time.perf_counter() - start
+        requests = build_requests(ids, random.Random(args.seed))
+        endpoints = [
+            endpoint for endpoint in requests
+            if not args.endpoints or endpoint in args.endpoints
+        ]
+
+        process = None
+        if args.target == 'client':
+            def new_session():
+                return test_client_session(app)
+        else:
+            database_uri = app.config['SQLALCHEMY_DATABASE_URI']
+            db.session.remove()
+            db.engine.dispose()
+            process = start_server(
+                args.target, args.port, database_uri,
+                {key: str(value).lower() for key, value in settings.items()}
+            )
+
+            def new_session():
+                return http_session(args.port)
+
+        results = {}
+        try:
+            for endpoint in endpoints:
+                results[endpoint] = run_endpoint(
+                    new_session, requests[endpoint], args.concurrency,
+                    args.duration, args.warmup
+                )
+                print_result(name, endpoint, results[endpoint])
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+    return {
+        'dataset': counts,
+        'seed_seconds': round(seed_seconds, 3),
+        'endpoints': results
+    }
+
+
+def print_result(scale, endpoint, result):
+    if not result['requests']:
+        print(f'{scale:<8} {endpoint:<16} no request completed',
+              file=sys.stderr)
+        return
+    print(
+        f'{scale:<8} {endpoint:<16} {result["throughput_rps"]:9.1f} req/s  '
+        f'p50 {result["p50_ms"]:8.2f}  p95 {result["p95_ms"]:8.2f}  '
+        f'p99 {result["p99_ms"]:8.2f} ms  errors {result["errors"]}',
+        file=sys.stderr
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, threshold):
+    """Endpoints whose p95 grew by more than threshold (a fraction)"""
+    regressions = []
+    for scale, scale_report in report['scales'].items():
+        previous_scale = baseline.get('scales', {}).get(scale, {})
+        for endpoint, result in scale_report['endpoints'].items():
+            previous = previous_scale.get('endpoints', {}).get(endpoint)
+            if not previous or 'p95_ms' not in previous or (
+                'p95_ms' not in result
+            ):
+                continue
+            change = result['p95_ms'] / previous['p95_ms'] - 1
+            if change > threshold:
+                regressions.append({
+                    'scale': scale,
+                    'endpoint': endpoint,
+                    'baseline_p95_ms': previous['p95_ms'],
+                    'p95_ms': result['p95_ms'],
+                    'change': round(change, 3)
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--scales', default='small',
+                        help='comma-separated scales (default: small)')
+    parser.add_argument('--target', default='client',
+                        choices=('client', 'dev', 'gunicorn'))
+    parser.add_argument('--endpoints', type=lambda value: value.split(','),
+                        help='comma-separated endpoints (default: all)')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=3.0,
+                        help='seconds of load per endpoint')
+    parser.add_argument('--warmup', type=int, default=5,
+                        help='unmeasured requests per client and endpoint')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache', action='store_true',
+                        help='enable the entity and response caches')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--output', help='write the JSON report there')
+    parser.add_argument('--compare', help='JSON report to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='p95 increase reported as a regression')
+    args = parser.parse_args()
+    scales = {name: parse_scale(name) for name in args.scales.split(',')}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # Reports from before --cache ran with the caches enabled
+        if baseline.get('cache', True) != args.cache:
+            parser.error(
+                f'{args.compare} was run '
+                f'{"with" if baseline.get("cache", True) else "without"} '
+                '--cache; run the same way to compare'
+            )
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'target': args.target,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'seed': args.seed,
+        'cache': args.cache,
+        'scales': {
+            name: run_scale(name, counts, args)
+            for name, counts in scales.items()
+        }
+    }
+    if baseline is not None:
+        report['baseline_commit'] = baseline.get('commit')
+        report['regressions'] = compare(report, baseline, args.threshold)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if report.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""Benchmark login throughput.
+
+Runs concurrent clients against ``POST /api/v1/auth/login`` for several
+sizes of the password hashing pool (0 hashes in the request thread), and
+measures the latency of a cheap request (the amenity list) sent while
+the logins are in progress, to show whether bcrypt starves other
+requests.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks.common import (
+    PASSWORD, benchmark_app, seed_users, percentile
+)
+
+
+def run(app, user_count, requests, concurrency):
+    """Send the logins, returning (elapsed, login and probe timings)"""
+    per_client = requests // concurrency
+    login_timings = []
+    probe_timings = []
+    failures = []
+    done = threading.Event()
+
+    def login_client(offset):
+        client = app.test_client()
+        for i in range(per_client):
+            email = f'bench{(offset + i) % user_count}@example.com'
+            start = time.perf_counter()
+            response = client.post('/api/v1/auth/login', json={
+                'email': email, 'password': PASSWORD
+            })
+            login_timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    def probe_client():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/api/v1/amenities/')
+            probe_timings.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.01)
+
+    clients = [
+        threading.Thread(target=login_client, args=(n * per_client,))
+        for n in range(concurrency)
+    ]
+    probe = threading.Thread(target=probe_client)
+    start = time.perf_counter()
+    probe.start()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    probe.join()
+    if failures:
+        raise SystemExit(f'{len(failures)} logins failed: {failures[:5]}')
+    return elapsed, login_timings, probe_timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=12,
+                        help='bcrypt cost factor')
+    parser.add_argument('--workers', default='0,2,4',
+                        help='comma-separated pool sizes to compare')
+    args = parser.parse_args()
+
+    for workers in (int(value) for value in args.workers.split(',')):
+        settings = {
+            'BCRYPT_LOG_ROUNDS': args.rounds,
+            'PASSWORD_HASH_WORKERS': workers,
+            'PASSWORD_HASH_MAX_PENDING': max(workers, 1) * 4,
+            'PASSWORD_HASH_TIMEOUT': 60
+        }
+        with benchmark_app(**settings) as app:
+            seed_users(args.users)
+            elapsed, logins, probes = run(
+                app, args.users, args.requests, args.concurrency
+            )
+        print(
+            f'workers={workers:<3} '
+            f'{len(logins) / elapsed:8.1f} logins/s  '
+            f'login p50 {statistics.median(logins):8.1f} ms '
+            f'p95 {percentile(logins, 0.95):8.1f} ms  '
+            f'other requests p50 {statistics.median(probes):7.1f} ms '
+            f'p95 {percentile(probes, 0.95):7.1f} ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
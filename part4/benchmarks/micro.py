@@ -0,0 +1,299 @@
+"""Microbenchmarks of model validation and serialization.
+
+Times the per-request hot paths of the models on 1, 100 and 10000
+objects, outside of any database round trip:
+
+- construction of users, places, reviews and amenities (every field
+  goes through its ``@validates`` hook)
+- assignments through the hooks alone (email, place fields, rating)
+- ``to_dict``/``to_summary_dict``/``to_detail_dict``, the compiled
+  serializers of app/utils/serialization.py and the JSON encoding
+
+Each case runs in a loop until the timing is stable and keeps the best
+of several repeats. Results are compared to a stored baseline
+(benchmarks/baselines/micro.json by default), and cases slower than the
+baseline by more than ``--threshold`` make the run exit with status 1::
+
+    python -m benchmarks.micro                  # compare to the baseline
+    python -m benchmarks.micro --save-baseline  # record a new baseline
+
+Baselines only compare runs on the same machine: record one before
+changing a hot path, then run again after the change.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.utils.serialization import (
+    output_json, place_serializer, place_summary_serializer,
+    review_serializer, user_serializer
+)
+from benchmarks.common import benchmark_app
+
+SIZES = (1, 100, 10000)
+BASELINE_PATH = os.path.join(
+    os.path.dirname(__file__), 'baselines', 'micro.json'
+)
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def make_users(size):
+    return [
+        User(
+            first_name=f'First{i}', last_name=f'Last{i}',
+            email=f'user{i}@example.com'
+        )
+        for i in range(size)
+    ]
+
+
+def make_places(size, owner_id='owner'):
+    return [
+        Place(
+            title=f'Place {i}', description='A place', price=50.0 + i % 200,
+            latitude=(i % 180) - 90.0, longitude=(i % 360) - 180.0,
+            owner_id=owner_id
+        )
+        for i in range(size)
+    ]
+
+
+def make_reviews(size):
+    return [
+        Review(text='Great stay', rating=1 + i % 5, place_id='place',
+               user_id='user')
+        for i in range(size)
+    ]
+
+
+def make_amenities(size):
+    return [Amenity(name=f'Amenity {i}') for i in range(size)]
+
+
+def stamped(objects):
+    """Give transient objects the timestamps a flush would set"""
+    for obj in objects:
+        obj.created_at = obj.updated_at = NOW
+    return objects
+
+
+def detailed_places(size):
+    """Places with an owner and two amenities, as the detail view has"""
+    owner = stamped(make_users(1))[0]
+    amenities = stamped(make_amenities(2))
+    places = stamped(make_places(size, owner.id))
+    for place in places:
+        place.owner = owner
+        place.amenities = list(amenities)
+    return places
+
+
+# Each case takes the number of objects and returns the function to
+# time, after building what it needs
+def construct(factory):
+    return lambda size: lambda: factory(size)
+
+
+def assign_email(size):
+    user = make_users(1)[0]
+    emails = [f'someone{i}@example.org' for i in range(size)]
+
+    def run():
+        for email in emails:
+            user.email = email
+    return run
+
+
+def assign_place_fields(size):
+    place = make_places(1)[0]
+    values = [
+        (f'Title {i}', 10.0 + i, (i % 180) - 90.0, (i % 360) - 180.0)
+        for i in range(size)
+    ]
+
+    def run():
+        for title, price, latitude, longitude in values:
+            place.title = title
+            place.price = price
+            place.latitude = latitude
+            place.longitude = longitude
+    return run
+
+
+def assign_rating(size):
+    review = make_reviews(1)[0]
+    ratings = [1 + i % 5 for i in range(size)]
+
+    def run():
+        for rating in ratings:
+            review.rating = rating
+    return run
+
+
+def call_each(method, objects):
+    def case(size):
+        items = objects(size)
+        return lambda: [method(item) for item in items]
+    return case
+
+
+def serialize(serializer, objects):
+    def case(size):
+        items = objects(size)
+        return lambda: serializer.many(items)
+    return case
+
+
+def encode_places(size):
+    places = stamped(make_places(size))
+
+    def run():
+        return output_json(
+            {'items': place_summary_serializer.many(places)}, 200
+        )
+    return run
+
+
+CASES = {
+    'construct_user': construct(make_users),
+    'construct_place': construct(make_places),
+    'construct_review': construct(make_reviews),
+    'construct_amenity': construct(make_amenities),
+    'validate_email': assign_email,
+    'validate_place_fields': assign_place_fields,
+    'validate_rating': assign_rating,
+    'user_to_dict': call_each(
+        User.to_dict, lambda size: stamped(make_users(size))
+    ),
+    'place_to_dict': call_each(
+        Place.to_dict, lambda size: stamped(make_places(size))
+    ),
+    'place_to_summary_dict': call_each(
+        Place.to_summary_dict, lambda size: stamped(make_places(size))
+    ),
+    'place_to_detail_dict': call_each(Place.to_detail_dict, detailed_places),
+    'review_to_dict': call_each(
+        Review.to_dict, lambda size: stamped(make_reviews(size))
+    ),
+    'user_serializer': serialize(
+        user_serializer, lambda size: stamped(make_users(size))
+    ),
+    'place_serializer': serialize(
+        place_serializer, lambda size: stamped(make_places(size))
+    ),
+    'review_serializer': serialize(
+        review_serializer, lambda size: stamped(make_reviews(size))
+    ),
+    'place_list_json': encode_places
+}
+
+
+def measure(run, min_time, repeat):
+    """Best time of one run, in seconds, over repeat timed loops"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed * 4 > min_time else 10
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def compare(results, baseline, threshold):
+    """Cases slower than their baseline by more than threshold"""
+    regressions = []
+    for case, timings in results.items():
+        for size, seconds in timings.items():
+            previous = baseline.get(case, {}).get(size)
+            if previous and seconds > previous * (1 + threshold):
+                regressions.append((case, size, previous, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--cases', type=lambda value: value.split(','),
+                        help='comma-separated cases (default: all)')
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    parser.add_argument('--min-time', type=float, default=0.05,
+                        help='seconds per timed loop')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='slowdown reported as a regression')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    unknown = set(args.cases or ()) - set(CASES)
+    if unknown:
+        parser.error(f'unknown cases: {", ".join(sorted(unknown))}')
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    results = {}
+    with benchmark_app() as app, app.test_request_context():
+        for case, make_run in CASES.items():
+            if args.cases and case not in args.cases:
+                continue
+            results[case] = {}
+            for size in sizes:
+                seconds = measure(make_run(size), args.min_time, args.repeat)
+                results[case][str(size)] = seconds
+                previous = baseline.get(case, {}).get(str(size))
+                change = (
+                    f'{seconds / previous - 1:+7.1%}' if previous else ''
+                )
+                print(
+                    f'{case:<24} {size:>6}  {seconds * 1000:11.4f} ms  '
+                    f'{seconds * 1e6 / size:9.3f} us/object  {change}'
+                )
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results
+            }, f, indent=2)
+            f.write('\n')
+        print(f'Baseline saved to {args.baseline}')
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    for case, size, previous, seconds in regressions:
+        print(
+            f'REGRESSION {case} ({size} objects): '
+            f'{previous * 1000:.4f} ms -> {seconds * 1000:.4f} ms',
+            file=sys.stderr
+        )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark radius queries on places.
+
+Seeds places with random coordinates using bulk inserts, then compares a
+brute-force haversine scan over every place with the geohash index used
+by ``HBnBFacade.get_places_near``.
+"""
+import argparse
+import random
+import time
+
+from app import db
+from app.models.place import Place
+from app.utils.geo import haversine_km
+from benchmarks.common import (
+    benchmark_app, seed_users, seed_places, time_call, report
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=1000000)
+    parser.add_argument('--radius-km', type=float, default=10.0)
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    def coordinates(_):
+        # Keep away from the poles, where every query falls back to a scan
+        return rng.uniform(-60.0, 60.0), rng.uniform(-180.0, 180.0)
+
+    with benchmark_app():
+        start = time.perf_counter()
+        user_ids = seed_users(100)
+        seed_places(args.places, user_ids, coordinates)
+        print(
+            f'Seeded {args.places} places '
+            f'in {time.perf_counter() - start:.1f} s'
+        )
+
+        from app.services.facade import HBnBFacade
+        facade = HBnBFacade()
+        centers = [coordinates(i) for i in range(args.queries)]
+        radius = args.radius_km
+
+        def brute_force(lat, lon):
+            rows = db.session.query(
+                Place.id, Place.latitude, Place.longitude
+            )
+            matches = [
+                (haversine_km(lat, lon, row.latitude, row.longitude), row.id)
+                for row in rows
+            ]
+            return sorted(match for match in matches if match[0] <= radius)
+
+        def indexed(lat, lon):
+            return facade.get_places_near(lat, lon, radius, limit=10 ** 9)
+
+        # Both strategies must agree before their timings mean anything
+        for lat, lon in centers[:3]:
+            expected = [place_id for _, place_id in brute_force(lat, lon)]
+            found = [place['id'] for place in indexed(lat, lon)]
+            assert sorted(expected) == sorted(found)
+
+        queries = iter(centers * 2)
+        report(
+            'brute-force haversine scan',
+            time_call(lambda: brute_force(*next(queries)), 3),
+            f'(radius {radius} km)'
+        )
+        queries = iter(centers)
+        report(
+            'geohash index',
+            time_call(lambda: indexed(*next(queries)), args.queries),
+            f'(radius {radius} km)'
+        )
+
+
+if __name__ == '__main__':
+    main()
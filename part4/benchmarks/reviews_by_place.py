@@ -0,0 +1,65 @@
+"""Benchmark fetching the reviews of a single place.
+
+Seeds a SQLite database with a large number of reviews using bulk inserts,
+then compares the old approach (load every review with ``get_all()`` and
+filter in Python) with the indexed SQL query used by
+``HBnBFacade.get_reviews_by_place``.
+"""
+import argparse
+import time
+
+from benchmarks.common import (
+    benchmark_app, seed_users, seed_places, seed_reviews, time_call, report
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--reviews', type=int, default=1000000)
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument(
+        '--legacy-iterations', type=int, default=1,
+        help='Iterations for the get_all() scan, which is much slower'
+    )
+    args = parser.parse_args()
+
+    if args.reviews > args.places * args.users:
+        parser.error('--reviews cannot exceed --places * --users')
+
+    with benchmark_app():
+        start = time.perf_counter()
+        user_ids = seed_users(args.users)
+        place_ids = seed_places(args.places, user_ids)
+        seed_reviews(args.reviews, user_ids, place_ids)
+        print(
+            f'Seeded {args.reviews} reviews over {args.places} places '
+            f'in {time.perf_counter() - start:.1f} s'
+        )
+
+        from app.services.facade import HBnBFacade
+        facade = HBnBFacade()
+        place_id = place_ids[len(place_ids) // 2]
+
+        def legacy():
+            return [
+                review for review in facade.review_repo.get_all()
+                if review.place_id == place_id
+            ]
+
+        def indexed():
+            return facade.get_reviews_by_place(place_id)
+
+        detail = f'({len(indexed())} reviews returned)'
+        report(
+            'get_all() + Python filter',
+            time_call(legacy, args.legacy_iterations),
+            detail
+        )
+        report('indexed SQL query', time_call(indexed, args.iterations),
+               detail)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark the serialization of large place lists.
+
+Loads a page of places from a seeded SQLite database, then times turning
+it into a JSON response body the old way (``to_dict()`` or
+``to_summary_dict()`` for every place, encoded by Flask-RESTX with the
+stdlib json module) and through app/utils/serialization.py, with the
+stdlib encoder and with orjson (``JSON_FAST_SERIALIZER``).
+"""
+import argparse
+
+from flask_restx.representations import output_json as restx_output_json
+
+from app.models.place import Place
+from app.utils.serialization import (
+    orjson, output_json, place_serializer, place_summary_serializer
+)
+from benchmarks.common import (
+    benchmark_app, seed_users, seed_places, time_call, report
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    with benchmark_app() as app:
+        seed_places(args.places, seed_users(10))
+        places = Place.query.all()
+        payloads = [
+            ('summary', Place.to_summary_dict, place_summary_serializer),
+            ('full', Place.to_dict, place_serializer)
+        ]
+        with app.test_request_context():
+            for name, to_dict, serializer in payloads:
+                def legacy():
+                    return restx_output_json(
+                        {'items': [to_dict(place) for place in places]}, 200
+                    )
+
+                def serialized():
+                    return output_json(
+                        {'items': serializer.many(places)}, 200
+                    )
+
+                # time_call empties the session after each run, which
+                # only detaches the already loaded places
+                legacy_timings = time_call(legacy, args.iterations)
+                report(f'{name} to_dict + json', legacy_timings)
+
+                app.config['JSON_FAST_SERIALIZER'] = False
+                stdlib_timings = time_call(serialized, args.iterations)
+                report(f'{name} serializer + json', stdlib_timings)
+
+                if orjson is None:
+                    print('orjson is not installed, skipping the fast path')
+                    continue
+                app.config['JSON_FAST_SERIALIZER'] = True
+                fast_timings = time_call(serialized, args.iterations)
+                speedup = min(legacy_timings) / min(fast_timings)
+                report(
+                    f'{name} serializer + orjson', fast_timings,
+                    f'{speedup:.1f}x faster'
+                )
+
+
+if __name__ == '__main__':
+    main()
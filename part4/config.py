@@ -9,18 +9,105 @@ class Config:
     # Uses the same key as Flask by default
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', SECRET_KEY)
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)  # Token expires after 1 hour
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Revoked tokens ('local' in-process store or 'redis' shared store)
+    REVOCATION_BACKEND = os.getenv('REVOCATION_BACKEND', 'local')
+    # Token revocations the local store holds. Each stays until its token
+    # expires (up to JWT_REFRESH_TOKEN_EXPIRES), so size it for the
+    # logouts of that period; a full store refuses new ones (503)
+    REVOCATION_MAX_SIZE = int(os.getenv('REVOCATION_MAX_SIZE', 100000))
+    REVOCATION_REDIS_URL = os.getenv(
+        'REVOCATION_REDIS_URL', 'redis://localhost:6379/0'
+    )
+    # Applied to every new SQLite connection
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000  # milliseconds
+    }
+    # Optional read replica: repository reads go there, except in a
+    # request that has already written (see app/persistence/routing.py)
+    SQLALCHEMY_REPLICA_URI = os.getenv('DATABASE_REPLICA_URL')
+    # Connection checkouts waiting longer than this are logged
+    DB_POOL_WAIT_WARN_MS = 100
+    # Statements slower than this are written with their query plan and
+    # the facade method that ran them to SLOW_QUERY_LOG_FILE (default:
+    # instance/slow_queries.log), rotated at SLOW_QUERY_LOG_MAX_BYTES;
+    # 0 disables the log
+    SLOW_QUERY_THRESHOLD_MS = int(os.getenv('SLOW_QUERY_THRESHOLD_MS', 250))
+    SLOW_QUERY_LOG_FILE = os.getenv('SLOW_QUERY_LOG_FILE')
+    SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS = 5
+    # Pagination of list endpoints
+    PAGE_SIZE_DEFAULT = 50
+    PAGE_SIZE_MAX = 500
+    # Bulk endpoints: items per transaction and per request
+    BULK_BATCH_SIZE = 500
+    BULK_MAX_ITEMS = 10000
+    # Bulk imports: rows per transaction, row errors kept in the result
+    IMPORT_BATCH_SIZE = 2000
+    IMPORT_MAX_ERRORS = 1000
+    # Streaming NDJSON exports: rows read and written per chunk
+    EXPORT_BATCH_SIZE = 1000
+    # Read-through cache for places and amenities ('local' or 'redis')
+    ENTITY_CACHE_ENABLED = os.getenv(
+        'ENTITY_CACHE_ENABLED', 'true'
+    ).lower() in ('1', 'true', 'yes')
+    ENTITY_CACHE_BACKEND = os.getenv('ENTITY_CACHE_BACKEND', 'local')
+    ENTITY_CACHE_MAX_SIZE = 10000
+    ENTITY_CACHE_TTL = 300  # seconds
+    ENTITY_CACHE_REDIS_URL = os.getenv(
+        'ENTITY_CACHE_REDIS_URL', 'redis://localhost:6379/0'
+    )
+    # Cache of the anonymous place and amenity list responses: entries
+    # are fresh for RESPONSE_CACHE_TTL seconds or until a write, then
+    # served for up to RESPONSE_CACHE_STALE_TTL more seconds while one
+    # request rebuilds them
+    RESPONSE_CACHE_ENABLED = os.getenv(
+        'RESPONSE_CACHE_ENABLED', 'true'
+    ).lower() in ('1', 'true', 'yes')
+    RESPONSE_CACHE_MAX_SIZE = 1000
+    RESPONSE_CACHE_TTL = 10  # seconds
+    RESPONSE_CACHE_STALE_TTL = 30  # seconds
+    # Encode responses with orjson (optional package) instead of json
+    JSON_FAST_SERIALIZER = os.getenv(
+        'JSON_FAST_SERIALIZER', ''
+    ).lower() in ('1', 'true', 'yes')
+    # Request latency, SQL, bcrypt and serialization metrics, served to
+    # admins in the Prometheus text format at METRICS_PATH
+    METRICS_ENABLED = os.getenv(
+        'METRICS_ENABLED', ''
+    ).lower() in ('1', 'true', 'yes')
+    METRICS_PATH = '/metrics'
+    # Password hashing: bcrypt cost factor and the process pool running it
+    # (0 workers hashes in the request thread). Existing hashes are
+    # upgraded on login when the cost factor changes.
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = 8
+    PASSWORD_HASH_TIMEOUT = 5  # seconds
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    METRICS_ENABLED = True
     # Add SQLAlchemy configurations
     SQLALCHEMY_DATABASE_URI = 'sqlite:///development.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_timeout': 10
+    }
 
 
 class TestingConfig(Config):
     DEBUG = True
     TESTING = True
+    # Cheap hashes, computed in the test process
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    SLOW_QUERY_THRESHOLD_MS = 0
     # Add SQLAlchemy configuration for testing
     SQLALCHEMY_DATABASE_URI = 'sqlite:///testing.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -28,11 +115,23 @@ class TestingConfig(Config):
 
 class ProductionConfig(Config):
     # Secret key should be set in environment variables in production
+    # gunicorn runs several workers: revocations must be shared by all of
+    # them (gunicorn.conf.py refuses 'local' with more than one worker)
+    REVOCATION_BACKEND = os.getenv('REVOCATION_BACKEND', 'redis')
     # Add SQLAlchemy configuration for production
     SQLALCHEMY_DATABASE_URI = os.getenv(
         'DATABASE_URL', 'sqlite:///production.db'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Size the pool for the threads of one worker (GUNICORN_THREADS) plus
+    # headroom; check pool_stats() for checkout waits
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True
+    }
 
 
 config = {
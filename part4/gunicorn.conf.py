@@ -0,0 +1,68 @@
+"""Gunicorn settings, each overridable with an environment variable.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Workers are processes, so CPU-bound work (bcrypt, JSON encoding) runs in
+parallel across cores; threads inside a worker overlap database and
+network waits. Send SIGHUP to the master to restart the workers
+gracefully. With GUNICORN_PRELOAD, the code is loaded once by the
+master, so a code change needs a full restart (or a USR2 upgrade).
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(
+    os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+# Load the app in the master before forking, sharing its memory
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+# Seconds an idle keep-alive connection stays open; keep it above the
+# idle timeout of the load balancer in front
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 100))
+# Set GUNICORN_ACCESS_LOG to an empty string to disable the access log
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master process
+
+    Every engine is reset, the read replica's included.
+    """
+    if not server.cfg.preload_app:
+        return
+    from app import db
+    from wsgi import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Refuse to start workers that would not share token revocations
+
+    With REVOCATION_BACKEND 'local' each worker has its own store, so a
+    logout would only apply to the worker that handled it. A worker that
+    fails to boot stops gunicorn. GUNICORN_ALLOW_LOCAL_REVOCATION=true
+    skips the check, for load tests that never revoke tokens.
+    """
+    if worker.cfg.workers < 2 or os.getenv(
+        'GUNICORN_ALLOW_LOCAL_REVOCATION', 'false'
+    ).lower() == 'true':
+        return
+    from wsgi import app
+
+    if app.config['REVOCATION_BACKEND'] == 'local':
+        raise RuntimeError(
+            "REVOCATION_BACKEND 'local' keeps revoked tokens in each "
+            "worker: use 'redis' or WEB_CONCURRENCY=1"
+        )
@@ -21,11 +21,17 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         
         // Fetch places data regardless of authentication status
+        setupPriceFilter(token);
         fetchPlaces(token);
     }
     
-    // Fetch places data from API
-    async function fetchPlaces(token) {
+    // Places requested per page (the API's PAGE_SIZE_MAX)
+    const PAGE_SIZE = 500;
+    // Number of the latest fetchPlaces call, to drop the results of older ones
+    let latestRequest = 0;
+    
+    // Fetch places data from API, filtered by price on the server
+    async function fetchPlaces(token, maxPrice = 'all') {
         try {
             const headers = {
                 'Content-Type': 'application/json'
@@ -36,20 +42,39 @@ document.addEventListener('DOMContentLoaded', () => {
                 headers['Authorization'] = `Bearer ${token}`;
             }
             
-            const response = await fetch('http://127.0.0.1:5000/api/v1/places/', {
-                method: 'GET',
-                headers: headers
-            });
+            const params = new URLSearchParams();
+            if (maxPrice !== 'all') {
+                params.set('max_price', maxPrice);
+            }
+            params.set('limit', PAGE_SIZE);
             
-            if (response.ok) {
-                const places = await response.json();
+            // Search results are paginated: places are under "items", and
+            // next_cursor is passed back as "after" until the last page
+            const request = ++latestRequest;
+            const places = [];
+            let cursor = null;
+            do {
+                if (cursor) {
+                    params.set('after', cursor);
+                }
+                const response = await fetch(`http://127.0.0.1:5000/api/v1/places/search?${params}`, {
+                    method: 'GET',
+                    headers: headers
+                });
+                
+                if (!response.ok) {
+                    console.error('Failed to fetch places:', response.statusText);
+                    displayError('Failed to load places. Please try again later.');
+                    return;
+                }
+                const page = await response.json();
+                places.push(...page.items);
+                cursor = page.next_cursor;
+            } while (cursor && request === latestRequest);
+            
+            // Ignore this load if the filter changed while it ran
+            if (request === latestRequest) {
                 displayPlaces(places);
-                // Store places in a global variable for filtering
-                window.allPlaces = places;
-                setupPriceFilter();
-            } else {
-                console.error('Failed to fetch places:', response.statusText);
-                displayError('Failed to load places. Please try again later.');
             }
         } catch (error) {
             console.error('Error fetching places:', error);
@@ -100,23 +125,12 @@ document.addEventListener('DOMContentLoaded', () => {
     }
     
     // Setup price filter functionality
-    function setupPriceFilter() {
+    function setupPriceFilter(token) {
         const priceFilter = document.getElementById('price-filter');
         
+        // Ask the API for matching places instead of hiding cards locally
         priceFilter.addEventListener('change', (event) => {
-            const maxPrice = event.target.value;
-            const placesListSection = document.getElementById('places-list');
-            const placeCards = placesListSection.querySelectorAll('.place-card');
-            
-            placeCards.forEach(card => {
-                const price = parseFloat(card.dataset.price);
-                
-                if (maxPrice === 'all' || price <= parseFloat(maxPrice)) {
-                    card.style.display = 'block';
-                } else {
-                    card.style.display = 'none';
-                }
-            });
+            fetchPlaces(token, event.target.value);
         });
     }
     
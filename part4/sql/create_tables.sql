@@ -18,6 +18,9 @@ CREATE TABLE IF NOT EXISTS places (
     price DECIMAL(10, 2) NOT NULL,
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
+    geohash VARCHAR(12),
+    review_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
     owner_id CHAR(36) NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -46,6 +49,22 @@ CREATE TABLE IF NOT EXISTS reviews (
     UNIQUE (user_id, place_id) -- Ensure a user can only review a place once
 );
 
+-- Index used to fetch the reviews of a place without a full table scan
+CREATE INDEX idx_reviews_place_id ON reviews (place_id);
+
+-- Indexes used by the place search filters
+CREATE INDEX idx_places_price ON places (price, id);
+CREATE INDEX idx_places_latitude_longitude ON places (latitude, longitude);
+
+-- Index used by radius queries (/api/v1/places/nearby)
+CREATE INDEX idx_places_geohash ON places (geohash);
+
+-- Indexes used by the cursor pagination of list endpoints
+CREATE INDEX idx_users_created_at ON users (created_at, id);
+CREATE INDEX idx_places_created_at ON places (created_at, id);
+CREATE INDEX idx_amenities_created_at ON amenities (created_at, id);
+CREATE INDEX idx_reviews_created_at ON reviews (created_at, id);
+
 -- Create Place_Amenity table (many-to-many relationship)
 CREATE TABLE IF NOT EXISTS place_amenity (
     place_id CHAR(36) NOT NULL,
@@ -0,0 +1,51 @@
+"""Fixtures shared by the tests: an app on a fresh SQLite file."""
+import os
+
+import pytest
+
+from app import create_app, db, password_hasher
+from app.services import facade
+from config import TestingConfig
+
+PASSWORD = 'secret1'
+
+
+@pytest.fixture
+def app(tmp_path):
+    """App bound to a fresh SQLite file, inside an app context"""
+    config = type('TestConfig', (TestingConfig,), {
+        'DEBUG': False,
+        'SQLALCHEMY_DATABASE_URI':
+            f"sqlite:///{os.path.join(tmp_path, 'test.db')}"
+    })
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+            password_hasher.shutdown()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def create_user(client):
+    """Create a user, returning it with the headers of its access token"""
+    def create(email, is_admin=False):
+        user = facade.create_user({
+            'first_name': 'Test', 'last_name': 'User', 'email': email,
+            'password': PASSWORD, 'is_admin': is_admin
+        })
+        response = client.post('/api/v1/auth/login', json={
+            'email': email, 'password': PASSWORD
+        })
+        token = response.get_json()['access_token']
+        return user, {'Authorization': f'Bearer {token}'}
+    return create
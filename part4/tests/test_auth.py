@@ -0,0 +1,59 @@
+"""Token revocation: logout and per-user revocation."""
+from app import token_blocklist
+
+from tests.conftest import PASSWORD
+
+
+def login(client, email):
+    return client.post('/api/v1/auth/login', json={
+        'email': email, 'password': PASSWORD
+    }).get_json()
+
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_login_right_after_revoke_user_is_valid(client, create_user):
+    user, headers = create_user('user@example.com')
+    token_blocklist.revoke_user(user.id)
+    # Usually in the same second as the revocation
+    tokens = login(client, 'user@example.com')
+
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 401
+    response = client.get(
+        '/api/v1/auth/me', headers=bearer(tokens['access_token'])
+    )
+    assert response.status_code == 200
+    assert response.get_json()['is_admin'] is False
+
+
+def test_logout_with_invalid_refresh_token_keeps_access_token(
+        client, create_user):
+    create_user('user@example.com')
+    tokens = login(client, 'user@example.com')
+    headers = bearer(tokens['access_token'])
+
+    response = client.post(
+        '/api/v1/auth/logout', headers=headers,
+        json={'refresh_token': 'not-a-token'}
+    )
+    assert response.status_code == 400
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 200
+
+
+def test_logout_revokes_both_tokens(client, create_user):
+    create_user('user@example.com')
+    tokens = login(client, 'user@example.com')
+    headers = bearer(tokens['access_token'])
+
+    response = client.post(
+        '/api/v1/auth/logout', headers=headers,
+        json={'refresh_token': tokens['refresh_token']}
+    )
+    assert response.status_code == 200
+    assert client.get('/api/v1/auth/me', headers=headers).status_code == 401
+    response = client.post(
+        '/api/v1/auth/refresh', headers=bearer(tokens['refresh_token'])
+    )
+    assert response.status_code == 401
@@ -0,0 +1,53 @@
+"""Number of SQL statements issued by the read endpoints.
+
+The counts are exact: more statements is an N+1 regression, fewer
+usually means a relationship the serializer needs is no longer loaded
+eagerly (and is then loaded lazily elsewhere, or missing).
+"""
+import pytest
+from sqlalchemy import event
+
+from app import db
+from benchmarks.common import (
+    seed_amenities, seed_place_amenities, seed_places, seed_reviews,
+    seed_users
+)
+
+
+@pytest.fixture
+def place_ids(app):
+    """Places linked to 5 amenities, the first one with 10 reviews"""
+    user_ids = seed_users(10)
+    place_ids = seed_places(5, user_ids)
+    seed_place_amenities(place_ids, seed_amenities(5), 5)
+    seed_reviews(10, user_ids, place_ids[:1])
+    return place_ids
+
+
+@pytest.fixture
+def statements(app):
+    """SQL statements executed, collected from the listener below"""
+    executed = []
+
+    def count_statement(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', count_statement)
+
+
+@pytest.mark.parametrize('path, expected', [
+    ('/api/v1/places/{place_id}', 1),
+    ('/api/v1/places/', 1),
+    ('/api/v1/amenities/', 1),
+    ('/api/v1/reviews/places/{place_id}/reviews', 2),
+])
+def test_statements_per_request(client, place_ids, statements,
+                                path, expected):
+    # Start from an empty identity map, like a fresh request
+    db.session.remove()
+    statements.clear()
+    response = client.get(path.format(place_id=place_ids[0]))
+    assert response.status_code == 200
+    assert len(statements) == expected, statements
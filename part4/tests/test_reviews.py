@@ -0,0 +1,49 @@
+"""Review updates and the review totals stored on places."""
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+from app.services import facade
+
+
+def create_place(owner, title):
+    return facade.create_place({
+        'title': title, 'description': '', 'price': 100.0,
+        'latitude': 48.85, 'longitude': 2.35, 'owner_id': owner.id
+    })
+
+
+def totals(place_id):
+    """(review_count, rating_sum) of a place, read from the database"""
+    db.session.remove()
+    place = db.session.get(Place, place_id)
+    return place.review_count, place.rating_sum
+
+
+def test_update_cannot_move_a_review(client, create_user):
+    owner, _ = create_user('owner@example.com')
+    author, headers = create_user('author@example.com')
+    other, _ = create_user('other@example.com')
+    first = create_place(owner, 'First')
+    second = create_place(owner, 'Second')
+
+    response = client.post('/api/v1/reviews/', headers=headers, json={
+        'text': 'Nice', 'rating': 4, 'place_id': first['id']
+    })
+    assert response.status_code == 201
+    review_id = response.get_json()['id']
+
+    response = client.put(
+        f'/api/v1/reviews/{review_id}', headers=headers,
+        json={'rating': 2, 'place_id': second['id'], 'user_id': other.id}
+    )
+    assert response.status_code == 200
+    assert response.get_json()['place_id'] == first['id']
+    assert response.get_json()['user_id'] == author.id
+
+    db.session.remove()
+    review = db.session.get(Review, review_id)
+    assert (review.place_id, review.user_id, review.rating) == (
+        first['id'], author.id, 2
+    )
+    assert totals(first['id']) == (1, 2)
+    assert totals(second['id']) == (0, 0)
@@ -0,0 +1,46 @@
+"""Values checked by Schema.clean() and the model validation hooks."""
+import pytest
+
+from app.models.amenity import Amenity
+from app.models.review import Review
+from app.utils.validation import (
+    amenity_schema, checked_fields, review_schema, select
+)
+
+
+def test_clean_converts_and_marks_checked_fields():
+    values, errors = review_schema.clean({'text': 'Nice', 'rating': '4'})
+    assert errors == []
+    assert values['rating'] == 4
+    assert checked_fields(values) == {'text', 'rating'}
+    assert checked_fields(select(values, ('rating',))) == {'rating'}
+    assert checked_fields({'text': 'Nice', 'rating': 4}) == set()
+
+
+def test_invalid_fields_are_not_checked():
+    values, errors = review_schema.clean({'text': ' ', 'rating': 3})
+    assert errors == ["Review text cannot be empty"]
+    assert checked_fields(values) == {'rating'}
+
+
+def test_field_changed_after_clean_is_validated(app):
+    values, errors = review_schema.clean({'text': 'Nice', 'rating': 4})
+    values['rating'] = 9
+    values['user_id'] = 'user'
+    assert checked_fields(values) == {'text'}
+    with pytest.raises(ValueError, match="Rating must be an integer"):
+        Review(**values, place_id='place', checked=checked_fields(values))
+
+
+def test_unchecked_values_are_validated(app):
+    with pytest.raises(ValueError, match="Amenity name cannot be empty"):
+        Amenity('', checked=checked_fields({'name': ''}))
+
+
+def test_amenity_update(app):
+    amenity = Amenity('Wifi')
+    values, errors = amenity_schema.clean({'name': 'Pool'})
+    amenity.update(values)
+    assert amenity.name == 'Pool'
+    with pytest.raises(ValueError, match="Amenity name cannot be empty"):
+        amenity.update({'name': ''})
@@ -0,0 +1,21 @@
+"""WSGI entry point for production servers.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module only builds the application: it has no other side
+effects, so servers can preload it once and fork their workers.
+"""
+import os
+from app import create_app
+
+# Production settings unless FLASK_ENV names another environment
+config_mapping = {
+    'development': 'config.DevelopmentConfig',
+    'testing': 'config.TestingConfig',
+    'production': 'config.ProductionConfig'
+}
+config_class = config_mapping.get(
+    os.getenv('FLASK_ENV', 'production'), 'config.ProductionConfig'
+)
+
+app = create_app(config_class)